@@ -0,0 +1,80 @@
+"""Share a time budget for the whole suite between its walltime benchmarks."""
+
+from __future__ import annotations
+
+import statistics
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from pytest_codspeed.instruments import compare_variant
+
+if TYPE_CHECKING:
+    from typing import Any
+
+# The part of the budget shared equally, so that every benchmark gets some time
+# whatever its history
+EQUAL_BUDGET_SHARE = 0.5
+# The part of the time of a benchmark spent warming it up
+WARMUP_BUDGET_SHARE = 0.2
+
+
+@dataclass(frozen=True)
+class TimePlan:
+    """The time planned for a benchmark, replacing its warmup and max times."""
+
+    warmup_time_ns: int
+    max_time_ns: int
+
+    @property
+    def total_ns(self) -> int:
+        return self.warmup_time_ns + self.max_time_ns
+
+
+def _weight(stats: dict[str, Any]) -> float:
+    """The time a benchmark needs relative to the others: the longer and the
+    noisier its rounds were, the more rounds of it are worth running."""
+    round_ns = stats["mean_ns"] * stats["iter_per_round"]
+    rel_stdev = stats["stdev_ns"] / stats["mean_ns"] if stats["mean_ns"] else 0.0
+    return round_ns * (1 + rel_stdev)
+
+
+def get_weight(latest_stats: dict[str, dict[str, Any]], uri: str) -> float | None:
+    """The weight of a benchmark, summing both variants of a compared one."""
+    if uri in latest_stats:
+        return _weight(latest_stats[uri])
+    variants = [compare_variant(uri, variant) for variant in ("baseline", "candidate")]
+    if all(variant in latest_stats for variant in variants):
+        return sum(_weight(latest_stats[variant]) for variant in variants)
+    return None
+
+
+def plan_time_budget(
+    uris: list[str], latest_stats: dict[str, dict[str, Any]], budget_ns: int
+) -> dict[str, TimePlan]:
+    """Share the budget between the benchmarks, by URI.
+
+    Half of it is shared equally, and the other half in proportion to the duration
+    and the noise of their rounds in the previous sessions. The benchmarks without
+    history are assumed to weigh the median weight, so without any history the
+    budget is shared equally.
+    """
+    if not uris:
+        return {}
+    known = [get_weight(latest_stats, uri) for uri in uris]
+    known_weights = [w for w in known if w is not None]
+    default = statistics.median(known_weights) if known_weights else 1.0
+    weights = [w if w is not None else default for w in known]
+    total_weight = sum(weights)
+    plans = {}
+    for uri, weight in zip(uris, weights):
+        share = EQUAL_BUDGET_SHARE / len(uris)
+        if total_weight > 0:
+            share += (1 - EQUAL_BUDGET_SHARE) * weight / total_weight
+        else:
+            share += (1 - EQUAL_BUDGET_SHARE) / len(uris)
+        time_ns = int(budget_ns * share)
+        warmup_time_ns = int(time_ns * WARMUP_BUDGET_SHARE)
+        plans[uri] = TimePlan(
+            warmup_time_ns=warmup_time_ns, max_time_ns=time_ns - warmup_time_ns
+        )
+    return plans
@@ -4,14 +4,111 @@ import dataclasses
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Generic, TypeVar
 
+from pytest_codspeed.gc_policy import GC_POLICIES
+
 T = TypeVar("T")
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from typing import Any, Callable
 
     import pytest
 
 
+def parse_precision(value: str | float) -> float:
+    """Parse a relative precision given either as a percentage ("0.5%") or a ratio.
+
+    Raises:
+        ValueError: If the value can't be parsed or is not strictly between 0 and 1
+    """
+    try:
+        if isinstance(value, str) and value.endswith("%"):
+            precision = float(value[:-1]) / 100
+        else:
+            precision = float(value)
+    except ValueError:
+        raise ValueError(f"invalid precision: {value!r}") from None
+    if not 0 < precision < 1:
+        raise ValueError(f"precision must be between 0 and 100%, got {value!r}")
+    return precision
+
+
+def parse_threshold(value: str) -> float:
+    """Parse a relative threshold given either as a percentage ("5%") or a ratio.
+
+    Raises:
+        ValueError: If the value can't be parsed or is not positive
+    """
+    try:
+        if value.endswith("%"):
+            threshold = float(value[:-1]) / 100
+        else:
+            threshold = float(value)
+    except ValueError:
+        raise ValueError(f"invalid threshold: {value!r}") from None
+    if not threshold > 0:
+        raise ValueError(f"threshold must be positive, got {value!r}")
+    return threshold
+
+
+def parse_worker_counts(value: Iterable[int]) -> tuple[int, ...]:
+    """Parse a list of worker counts (threads or processes), sorted and deduplicated.
+
+    Raises:
+        ValueError: If the counts are not a non-empty list of positive integers
+    """
+    counts = tuple(value) if not isinstance(value, (str, bytes)) else ()
+    if not counts or not all(
+        isinstance(count, int) and not isinstance(count, bool) and count > 0
+        for count in counts
+    ):
+        raise ValueError(
+            "worker counts must be a non-empty list of positive integers, "
+            f"got {value!r}"
+        )
+    return tuple(sorted(set(counts)))
+
+
+def parse_cpu_list(value: str) -> tuple[int, ...]:
+    """Parse a list of CPUs given as comma-separated numbers and ranges ("0,2-3"),
+    sorted and deduplicated.
+
+    Raises:
+        ValueError: If the list can't be parsed
+    """
+    cpus: set[int] = set()
+    try:
+        for part in value.split(","):
+            first, _, last = part.partition("-")
+            start, end = int(first), int(last) if last else int(first)
+            if start < 0 or end < start:
+                raise ValueError
+            cpus.update(range(start, end + 1))
+    except ValueError:
+        raise ValueError(
+            f"invalid CPU list {value!r}, expected numbers and ranges like '0,2-3'"
+        ) from None
+    return tuple(sorted(cpus))
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a shard given as "i/n", the i-th of n shards, counted from 1.
+
+    Raises:
+        ValueError: If the shard can't be parsed or is out of range
+    """
+    index, _, count = value.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        raise ValueError(
+            f"invalid shard {value!r}, expected 'i/n' like '1/4'"
+        ) from None
+    if not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"shard must be between 1/n and n/n, got {value!r}")
+    return shard
+
+
 @dataclass(frozen=True)
 class CodSpeedConfig:
     """
@@ -22,6 +119,27 @@ class CodSpeedConfig:
     warmup_time_ns: int | None = None
     max_time_ns: int | None = None
     max_rounds: int | None = None
+    target_precision: float | None = None
+    save_samples: bool = False
+    streaming_stats: bool = False
+    bootstrap_resamples: int = 0
+    asyncio_loop_factory: str | None = None
+    show_resource_usage: bool = False
+    warmup_strategy: str = "fixed"
+    gc_policy: str | None = None
+    trace_allocations: bool = False
+    cpus: tuple[int, ...] | None = None
+    nice: int | None = None
+    interleave: bool = False
+    compare: str | None = None
+    """The previous results file to compare with, or "latest"."""
+    compare_fail_threshold: float | None = None
+    stream_results: bool = False
+    resume: bool = False
+    shard: tuple[int, int] | None = None
+    """The shard of the benchmarks to run, as (index, count) counted from 1."""
+    total_budget_ns: int | None = None
+    """The time to share between the benchmarks of the session."""
 
     @classmethod
     def from_pytest_config(cls, config: pytest.Config) -> CodSpeedConfig:
@@ -31,10 +149,38 @@ class CodSpeedConfig:
         )
         max_time = config.getoption("--codspeed-max-time", None)
         max_time_ns = int(max_time * 1_000_000_000) if max_time is not None else None
+        total_budget = config.getoption("--codspeed-total-budget", None)
+        total_budget_ns = (
+            int(total_budget * 1_000_000_000) if total_budget is not None else None
+        )
         return cls(
             warmup_time_ns=warmup_time_ns,
             max_rounds=config.getoption("--codspeed-max-rounds", None),
             max_time_ns=max_time_ns,
+            target_precision=config.getoption("--codspeed-target-precision", None),
+            save_samples=config.getoption("--codspeed-save-samples", False),
+            streaming_stats=config.getoption("--codspeed-streaming-stats", False),
+            bootstrap_resamples=config.getoption("--codspeed-bootstrap-resamples", 0),
+            asyncio_loop_factory=config.getoption(
+                "--codspeed-asyncio-loop-factory", None
+            ),
+            show_resource_usage=config.getoption(
+                "--codspeed-show-resource-usage", False
+            ),
+            warmup_strategy=config.getoption("--codspeed-warmup-strategy", "fixed"),
+            gc_policy=config.getoption("--codspeed-gc", None),
+            trace_allocations=config.getoption("--codspeed-trace-allocations", False),
+            cpus=config.getoption("--codspeed-cpu", None),
+            nice=config.getoption("--codspeed-nice", None),
+            interleave=config.getoption("--codspeed-interleave", False),
+            compare=config.getoption("--codspeed-compare", None),
+            compare_fail_threshold=config.getoption(
+                "--codspeed-compare-fail-threshold", None
+            ),
+            stream_results=config.getoption("--codspeed-stream-results", False),
+            resume=config.getoption("--codspeed-resume", False),
+            shard=config.getoption("--codspeed-shard", None),
+            total_budget_ns=total_budget_ns,
         )
 
 
@@ -57,6 +203,56 @@ class BenchmarkMarkerOptions:
     The maximum number of rounds to run the benchmark for.
     Takes precedence over max_time. Only available in walltime mode.
     """
+    target_precision: float | None = None
+    """
+    The relative precision of the median to reach before stopping, as a ratio or a
+    percentage string (e.g. 0.005 or "0.5%"). max_time and max_rounds are then only
+    used as upper bounds. Only available in walltime mode.
+    """
+
+    threads: tuple[int, ...] | None = None
+    """
+    The thread counts to measure the throughput scaling of the benchmark with, e.g.
+    [1, 2, 4, 8]. Only available in walltime mode.
+    """
+    processes: tuple[int, ...] | None = None
+    """
+    The process counts to measure the throughput scaling of the benchmark with, using
+    a pool of forked workers. Only available in walltime mode, on platforms that can
+    fork.
+    """
+
+    gc: str | None = None
+    """
+    The garbage collection policy while the benchmark runs: "disabled" (default),
+    "enabled" or "freeze". Takes precedence over the --codspeed-gc option.
+    """
+
+    size_param: str | None = None
+    """
+    The name of the parameter holding the input size of a parametrized benchmark,
+    used to fit the time complexity of the benchmark across the sizes. Its values
+    must be numbers or sized collections. Only available in walltime mode.
+    """
+    size: float | None = field(default=None, init=False)
+    """The input size of this benchmark, resolved from size_param."""
+    sweep_params: str | None = field(default=None, init=False)
+    """The other parameters of the benchmark, identifying its sweep."""
+
+    def __post_init__(self) -> None:
+        # Normalize the values, bypassing the frozen dataclass
+        if self.target_precision is not None:
+            object.__setattr__(
+                self, "target_precision", parse_precision(self.target_precision)
+            )
+        if self.threads is not None:
+            object.__setattr__(self, "threads", parse_worker_counts(self.threads))
+        if self.processes is not None:
+            object.__setattr__(self, "processes", parse_worker_counts(self.processes))
+        if self.gc is not None and self.gc not in GC_POLICIES:
+            raise ValueError(
+                f"gc must be one of {', '.join(GC_POLICIES)}, got {self.gc!r}"
+            )
 
     @classmethod
     def from_pytest_item(cls, item: pytest.Item) -> BenchmarkMarkerOptions:
@@ -72,7 +268,7 @@ class BenchmarkMarkerOptions:
         kwargs = marker.kwargs
 
         unknown_kwargs = set(kwargs.keys()) - {
-            field.name for field in dataclasses.fields(cls)
+            field.name for field in dataclasses.fields(cls) if field.init
         }
         if unknown_kwargs:
             raise ValueError(
@@ -80,7 +276,45 @@ class BenchmarkMarkerOptions:
                 + ", ".join(sorted(unknown_kwargs))
             )
 
-        return cls(**kwargs)
+        options = cls(**kwargs)
+        if options.size_param is not None:
+            options._resolve_size(item, options.size_param)
+        return options
+
+    def _resolve_size(self, item: pytest.Item, size_param: str) -> None:
+        callspec = getattr(item, "callspec", None)
+        params = callspec.params if callspec is not None else {}
+        if size_param not in params:
+            raise ValueError(
+                f"size_param {size_param!r} is not a parameter of the benchmark"
+            )
+        value = params[size_param]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            size = float(value)
+        elif hasattr(value, "__len__"):
+            size = float(len(value))
+        else:
+            raise ValueError(
+                f"size_param {size_param!r} must be a number or a sized collection, "
+                f"got {value!r}"
+            )
+        other_params = {k: v for k, v in params.items() if k != size_param}
+        object.__setattr__(self, "size", size)
+        object.__setattr__(
+            self,
+            "sweep_params",
+            ", ".join(f"{k}={v!r}" for k, v in sorted(other_params.items())),
+        )
+
+
+@dataclass(frozen=True)
+class CompareOptions:
+    """Parameters for comparing two implementations using the compare fixture API."""
+
+    baseline: Callable[..., Any]
+    candidate: Callable[..., Any]
+    args: tuple[Any, ...] = field(default_factory=tuple)
+    kwargs: dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass(frozen=True)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+
+# Scheduler statistics of the current thread, only exposed by some Linux kernels
+SCHED_STATS_PATH = "/proc/thread-self/sched"
+
+
+def read_cpu_migrations() -> int | None:
+    """The number of times the current thread was moved to another CPU.
+
+    Returns:
+        The count since the thread started, or None when the kernel does not expose
+        it
+    """
+    try:
+        with open(SCHED_STATS_PATH) as sched_stats:
+            for line in sched_stats:
+                if line.startswith("se.nr_migrations"):
+                    return int(line.rsplit(":", 1)[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def format_cpu_list(cpus: tuple[int, ...]) -> str:
+    return ",".join(str(cpu) for cpu in cpus)
+
+
+class CpuIsolation:
+    """Pin the process on a set of CPUs and change its scheduling priority, until
+    restored.
+
+    The benchmarks then neither migrate to the cores used by other processes nor
+    get preempted as often by them.
+    """
+
+    def __init__(self, cpus: tuple[int, ...] | None, nice: int | None) -> None:
+        self.cpus = cpus
+        self.nice = nice
+        self._previous_cpus: set[int] | None = None
+        self._previous_nice: int | None = None
+
+    def apply(self) -> None:
+        """
+        Raises:
+            ValueError: If the platform does not support it, or the CPUs or the
+                priority can't be set
+        """
+        if self.cpus is not None:
+            if not hasattr(os, "sched_setaffinity"):
+                raise ValueError("pinning CPUs is not supported on this platform")
+            self._previous_cpus = os.sched_getaffinity(0)
+            try:
+                os.sched_setaffinity(0, self.cpus)
+            except OSError as e:
+                self._previous_cpus = None
+                raise ValueError(
+                    f"cannot pin the process on CPUs {format_cpu_list(self.cpus)}: "
+                    f"{e.strerror}"
+                ) from None
+        if self.nice is not None:
+            if not hasattr(os, "setpriority"):
+                self.restore()
+                raise ValueError(
+                    "setting the priority is not supported on this platform"
+                )
+            self._previous_nice = os.getpriority(os.PRIO_PROCESS, 0)
+            try:
+                os.setpriority(os.PRIO_PROCESS, 0, self.nice)
+            except OSError as e:
+                self._previous_nice = None
+                self.restore()
+                # Raising the priority (negative values) requires privileges
+                raise ValueError(
+                    f"cannot set the niceness to {self.nice}: {e.strerror}"
+                ) from None
+
+    def restore(self) -> None:
+        if self._previous_cpus is not None:
+            os.sched_setaffinity(0, self._previous_cpus)
+            self._previous_cpus = None
+        if self._previous_nice is not None:
+            try:
+                os.setpriority(os.PRIO_PROCESS, 0, self._previous_nice)
+            except PermissionError:
+                # A lowered priority can't be raised back without privileges
+                pass
+            self._previous_nice = None
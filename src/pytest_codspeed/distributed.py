@@ -0,0 +1,154 @@
+"""Support of the sessions distributed over pytest-xdist workers.
+
+The controller assigns a dedicated CPU to each worker, on distinct physical cores
+so that no two workers run on hyperthread siblings, then merges the results sent
+back by the workers into a single results file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+
+from pytest_codspeed.config import parse_cpu_list
+from pytest_codspeed.cpu_isolation import format_cpu_list
+from pytest_codspeed.instruments.walltime import format_time
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import Any
+
+    import pytest
+
+# The keys of the data exchanged with the workers
+WORKER_CPUS_KEY = "codspeed_cpus"
+WORKER_RESULTS_KEY = "codspeed_results"
+
+THREAD_SIBLINGS_PATH = "/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list"
+
+
+def is_xdist_worker(config: pytest.Config) -> bool:
+    return hasattr(config, "workerinput")
+
+
+def is_xdist_controller(config: pytest.Config) -> bool:
+    return not is_xdist_worker(config) and config.getoption("dist", "no") != "no"
+
+
+def get_available_cpus(cpus: tuple[int, ...] | None) -> tuple[int, ...]:
+    """The CPUs the workers can be pinned on: the given ones, or else the ones the
+    process is allowed to run on."""
+    if cpus is not None:
+        return cpus
+    if hasattr(os, "sched_getaffinity"):
+        return tuple(sorted(os.sched_getaffinity(0)))
+    return tuple(range(os.cpu_count() or 1))
+
+
+def read_thread_siblings(cpu: int) -> tuple[int, ...]:
+    """The CPUs sharing the physical core of the given one, itself included."""
+    try:
+        with open(THREAD_SIBLINGS_PATH.format(cpu=cpu)) as siblings:
+            return parse_cpu_list(siblings.read().strip())
+    except (OSError, ValueError):
+        # The topology is only exposed by Linux, each CPU is then its own core
+        return (cpu,)
+
+
+def group_physical_cores(cpus: Iterable[int]) -> list[tuple[int, ...]]:
+    """Group the CPUs by physical core, keeping the order of their first CPU."""
+    cpus = tuple(cpus)
+    cores: dict[tuple[int, ...], None] = {}
+    for cpu in cpus:
+        core = tuple(
+            sibling for sibling in read_thread_siblings(cpu) if sibling in cpus
+        )
+        cores.setdefault(core or (cpu,), None)
+    return list(cores)
+
+
+def assign_worker_cpus(
+    cores: list[tuple[int, ...]], worker_index: int
+) -> tuple[int, ...]:
+    """The CPU of a worker: the first one of a physical core, whose siblings are
+    left unused by the other workers.
+
+    When there are more workers than cores, the cores are shared in turn.
+    """
+    return cores[worker_index % len(cores)][:1]
+
+
+def get_worker_index(worker_id: str) -> int:
+    """The index of a worker, from its id, e.g. 3 for "gw3"."""
+    return int(worker_id.lstrip("gw") or 0)
+
+
+def get_worker_cpus(config: pytest.Config) -> tuple[int, ...] | None:
+    """The CPUs assigned to the current worker by the controller, if any."""
+    cpus = getattr(config, "workerinput", {}).get(WORKER_CPUS_KEY)
+    return parse_cpu_list(cpus) if cpus else None
+
+
+def send_worker_results(config: pytest.Config, data: dict[str, Any]) -> None:
+    # Serialized, so that it is sent back to the controller as is
+    config.workeroutput[WORKER_RESULTS_KEY] = json.dumps(  # type: ignore[attr-defined]
+        data
+    )
+
+
+def receive_worker_results(node: Any) -> dict[str, Any] | None:
+    """The results sent by a worker, tagged with the worker and its CPUs."""
+    results = getattr(node, "workeroutput", {}).get(WORKER_RESULTS_KEY)
+    if results is None:
+        return None
+    data = json.loads(results)
+    cpus = node.workerinput.get(WORKER_CPUS_KEY)
+    for bench in data.get("benchmarks", []):
+        bench["worker"] = node.workerinput["workerid"]
+        bench["cpus"] = list(parse_cpu_list(cpus)) if cpus else None
+    return data
+
+
+def merge_worker_results(
+    metadata: dict[str, Any], worker_results: dict[str, dict[str, Any]]
+) -> dict[str, Any]:
+    """Merge the results of the workers, by worker id, under the environment
+    metadata of the controller."""
+    merged: dict[str, Any] = dict(metadata)
+    for worker_id in sorted(worker_results, key=get_worker_index):
+        data = worker_results[worker_id]
+        merged["instrument"] = data["instrument"]
+        if "benchmarks" in data:
+            merged.setdefault("benchmarks", []).extend(data["benchmarks"])
+    return merged
+
+
+def print_worker_results_table(benchmarks: list[dict[str, Any]]) -> None:
+    table = Table(title="Benchmark Results")
+
+    table.add_column("Benchmark", justify="right", style="cyan", no_wrap=True)
+    table.add_column("Worker", justify="right")
+    table.add_column("CPUs", justify="right")
+    table.add_column("Time (best)", justify="right", style="green bold")
+    table.add_column("Rel. StdDev", justify="right")
+    table.add_column("Iters", justify="right")
+
+    for bench in benchmarks:
+        stats = bench["stats"]
+        table.add_row(
+            escape(bench["name"]),
+            bench["worker"],
+            format_cpu_list(tuple(bench["cpus"])) if bench["cpus"] else "-",
+            format_time(stats["min_ns"]),
+            f"{stats['stdev_ns'] / stats['mean_ns'] * 100:.1f}%",
+            f"{stats['iter_per_round'] * stats['rounds']:,}",
+        )
+
+    console = Console()
+    print("\n")
+    console.print(table)
@@ -0,0 +1,119 @@
+"""The Python environment of the local results, stored once and referenced by hash.
+
+Describing the environment means enumerating every installed distribution and
+dumping the whole sysconfig, which is slow in large virtualenvs and bloats every
+results file. Instead, it is written once in the .codspeed folder under its
+fingerprint, and the results files only reference the fingerprint. The fingerprint
+itself is cached, and only computed again when the site-packages change.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import site
+import sys
+import sysconfig
+from typing import TYPE_CHECKING
+
+from pytest_codspeed.utils import (
+    get_creator_metadata,
+    get_environment_fingerprint,
+    get_python_metadata,
+    is_gil_enabled,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any
+
+ENVIRONMENTS_FOLDER_NAME = "environments"
+ENVIRONMENT_CACHE_FILE_NAME = "cache.json"
+
+
+def get_site_packages() -> list[str]:
+    """The folders where the distributions are installed."""
+    paths = sysconfig.get_paths()
+    folders = {paths["purelib"], paths["platlib"], *site.getsitepackages()}
+    if site.ENABLE_USER_SITE:
+        folders.add(site.getusersitepackages())
+    return sorted(folders)
+
+
+def get_cache_key() -> str:
+    """A hash of what the cached fingerprint depends on: the interpreter, and the
+    modification times of the site-packages, which change when a distribution is
+    installed, upgraded or removed."""
+    mtimes: list[tuple[str, int | None]] = []
+    for folder in get_site_packages():
+        try:
+            mtimes.append((folder, os.stat(folder).st_mtime_ns))
+        except OSError:
+            mtimes.append((folder, None))
+    content = json.dumps(
+        [sys.executable, sys.version, is_gil_enabled(), mtimes], sort_keys=True
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def get_cached_fingerprint(folder: Path) -> str:
+    """The fingerprint of the Python environment, whose description is written in
+    the folder.
+
+    Raises:
+        OSError: If the description of the environment can't be written
+    """
+    environments = folder / ENVIRONMENTS_FOLDER_NAME
+    cache_path = environments / ENVIRONMENT_CACHE_FILE_NAME
+    key = get_cache_key()
+    try:
+        cache = json.loads(cache_path.read_text())
+        if (
+            cache["key"] == key
+            and (environments / f"{cache['fingerprint']}.json").exists()
+        ):
+            return cache["fingerprint"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    python = get_python_metadata()
+    fingerprint = get_environment_fingerprint({"python": python})
+    environments.mkdir(parents=True, exist_ok=True)
+    _write_atomically(
+        environments / f"{fingerprint}.json",
+        json.dumps(python, indent=2, sort_keys=True, default=str),
+    )
+    _write_atomically(cache_path, json.dumps({"key": key, "fingerprint": fingerprint}))
+    return fingerprint
+
+
+def _write_atomically(path: Path, content: str) -> None:
+    # Never seen partially written by a concurrent session
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp_path.write_text(content)
+    os.replace(tmp_path, path)
+
+
+def get_referenced_environment_metadata(folder: Path) -> dict[str, Any]:
+    """The environment metadata of a results file in the folder, referencing the
+    Python environment by its fingerprint.
+
+    It is inlined instead when it can't be written in the folder.
+    """
+    try:
+        fingerprint = get_cached_fingerprint(folder)
+    except OSError:
+        return {"creator": get_creator_metadata(), "python": get_python_metadata()}
+    return {"creator": get_creator_metadata(), "environment": fingerprint}
+
+
+def load_environment(folder: Path, fingerprint: str) -> dict[str, Any] | None:
+    """The description of a Python environment referenced by a results file of the
+    folder, if it is still there."""
+    try:
+        return json.loads(
+            (folder / ENVIRONMENTS_FOLDER_NAME / f"{fingerprint}.json").read_text()
+        )
+    except (OSError, ValueError):
+        return None
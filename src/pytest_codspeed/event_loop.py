@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import inspect
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Coroutine
+    from types import TracebackType
+    from typing import Any, Callable, TypeVar
+
+    T = TypeVar("T")
+
+    LoopFactory = Callable[[], asyncio.AbstractEventLoop]
+
+
+def is_coroutine_function(fn: Callable[..., Any]) -> bool:
+    return inspect.iscoroutinefunction(fn)
+
+
+def load_loop_factory(path: str) -> LoopFactory:
+    """Import an event loop factory given as "module:callable".
+
+    Example: "uvloop:new_event_loop"
+
+    Raises:
+        ValueError: If the factory can't be imported or is not callable
+    """
+    module_name, _, attribute = path.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(
+            f"invalid loop factory {path!r}, expected the 'module:callable' format"
+        )
+    try:
+        factory = importlib.import_module(module_name)
+        for name in attribute.split("."):
+            factory = getattr(factory, name)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"cannot import loop factory {path!r}: {e}") from None
+    if not callable(factory):
+        raise ValueError(f"loop factory {path!r} is not callable")
+    return factory
+
+
+class EventLoopRunner:
+    """Run coroutines on a single event loop, kept alive across calls.
+
+    Benchmarks reuse the same loop for the warmup and every round, so that the
+    creation and the teardown of the loop are never measured.
+    """
+
+    def __init__(self, loop_factory: str | None = None) -> None:
+        factory = (
+            load_loop_factory(loop_factory)
+            if loop_factory is not None
+            else asyncio.new_event_loop
+        )
+        self.loop = factory()
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return self.loop.run_until_complete(coro)
+
+    def close(self) -> None:
+        try:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        finally:
+            self.loop.close()
+
+    def __enter__(self) -> EventLoopRunner:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import gc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter_ns
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import Any
+
+GC_POLICIES = ("disabled", "enabled", "freeze")
+"""
+How the garbage collector behaves while a benchmark runs:
+- disabled: collections never run, so their cost is not measured
+- enabled: collections run as they would in production
+- freeze: the objects alive before the benchmark are moved to a permanent
+  generation, then collections run on the objects created by the benchmark only
+"""
+DEFAULT_GC_POLICY = "disabled"
+
+
+@contextmanager
+def apply_gc_policy(policy: str) -> Iterator[None]:
+    """Apply a garbage collection policy, restoring the collector state on exit.
+
+    A collection is always made first, so that the garbage left by the previous
+    tests is not collected, and measured, during the benchmark. When the collector
+    was disabled beforehand, it is left untouched with the disabled policy.
+    """
+    was_enabled = gc.isenabled()
+    if policy == "disabled":
+        if was_enabled:
+            gc.collect()
+            gc.disable()
+    else:
+        gc.collect()
+        if policy == "freeze":
+            gc.freeze()
+        gc.enable()
+    try:
+        yield
+    finally:
+        # Ensure the state is restored even if the test failed
+        if policy == "freeze":
+            gc.unfreeze()
+        if was_enabled:
+            gc.enable()
+        else:
+            gc.disable()
+
+
+@dataclass
+class GcStats:
+    """The garbage collections that happened during the timed rounds."""
+
+    collections: int
+    collected: int
+    """The number of unreachable objects found by the collections."""
+    total_time_ns: int
+    """The time spent in collections over all the rounds."""
+    time_ns: float
+    """The time spent in collections per iteration."""
+
+
+class GcMonitor:
+    """Count the collections made between start and stop, and time them."""
+
+    def __init__(self) -> None:
+        self.collections = 0
+        self.collected = 0
+        self.total_time_ns = 0
+        self._collection_start_ns: int | None = None
+
+    def _on_collection(self, phase: str, info: dict[str, Any]) -> None:
+        if phase == "start":
+            self._collection_start_ns = perf_counter_ns()
+        elif self._collection_start_ns is not None:
+            self.total_time_ns += perf_counter_ns() - self._collection_start_ns
+            self.collections += 1
+            self.collected += info["collected"]
+            self._collection_start_ns = None
+
+    def start(self) -> None:
+        gc.callbacks.append(self._on_collection)
+
+    def stop(self, iterations: int) -> GcStats:
+        gc.callbacks.remove(self._on_collection)
+        return GcStats(
+            collections=self.collections,
+            collected=self.collected,
+            total_time_ns=self.total_time_ns,
+            time_ns=self.total_time_ns / iterations,
+        )
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+from rich.text import Text
+
+from pytest_codspeed.instruments.walltime import format_time
+from pytest_codspeed.regression import ResultsFile, find_latest_results
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any
+
+HISTORY_FILE_NAME = "history.db"
+DEFAULT_HISTORY_RUNS = 10
+
+# Bumped when the schema changes, older databases are then recreated
+SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    git_commit TEXT,
+    environment TEXT NOT NULL,
+    results_file TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_timestamp ON sessions (timestamp);
+CREATE TABLE IF NOT EXISTS benchmarks (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    uri TEXT NOT NULL,
+    name TEXT NOT NULL,
+    min_ns REAL NOT NULL,
+    median_ns REAL NOT NULL,
+    mean_ns REAL NOT NULL,
+    stdev_ns REAL NOT NULL,
+    q1_ns REAL NOT NULL,
+    q3_ns REAL NOT NULL,
+    rounds INTEGER NOT NULL,
+    iter_per_round INTEGER NOT NULL,
+    total_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS benchmarks_uri ON benchmarks (uri, session_id);
+"""
+_STATS_COLUMNS = (
+    "min_ns",
+    "median_ns",
+    "mean_ns",
+    "stdev_ns",
+    "q1_ns",
+    "q3_ns",
+    "rounds",
+    "iter_per_round",
+    "total_time",
+)
+
+
+@dataclass
+class TrendPoint:
+    """The stats of a benchmark in a past session."""
+
+    timestamp: float
+    git_commit: str | None
+    environment: str
+    median_ns: float
+    mean_ns: float
+    stdev_ns: float
+    rounds: int
+
+
+class HistoryStore:
+    """The walltime results of the past sessions, in a SQLite database.
+
+    Only the stats of the benchmarks are stored, indexed by URI and time, so that
+    the trend of a benchmark is a single indexed query instead of a scan of every
+    results file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.connection = sqlite3.connect(path)
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            with self.connection:
+                self.connection.executescript(
+                    "DROP TABLE IF EXISTS benchmarks; DROP TABLE IF EXISTS sessions;"
+                )
+                self.connection.executescript(_SCHEMA)
+                self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __enter__(self) -> HistoryStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.connection.close()
+
+    def append_session(
+        self,
+        timestamp: float,
+        git_commit: str | None,
+        environment: str,
+        results_file: str | None,
+        benchmarks: list[dict[str, Any]],
+    ) -> None:
+        """Record the benchmarks of a session, as found in its results file."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO sessions (timestamp, git_commit, environment, "
+                "results_file) VALUES (?, ?, ?, ?)",
+                (timestamp, git_commit, environment, results_file),
+            )
+            self.connection.executemany(
+                f"INSERT INTO benchmarks (session_id, uri, name, "
+                f"{', '.join(_STATS_COLUMNS)}) "
+                f"VALUES (?, ?, ?, {', '.join('?' * len(_STATS_COLUMNS))})",
+                [
+                    (
+                        cursor.lastrowid,
+                        bench["uri"],
+                        bench["name"],
+                        *(bench["stats"][column] for column in _STATS_COLUMNS),
+                    )
+                    for bench in benchmarks
+                ],
+            )
+
+    def find_uris(self, pattern: str) -> list[str]:
+        """The URIs of the recorded benchmarks containing the pattern."""
+        rows = self.connection.execute(
+            "SELECT DISTINCT uri FROM benchmarks WHERE instr(uri, ?) > 0 ORDER BY uri",
+            (pattern,),
+        )
+        return [uri for (uri,) in rows]
+
+    def latest_stats(self) -> dict[str, dict[str, float]]:
+        """The stats of each benchmark in the last session that ran it, by URI."""
+        rows = self.connection.execute(
+            f"SELECT uri, {', '.join(_STATS_COLUMNS)} FROM benchmarks WHERE rowid IN "
+            "(SELECT MAX(rowid) FROM benchmarks GROUP BY uri)"
+        )
+        return {uri: dict(zip(_STATS_COLUMNS, stats)) for uri, *stats in rows}
+
+    def trend(self, uri: str, runs: int) -> list[TrendPoint]:
+        """The stats of a benchmark in its last sessions, from the oldest."""
+        rows = self.connection.execute(
+            "SELECT sessions.timestamp, sessions.git_commit, sessions.environment, "
+            "benchmarks.median_ns, benchmarks.mean_ns, benchmarks.stdev_ns, "
+            "benchmarks.rounds "
+            "FROM benchmarks JOIN sessions ON sessions.id = benchmarks.session_id "
+            "WHERE benchmarks.uri = ? ORDER BY benchmarks.session_id DESC LIMIT ?",
+            (uri, runs),
+        ).fetchall()
+        return [TrendPoint(*row) for row in reversed(rows)]
+
+
+def load_latest_stats(folder: Path) -> dict[str, dict[str, Any]]:
+    """The last known stats of the benchmarks, by URI.
+
+    Taken from the local history, or else from the latest results file.
+    """
+    history_path = folder / HISTORY_FILE_NAME
+    if history_path.exists():
+        try:
+            with HistoryStore(history_path) as store:
+                stats = store.latest_stats()
+            if stats:
+                return stats
+        except sqlite3.Error:
+            pass
+    results_path = find_latest_results(folder)
+    if results_path is None:
+        return {}
+    try:
+        results = ResultsFile.load(results_path)
+    except ValueError:
+        return {}
+    return {uri: bench["stats"] for uri, bench in results.benchmarks_by_uri.items()}
+
+
+def print_trends(store: HistoryStore, pattern: str, runs: int) -> bool:
+    """Print the trend of the benchmarks matching the pattern.
+
+    Returns:
+        Whether a benchmark was found
+    """
+    uris = store.find_uris(pattern)
+    console = Console()
+    for uri in uris:
+        table = Table(title=escape(uri))
+
+        table.add_column("Run", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Commit", justify="right")
+        table.add_column("Environment", justify="right")
+        table.add_column("Median", justify="right", style="green bold")
+        table.add_column("Change", justify="right")
+        table.add_column("Rel. StdDev", justify="right")
+        table.add_column("Rounds", justify="right")
+
+        previous: TrendPoint | None = None
+        for point in store.trend(uri, runs):
+            change = Text("-")
+            if previous is not None:
+                ratio = point.median_ns / previous.median_ns - 1
+                change = Text(f"{ratio * 100:+.1f}%")
+                if previous.environment != point.environment:
+                    # Not comparable, the interpreter or the dependencies changed
+                    change.stylize("dim")
+            table.add_row(
+                datetime.fromtimestamp(point.timestamp).strftime("%Y-%m-%d %H:%M:%S"),
+                point.git_commit[:8] if point.git_commit else "-",
+                point.environment[:8],
+                format_time(point.median_ns),
+                change,
+                f"{point.stdev_ns / point.mean_ns * 100:.1f}%"
+                if point.mean_ns
+                else "-",
+                f"{point.rounds:,}",
+            )
+            previous = point
+        console.print(table)
+    return bool(uris)
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import os
 from abc import ABCMeta, abstractmethod
 from enum import Enum
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from pathlib import Path
     from typing import Any, Callable, ClassVar, TypeVar
 
     import pytest
     from typing_extensions import ParamSpec
 
-    from pytest_codspeed.config import BenchmarkMarkerOptions, PedanticOptions
+    from pytest_codspeed.budget import TimePlan
+    from pytest_codspeed.config import (
+        BenchmarkMarkerOptions,
+        CompareOptions,
+        PedanticOptions,
+    )
     from pytest_codspeed.plugin import CodSpeedConfig
 
     T = TypeVar("T")
@@ -46,6 +53,40 @@ class Instrument(metaclass=ABCMeta):
         uri: str,
     ) -> T: ...
 
+    def measure_compare(
+        self,
+        marker_options: BenchmarkMarkerOptions,
+        compare_options: CompareOptions,
+        name: str,
+        uri: str,
+    ) -> tuple[Any, Any]:
+        """Measure a baseline and a candidate implementation of the same function.
+
+        By default, they are measured one after the other, as two benchmarks.
+
+        Returns:
+            The results of the baseline and of the candidate
+        """
+        args, kwargs = compare_options.args, compare_options.kwargs
+        return (
+            self.measure(
+                marker_options,
+                compare_variant(name, "baseline"),
+                compare_variant(uri, "baseline"),
+                compare_options.baseline,
+                *args,
+                **kwargs,
+            ),
+            self.measure(
+                marker_options,
+                compare_variant(name, "candidate"),
+                compare_variant(uri, "candidate"),
+                compare_options.candidate,
+                *args,
+                **kwargs,
+            ),
+        )
+
     @abstractmethod
     def report(self, session: pytest.Session) -> None: ...
 
@@ -54,6 +95,40 @@ class Instrument(metaclass=ABCMeta):
         self,
     ) -> dict[str, Any]: ...
 
+    def pop_finished_benchmarks(self) -> list[dict[str, Any]]:
+        """The results of the benchmarks finished since the previous call, as in
+        the results file, so that they can be streamed."""
+        return []
+
+    def set_time_plan(self, plan: dict[str, TimePlan]) -> None:
+        """Set the time planned for each benchmark by URI, out of the budget of the
+        session. Only followed in walltime mode."""
+
+    def run_deferred(self) -> None:
+        """Run the measurements deferred to the end of the session, if any.
+
+        Called before the report.
+        """
+
+    def write_raw_samples(self, path: Path) -> dict[str, Any] | None:
+        """Write the raw samples recorded during the session to a binary file.
+
+        Must be called before get_result_dict, which then references the samples of
+        each benchmark in the file.
+
+        Returns:
+            A description of the file, or None if there was nothing to write
+        """
+        return None
+
+
+def compare_variant(name: str, variant: str) -> str:
+    """The name or the URI of a variant of a compared benchmark, e.g. "test[candidate]"
+    or "test[1-candidate]" for a parametrized one."""
+    if name.endswith("]"):
+        return f"{name[:-1]}-{variant}]"
+    return f"{name}[{variant}]"
+
 
 class MeasurementMode(str, Enum):
     Simulation = "simulation"
@@ -72,8 +147,12 @@ def get_instrument_from_mode(mode: MeasurementMode) -> type[Instrument]:
     from pytest_codspeed.instruments.analysis import (
         AnalysisInstrument,
     )
+    from pytest_codspeed.instruments.memory import LocalMemoryInstrument
     from pytest_codspeed.instruments.walltime import WallTimeInstrument
 
+    if mode == MeasurementMode.Memory and os.environ.get("CODSPEED_ENV") is None:
+        # The runner hooks are not available, profile the memory locally instead
+        return LocalMemoryInstrument
     if mode in (MeasurementMode.Simulation, MeasurementMode.Memory):
         return AnalysisInstrument
     else:
@@ -5,6 +5,7 @@ import warnings
 from typing import TYPE_CHECKING
 
 from pytest_codspeed import __semver_version__
+from pytest_codspeed.event_loop import EventLoopRunner, is_coroutine_function
 from pytest_codspeed.instruments import Instrument
 from pytest_codspeed.instruments.hooks import (
     FEATURE_DISABLE_CALLGRIND_MARKERS,
@@ -13,6 +14,7 @@ from pytest_codspeed.instruments.hooks import (
 from pytest_codspeed.utils import SUPPORTS_PERF_TRAMPOLINE
 
 if TYPE_CHECKING:
+    from collections.abc import Coroutine
     from typing import Any, Callable
 
     from pytest import Session
@@ -28,6 +30,7 @@ class AnalysisInstrument(Instrument):
     mode: MeasurementMode
 
     def __init__(self, config: CodSpeedConfig, mode: MeasurementMode) -> None:
+        self.config = config
         self.mode = mode
         self.benchmark_count = 0
         try:
@@ -69,6 +72,10 @@ class AnalysisInstrument(Instrument):
     ) -> T:
         self.benchmark_count += 1
 
+        if is_coroutine_function(fn):
+            with EventLoopRunner(self.config.asyncio_loop_factory) as event_loop:
+                return self._measure_coroutine(event_loop, uri, fn, args, kwargs)
+
         if not self.instrument_hooks:
             return fn(*args, **kwargs)
 
@@ -93,6 +100,54 @@ class AnalysisInstrument(Instrument):
             self.instrument_hooks.stop_benchmark()
             self.instrument_hooks.set_executed_benchmark(uri)
 
+    def _measure_coroutine(
+        self,
+        event_loop: EventLoopRunner,
+        uri: str,
+        fn: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        async def __codspeed_root_frame__() -> Any:
+            return await fn(*args, **kwargs)
+
+        if not self.instrument_hooks:
+            return event_loop.run(__codspeed_root_frame__())
+
+        if SUPPORTS_PERF_TRAMPOLINE:
+            # Warmup CPython performance map cache
+            event_loop.run(__codspeed_root_frame__())
+
+        return self._run_instrumented_coroutine(
+            event_loop, uri, __codspeed_root_frame__
+        )
+
+    def _run_instrumented_coroutine(
+        self,
+        event_loop: EventLoopRunner,
+        uri: str,
+        root_frame: Callable[[], Coroutine[Any, Any, T]],
+    ) -> T:
+        assert self.instrument_hooks is not None
+        lib = self.instrument_hooks.lib
+
+        async def instrumented() -> T:
+            # Started once running on the loop, so that only the awaited body (and
+            # the loop work it triggers when it suspends) is instrumented
+            lib.callgrind_start_instrumentation()
+            try:
+                return await root_frame()
+            finally:
+                lib.callgrind_stop_instrumentation()
+
+        self.instrument_hooks.set_feature(FEATURE_DISABLE_CALLGRIND_MARKERS, True)
+        self.instrument_hooks.start_benchmark()
+        try:
+            return event_loop.run(instrumented())
+        finally:
+            self.instrument_hooks.stop_benchmark()
+            self.instrument_hooks.set_executed_benchmark(uri)
+
     def measure_pedantic(
         self,
         marker_options: BenchmarkMarkerOptions,
@@ -105,6 +160,12 @@ class AnalysisInstrument(Instrument):
                 f"{self.mode.value.capitalize()} instrument ignores rounds and "
                 "iterations settings in pedantic mode"
             )
+        if is_coroutine_function(pedantic_options.target):
+            with EventLoopRunner(self.config.asyncio_loop_factory) as event_loop:
+                return self._measure_pedantic_coroutine(
+                    event_loop, pedantic_options, uri
+                )
+
         if not self.instrument_hooks:
             args, kwargs = pedantic_options.setup_and_get_args_kwargs()
             out = pedantic_options.target(*args, **kwargs)
@@ -145,6 +206,41 @@ class AnalysisInstrument(Instrument):
 
         return out
 
+    def _measure_pedantic_coroutine(
+        self,
+        event_loop: EventLoopRunner,
+        pedantic_options: PedanticOptions[Any],
+        uri: str,
+    ) -> Any:
+        target = pedantic_options.target
+
+        # Warmup
+        warmup_rounds = (
+            max(pedantic_options.warmup_rounds, 1 if SUPPORTS_PERF_TRAMPOLINE else 0)
+            if self.instrument_hooks
+            else 0
+        )
+        for _ in range(warmup_rounds):
+            args, kwargs = pedantic_options.setup_and_get_args_kwargs()
+            event_loop.run(target(*args, **kwargs))
+            if pedantic_options.teardown is not None:
+                pedantic_options.teardown(*args, **kwargs)
+
+        args, kwargs = pedantic_options.setup_and_get_args_kwargs()
+
+        async def __codspeed_root_frame__() -> Any:
+            return await target(*args, **kwargs)
+
+        try:
+            if not self.instrument_hooks:
+                return event_loop.run(__codspeed_root_frame__())
+            return self._run_instrumented_coroutine(
+                event_loop, uri, __codspeed_root_frame__
+            )
+        finally:
+            if pedantic_options.teardown is not None:
+                pedantic_options.teardown(*args, **kwargs)
+
     def report(self, session: Session) -> None:
         reporter = session.config.pluginmanager.get_plugin("terminalreporter")
         assert reporter is not None, "terminalreporter not found"
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import os
 import platform
 import shlex
@@ -156,42 +157,60 @@ class InstrumentHooks:
     def collect_and_write_python_environment(self) -> None:
         """Collect Python toolchain information and write it to disk."""
         section = "python"
-        set_env = self.set_environment
-
-        # Core identity
-        set_env(section, "version", sys.version.strip())
-        set_env(section, "implementation", sys.implementation.name.strip())
-        set_env(section, "compiler", platform.python_compiler().strip())
-
-        config_vars = sysconfig.get_config_vars()
-
-        # Build arguments as a list
-        config_args = config_vars.get("CONFIG_ARGS", "")
-        if config_args:
-            build_args = [arg.strip() for arg in shlex.split(config_args)]
-            self.set_environment_list(section, "build_args", build_args)
-
-        # Performance-relevant build configuration as "KEY=value" list
-        _SYSCONFIG_KEYS = (
-            "abiflags",
-            "PY_ENABLE_SHARED",
-            "Py_GIL_DISABLED",
-            "Py_DEBUG",
-            "WITH_PYMALLOC",
-            "WITH_MIMALLOC",
-            "WITH_FREELISTS",
-            "HAVE_COMPUTED_GOTOS",
-            "Py_STATS",
-            "Py_TRACE_REFS",
-            "WITH_VALGRIND",
-            "WITH_DTRACE",
-        )
-        config_items = []
-        for key in _SYSCONFIG_KEYS:
-            value = config_vars.get(key)
-            if value is not None:
-                config_items.append(f"{key}={str(value).strip()}")
-        config_items.append(f"perf_trampoline={SUPPORTS_PERF_TRAMPOLINE}")
-        self.set_environment_list(section, "config", config_items)
-
+        values, lists = collect_python_environment()
+        for key, value in values:
+            self.set_environment(section, key, value)
+        for key, items in lists:
+            self.set_environment_list(section, key, list(items))
         self.write_environment()
+
+
+# Performance-relevant build configuration, written as a "KEY=value" list
+_SYSCONFIG_KEYS = (
+    "abiflags",
+    "PY_ENABLE_SHARED",
+    "Py_GIL_DISABLED",
+    "Py_DEBUG",
+    "WITH_PYMALLOC",
+    "WITH_MIMALLOC",
+    "WITH_FREELISTS",
+    "HAVE_COMPUTED_GOTOS",
+    "Py_STATS",
+    "Py_TRACE_REFS",
+    "WITH_VALGRIND",
+    "WITH_DTRACE",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def collect_python_environment() -> tuple[
+    tuple[tuple[str, str], ...], tuple[tuple[str, tuple[str, ...]], ...]
+]:
+    """The Python toolchain information, as values and lists by key.
+
+    It can't change during the life of the process, so it is only collected once.
+    """
+    # Core identity
+    values = (
+        ("version", sys.version.strip()),
+        ("implementation", sys.implementation.name.strip()),
+        ("compiler", platform.python_compiler().strip()),
+    )
+
+    config_vars = sysconfig.get_config_vars()
+    lists = []
+
+    # Build arguments as a list
+    config_args = config_vars.get("CONFIG_ARGS", "")
+    if config_args:
+        build_args = tuple(arg.strip() for arg in shlex.split(config_args))
+        lists.append(("build_args", build_args))
+
+    config_items = []
+    for key in _SYSCONFIG_KEYS:
+        value = config_vars.get(key)
+        if value is not None:
+            config_items.append(f"{key}={str(value).strip()}")
+    config_items.append(f"perf_trampoline={SUPPORTS_PERF_TRAMPOLINE}")
+    lists.append(("config", tuple(config_items)))
+    return values, tuple(lists)
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import os
+import tracemalloc
+import warnings
+from array import array
+from dataclasses import asdict, dataclass
+from statistics import median
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+
+from pytest_codspeed.event_loop import EventLoopRunner, is_coroutine_function
+from pytest_codspeed.instruments import Instrument
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any, Callable
+
+    from pytest import Session
+
+    from pytest_codspeed.config import BenchmarkMarkerOptions, PedanticOptions
+    from pytest_codspeed.instruments import MeasurementMode, P, T
+    from pytest_codspeed.plugin import CodSpeedConfig
+
+# Upper bounds of the allocation pass, which is much slower than the timed rounds
+ALLOCATION_MAX_ITERATIONS = 100
+ALLOCATION_TIME_BUDGET_NS = 500_000_000
+
+# Number of allocation sites kept in the memory profile of a benchmark
+MEMORY_TOP_SITES = 10
+
+_IGNORED_FRAMES = (tracemalloc.Filter(False, tracemalloc.__file__),)
+
+
+@dataclass
+class AllocationStats:
+    """The memory allocated by the benchmark, as traced by tracemalloc."""
+
+    iterations: int
+    """The number of traced iterations."""
+    allocated_bytes: float
+    """
+    The median of the memory allocated by an iteration at its high point. Blocks
+    freed before the others are allocated are not summed up.
+    """
+    retained_bytes: float
+    """The memory still allocated after each iteration, on average."""
+    retained_blocks: float
+    """The memory blocks still allocated after each iteration, on average."""
+    peak_bytes: int
+    """The peak of the memory allocated during the whole pass."""
+
+
+def measure_allocations(
+    run_round: Callable[[int], int], mean_ns: float
+) -> AllocationStats:
+    """Trace the memory allocations of the target, one iteration at a time.
+
+    This is a separate pass made after the timed rounds, since tracing slows down
+    every allocation.
+
+    Args:
+        run_round: Runs a round of the given number of iterations
+        mean_ns: The untraced time of an iteration, used to size the pass
+    """
+    iterations = max(
+        1, min(ALLOCATION_MAX_ITERATIONS, int(ALLOCATION_TIME_BUDGET_NS / mean_ns))
+    )
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        # Preallocated, so that recording the peaks does not allocate
+        iteration_peaks = array("q", bytes(8 * iterations))
+        start_blocks = _count_traced_blocks()
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        peak_bytes = 0
+        for i in range(iterations):
+            before_bytes, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            run_round(1)
+            _, iteration_peak_bytes = tracemalloc.get_traced_memory()
+            iteration_peaks[i] = iteration_peak_bytes - before_bytes
+            peak_bytes = max(peak_bytes, iteration_peak_bytes - start_bytes)
+        end_bytes, _ = tracemalloc.get_traced_memory()
+        end_blocks = _count_traced_blocks()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return AllocationStats(
+        iterations=iterations,
+        allocated_bytes=median(iteration_peaks),
+        retained_bytes=(end_bytes - start_bytes) / iterations,
+        retained_blocks=(end_blocks - start_blocks) / iterations,
+        peak_bytes=peak_bytes,
+    )
+
+
+def _count_traced_blocks() -> int:
+    # The snapshot is only allocated after the traces are copied, and is freed
+    # before the next one, so it is never counted itself
+    snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
+    return len(snapshot.traces)
+
+
+@dataclass
+class AllocationSite:
+    filename: str
+    lineno: int
+    size_bytes: int
+    """The memory allocated by this line and still alive when the benchmark ended."""
+    blocks: int
+
+
+@dataclass
+class MemoryProfile:
+    peak_bytes: int
+    """The peak of the memory allocated while the benchmark ran."""
+    allocated_bytes: int
+    """The memory allocated by the benchmark and still alive when it ended."""
+    allocated_blocks: int
+    top_sites: list[AllocationSite]
+    """The lines that allocated the most memory, by decreasing size."""
+
+
+class MemoryProfiler:
+    """Trace the memory allocated between start and stop, by line.
+
+    tracemalloc only sees the blocks that are alive, so the sites come from the
+    snapshots taken around the benchmark: temporaries freed before it returns only
+    show up in the peak, while its result is still alive and counted.
+    """
+
+    def start(self) -> None:
+        self._was_tracing = tracemalloc.is_tracing()
+        if not self._was_tracing:
+            tracemalloc.start()
+        self._snapshot = _take_snapshot()
+        self._start_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+    def stop(self) -> MemoryProfile:
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        snapshot = _take_snapshot()
+        if not self._was_tracing:
+            tracemalloc.stop()
+        stats = snapshot.compare_to(self._snapshot, "lineno")
+        del self._snapshot
+        top_sites = [
+            AllocationSite(
+                filename=stat.traceback[0].filename,
+                lineno=stat.traceback[0].lineno,
+                size_bytes=stat.size_diff,
+                blocks=stat.count_diff,
+            )
+            for stat in sorted(stats, key=lambda stat: stat.size_diff, reverse=True)[
+                :MEMORY_TOP_SITES
+            ]
+            if stat.size_diff > 0
+        ]
+        return MemoryProfile(
+            peak_bytes=peak_bytes - self._start_bytes,
+            allocated_bytes=sum(stat.size_diff for stat in stats),
+            allocated_blocks=sum(stat.count_diff for stat in stats),
+            top_sites=top_sites,
+        )
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
+
+
+@dataclass
+class MemoryBenchmark:
+    name: str
+    uri: str
+    profile: MemoryProfile
+
+
+class LocalMemoryInstrument(Instrument):
+    """Profile the memory of the benchmarks with tracemalloc.
+
+    Used in memory mode when the CodSpeed runner is not available, so that the
+    memory usage can be inspected locally.
+    """
+
+    instrument = "memory"
+
+    def __init__(self, config: CodSpeedConfig, mode: MeasurementMode) -> None:
+        self.config = config
+        self.mode = mode
+        self.benchmarks: list[MemoryBenchmark] = []
+        self._finished_count = 0
+
+    def get_instrument_config_str_and_warns(self) -> tuple[str, list[str]]:
+        return f"mode: {self.mode.value}, profiler: tracemalloc (local)", []
+
+    def measure(
+        self,
+        marker_options: BenchmarkMarkerOptions,
+        name: str,
+        uri: str,
+        fn: Callable[P, T],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        if not is_coroutine_function(fn):
+            return self._profile(name, uri, lambda: fn(*args, **kwargs))
+        coroutine_fn: Callable[..., Any] = fn
+        with EventLoopRunner(self.config.asyncio_loop_factory) as event_loop:
+            return self._profile(
+                name, uri, lambda: event_loop.run(coroutine_fn(*args, **kwargs))
+            )
+
+    def _profile(self, name: str, uri: str, run: Callable[[], T]) -> T:
+        profiler = MemoryProfiler()
+        profiler.start()
+        try:
+            out = run()
+        finally:
+            # Ensure the tracing is stopped even if the test failed
+            profile = profiler.stop()
+        self.benchmarks.append(MemoryBenchmark(name=name, uri=uri, profile=profile))
+        return out
+
+    def measure_pedantic(
+        self,
+        marker_options: BenchmarkMarkerOptions,
+        pedantic_options: PedanticOptions[T],
+        name: str,
+        uri: str,
+    ) -> T:
+        if pedantic_options.rounds != 1 or pedantic_options.iterations != 1:
+            warnings.warn(
+                f"{self.mode.value.capitalize()} instrument ignores rounds and "
+                "iterations settings in pedantic mode"
+            )
+        target: Callable[..., Any] = pedantic_options.target
+        if not is_coroutine_function(target):
+            return self._profile_pedantic(pedantic_options, name, uri, target)
+        with EventLoopRunner(self.config.asyncio_loop_factory) as event_loop:
+            return self._profile_pedantic(
+                pedantic_options,
+                name,
+                uri,
+                lambda *args, **kwargs: event_loop.run(target(*args, **kwargs)),
+            )
+
+    def _profile_pedantic(
+        self,
+        pedantic_options: PedanticOptions[T],
+        name: str,
+        uri: str,
+        target: Callable[..., T],
+    ) -> T:
+        # Warmup, so that lazy initializations are not profiled
+        for _ in range(pedantic_options.warmup_rounds):
+            args, kwargs = pedantic_options.setup_and_get_args_kwargs()
+            target(*args, **kwargs)
+            if pedantic_options.teardown is not None:
+                pedantic_options.teardown(*args, **kwargs)
+
+        args, kwargs = pedantic_options.setup_and_get_args_kwargs()
+        try:
+            return self._profile(name, uri, lambda: target(*args, **kwargs))
+        finally:
+            if pedantic_options.teardown is not None:
+                pedantic_options.teardown(*args, **kwargs)
+
+    def report(self, session: Session) -> None:
+        reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+        assert reporter is not None, "terminalreporter not found"
+        if self.benchmarks:
+            self._print_memory_table(session.config.rootpath)
+        reporter.write_sep("=", f"{len(self.benchmarks)} benchmarked")
+
+    def _print_memory_table(self, rootpath: Path) -> None:
+        table = Table(title="Memory Profile")
+
+        table.add_column("Benchmark", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Peak memory", justify="right", style="green bold")
+        table.add_column("Allocated", justify="right")
+        table.add_column("Blocks", justify="right")
+        table.add_column("Top allocation site", justify="left")
+
+        for bench in self.benchmarks:
+            profile = bench.profile
+            top_site = (
+                f"{_relative_path(profile.top_sites[0].filename, rootpath)}:"
+                f"{profile.top_sites[0].lineno} "
+                f"({format_bytes(profile.top_sites[0].size_bytes)})"
+                if profile.top_sites
+                else "-"
+            )
+            table.add_row(
+                escape(bench.name),
+                format_bytes(profile.peak_bytes),
+                format_bytes(profile.allocated_bytes),
+                f"{profile.allocated_blocks:,}",
+                escape(top_site),
+            )
+
+        console = Console()
+        print("\n")
+        console.print(table)
+
+    def pop_finished_benchmarks(self) -> list[dict[str, Any]]:
+        finished = self.benchmarks[self._finished_count :]
+        self._finished_count = len(self.benchmarks)
+        return [asdict(bench) for bench in finished]
+
+    def get_result_dict(self) -> dict[str, Any]:
+        return {
+            "instrument": {"type": self.instrument},
+            "benchmarks": [asdict(bench) for bench in self.benchmarks],
+        }
+
+
+def _relative_path(filename: str, rootpath: Path) -> str:
+    try:
+        return os.path.relpath(filename, rootpath)
+    except ValueError:
+        # On another drive, on Windows
+        return filename
+
+
+def format_bytes(size: float) -> str:
+    """Format a memory size in bytes with binary units.
+
+    Examples:
+        >>> format_bytes(512)
+        '512B'
+        >>> format_bytes(1536)
+        '1.5KiB'
+    """
+    if abs(size) < 1024:
+        return f"{size:,.0f}B"
+    for unit in ("KiB", "MiB"):
+        size /= 1024
+        if abs(size) < 1024:
+            return f"{size:,.1f}{unit}"
+    return f"{size / 1024:,.1f}GiB"
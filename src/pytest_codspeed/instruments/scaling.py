@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import multiprocessing
+from dataclasses import dataclass
+from math import ceil
+from statistics import median
+from threading import Barrier, BrokenBarrierError, Thread
+from time import perf_counter_ns
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from multiprocessing.synchronize import Barrier as ProcessBarrier
+    from typing import Callable
+
+# Number of barrier-synchronized rounds run for each worker count
+SCALING_ROUNDS = 5
+
+
+@dataclass
+class ScalingPoint:
+    workers: int
+    ops_per_sec: float
+    """The aggregate throughput of all the workers."""
+    latency_ns: float
+    """The median time of an iteration, as seen by each worker."""
+    efficiency: float
+    """
+    The throughput per worker, relative to the one with the smallest worker count.
+    """
+
+
+def measure_thread_scaling(
+    run_round: Callable[[int], int],
+    thread_counts: Sequence[int],
+    time_budget_ns: float,
+    mean_ns: float,
+) -> list[ScalingPoint]:
+    """Measure the throughput of the target when run concurrently by threads.
+
+    For each thread count, the same total number of iterations is split between the
+    threads, and each round is started and stopped with a barrier so that the
+    threads all run at the same time.
+
+    Args:
+        run_round: Runs a round of the given number of iterations and returns its
+            duration in nanoseconds
+        thread_counts: The numbers of threads to measure
+        time_budget_ns: The total single-threaded time to spend on the measurements
+        mean_ns: The single-threaded time of an iteration, used to size the rounds
+    """
+    total_iterations = time_budget_ns / len(thread_counts) / SCALING_ROUNDS / mean_ns
+    points: list[ScalingPoint] = []
+    for threads in thread_counts:
+        iterations = max(1, ceil(total_iterations / threads))
+        wall_times_ns, thread_times_ns = _run_thread_rounds(
+            run_round, threads, iterations
+        )
+        points.append(
+            _scaling_point(threads, iterations, wall_times_ns, thread_times_ns)
+        )
+    set_efficiencies(points)
+    return points
+
+
+def measure_process_scaling(
+    run_round: Callable[[int], int],
+    process_counts: Sequence[int],
+    time_budget_ns: float,
+    mean_ns: float,
+) -> list[ScalingPoint]:
+    """Measure the throughput of the target when run concurrently by processes.
+
+    For each process count, a pool is forked and warmed up before any measurement,
+    so that neither its startup nor the pickling of the target are measured: the
+    target is inherited by the workers, which time their own rounds after syncing
+    on a barrier.
+
+    Args:
+        run_round: Runs a round of the given number of iterations and returns its
+            duration in nanoseconds
+        process_counts: The numbers of processes to measure
+        time_budget_ns: The total single-process time to spend on the measurements
+        mean_ns: The single-process time of an iteration, used to size the rounds
+
+    Raises:
+        ValueError: If processes can't be forked on this platform
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise ValueError("processes requires the fork start method")
+    context = multiprocessing.get_context("fork")
+    total_iterations = time_budget_ns / len(process_counts) / SCALING_ROUNDS / mean_ns
+    points: list[ScalingPoint] = []
+    for processes in process_counts:
+        iterations = max(1, ceil(total_iterations / processes))
+        barrier = context.Barrier(processes)
+        tasks = [iterations] * processes
+        with context.Pool(
+            processes, initializer=_init_process_worker, initargs=(run_round, barrier)
+        ) as pool:
+            # Unmeasured round, for the workers to start and warm up
+            pool.map(_run_process_round, tasks, chunksize=1)
+            wall_times_ns: list[int] = []
+            process_times_ns: list[int] = []
+            for _ in range(SCALING_ROUNDS):
+                spans = pool.map(_run_process_round, tasks, chunksize=1)
+                # perf_counter is system-wide, so the spans can be compared
+                wall_times_ns.append(
+                    max(end for _, end in spans) - min(start for start, _ in spans)
+                )
+                process_times_ns.extend(end - start for start, end in spans)
+        points.append(
+            _scaling_point(processes, iterations, wall_times_ns, process_times_ns)
+        )
+    set_efficiencies(points)
+    return points
+
+
+def _scaling_point(
+    workers: int,
+    iterations: int,
+    wall_times_ns: Sequence[int],
+    worker_times_ns: Sequence[int],
+) -> ScalingPoint:
+    return ScalingPoint(
+        workers=workers,
+        ops_per_sec=median(
+            workers * iterations * 1e9 / max(wall_time_ns, 1)
+            for wall_time_ns in wall_times_ns
+        ),
+        latency_ns=median(worker_times_ns) / iterations,
+        # Set once all the points are measured
+        efficiency=1.0,
+    )
+
+
+def set_efficiencies(points: list[ScalingPoint]) -> None:
+    baseline = min(points, key=lambda point: point.workers)
+    baseline_per_worker = baseline.ops_per_sec / baseline.workers
+    for point in points:
+        point.efficiency = point.ops_per_sec / point.workers / baseline_per_worker
+
+
+def _run_thread_rounds(
+    run_round: Callable[[int], int], threads: int, iterations: int
+) -> tuple[list[int], list[int]]:
+    """Run the rounds on a pool of threads synchronized with a barrier.
+
+    Returns:
+        The wall time of each round and the time measured by each thread in each
+        round, in nanoseconds
+    """
+    # The main thread takes part in the barrier to time the rounds
+    barrier = Barrier(threads + 1)
+    thread_times_ns: list[int] = []
+    errors: list[BaseException] = []
+
+    def worker() -> None:
+        try:
+            for _ in range(SCALING_ROUNDS):
+                barrier.wait()
+                # list.append is atomic, even without the GIL
+                thread_times_ns.append(run_round(iterations))
+                barrier.wait()
+        except BrokenBarrierError:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            barrier.abort()
+
+    pool = [Thread(target=worker, daemon=True) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    wall_times_ns: list[int] = []
+    try:
+        for _ in range(SCALING_ROUNDS):
+            barrier.wait()
+            start = perf_counter_ns()
+            barrier.wait()
+            wall_times_ns.append(perf_counter_ns() - start)
+    except BrokenBarrierError:
+        pass
+    finally:
+        # Release the workers if the main thread was interrupted
+        barrier.abort()
+        for thread in pool:
+            thread.join()
+    if errors:
+        raise errors[0]
+    return wall_times_ns, thread_times_ns
+
+
+# The state of the process pool workers, set when they start
+_worker_run_round: Callable[[int], int] | None = None
+_worker_barrier: ProcessBarrier | None = None
+
+
+def _init_process_worker(
+    run_round: Callable[[int], int], barrier: ProcessBarrier
+) -> None:
+    global _worker_run_round, _worker_barrier
+    _worker_run_round = run_round
+    _worker_barrier = barrier
+
+
+def _run_process_round(iterations: int) -> tuple[int, int]:
+    """Run a round in a pool worker, once all the workers are ready.
+
+    Each worker blocks on the barrier until the others have joined, so every task of
+    a round runs in a different worker.
+
+    Returns:
+        The start and end times of the round, in nanoseconds
+    """
+    assert _worker_run_round is not None and _worker_barrier is not None
+    _worker_barrier.wait()
+    start = perf_counter_ns()
+    _worker_run_round(iterations)
+    return start, perf_counter_ns()
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import os
+import random
+import sys
 import warnings
-from dataclasses import asdict, dataclass
-from math import ceil
-from statistics import mean, quantiles, stdev
-from time import get_clock_info, perf_counter_ns
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from math import ceil, fsum, sqrt
+from statistics import median, stdev
+from time import get_clock_info, perf_counter_ns, process_time_ns, thread_time_ns
 from typing import TYPE_CHECKING
 
 from rich.console import Console
@@ -14,20 +19,47 @@ from rich.table import Table
 from rich.text import Text
 
 from pytest_codspeed import __semver_version__
-from pytest_codspeed.instruments import Instrument
+from pytest_codspeed.cpu_isolation import format_cpu_list, read_cpu_migrations
+from pytest_codspeed.event_loop import EventLoopRunner, is_coroutine_function
+from pytest_codspeed.gc_policy import DEFAULT_GC_POLICY, GcMonitor, apply_gc_policy
+from pytest_codspeed.instruments import Instrument, compare_variant
 from pytest_codspeed.instruments.hooks import InstrumentHooks
+from pytest_codspeed.instruments.memory import format_bytes, measure_allocations
+from pytest_codspeed.instruments.scaling import (
+    measure_process_scaling,
+    measure_thread_scaling,
+)
+from pytest_codspeed.stats import (
+    StreamingStats,
+    bootstrap_confidence_intervals,
+    compare_samples,
+    fit_complexity,
+    relative_median_precision,
+)
 from pytest_codspeed.utils import SUPPORTS_PERF_TRAMPOLINE
 
+if sys.platform != "win32":
+    import resource
+
 if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from pathlib import Path
     from typing import Any, Callable
 
     from pytest import Session
 
-    from pytest_codspeed.config import PedanticOptions
+    from pytest_codspeed.budget import TimePlan
+    from pytest_codspeed.config import CompareOptions, PedanticOptions
+    from pytest_codspeed.gc_policy import GcStats
     from pytest_codspeed.instruments import MeasurementMode, P, T
+    from pytest_codspeed.instruments.memory import AllocationStats
+    from pytest_codspeed.instruments.scaling import ScalingPoint
     from pytest_codspeed.plugin import BenchmarkMarkerOptions, CodSpeedConfig
+    from pytest_codspeed.stats import ComplexityFit
 
 DEFAULT_WARMUP_TIME_NS = 1_000_000_000
+# With the steady warmup strategy, the warmup usually ends much earlier
+DEFAULT_STEADY_WARMUP_MAX_TIME_NS = 5_000_000_000
 DEFAULT_MAX_TIME_NS = 3_000_000_000
 TIMER_RESOLUTION_NS = get_clock_info("perf_counter").resolution * 1e9
 DEFAULT_MIN_ROUND_TIME_NS = int(TIMER_RESOLUTION_NS * 1_000_000)
@@ -35,13 +67,49 @@ DEFAULT_MIN_ROUND_TIME_NS = int(TIMER_RESOLUTION_NS * 1_000_000)
 IQR_OUTLIER_FACTOR = 1.5
 STDEV_OUTLIER_FACTOR = 3
 
+# Above this, the samples array grows as rounds are recorded instead of being
+# preallocated, avoiding huge allocations for very short rounds
+MAX_PREALLOCATED_ROUNDS = 1_000_000
+
+CALIBRATION_ROUNDS = 20
+# A benchmark is reported as indistinguishable from the harness overhead when its
+# corrected median is within this many standard deviations of the measurement noise
+OVERHEAD_NOISE_FACTOR = 3
+
+# Warmup iterations are compared by windows of this size to detect a steady state
+WARMUP_WINDOW = 16
+# The relative change of the median between two windows below which the timings
+# are considered steady
+WARMUP_STEADY_TOLERANCE = 0.05
+
+# Seed of the random order of the interleaved rounds, for reproducible schedules
+INTERLEAVE_SEED = 0
+
+# Minimum number of rounds before checking if the target precision is reached
+PRECISION_MIN_ROUNDS = 20
+# The precision is checked again once the round count has grown by this factor
+PRECISION_CHECK_GROWTH = 1.1
+
+# Compared variants need a few rounds each for their confidence intervals
+COMPARE_MIN_ROUNDS = 2
+COMPARE_SIGNIFICANCE_LEVEL = 0.05
+
 
 @dataclass
 class BenchmarkConfig:
     warmup_time_ns: int
+    """The warmup time, or its upper bound with the steady strategy."""
     min_round_time_ns: float
     max_time_ns: int
     max_rounds: int | None
+    target_precision: float | None
+    threads: tuple[int, ...] | None = None
+    processes: tuple[int, ...] | None = None
+    warmup_strategy: str = "fixed"
+    gc_policy: str = DEFAULT_GC_POLICY
+    size_param: str | None = None
+    size: float | None = None
+    sweep_params: str | None = None
 
     @classmethod
     def from_codspeed_config_and_marker_data(
@@ -66,14 +134,84 @@ class BenchmarkConfig:
         else:
             min_round_time_ns = DEFAULT_MIN_ROUND_TIME_NS
 
+        if config.warmup_time_ns is not None:
+            warmup_time_ns = config.warmup_time_ns
+        elif config.warmup_strategy == "steady":
+            warmup_time_ns = DEFAULT_STEADY_WARMUP_MAX_TIME_NS
+        else:
+            warmup_time_ns = DEFAULT_WARMUP_TIME_NS
+
         return cls(
-            warmup_time_ns=config.warmup_time_ns
-            if config.warmup_time_ns is not None
-            else DEFAULT_WARMUP_TIME_NS,
+            warmup_time_ns=warmup_time_ns,
+            warmup_strategy=config.warmup_strategy,
+            gc_policy=marker_data.gc or config.gc_policy or DEFAULT_GC_POLICY,
             min_round_time_ns=min_round_time_ns,
             max_time_ns=max_time_ns,
             max_rounds=max_rounds,
+            target_precision=marker_data.target_precision
+            if marker_data.target_precision is not None
+            else config.target_precision,
+            threads=marker_data.threads,
+            processes=marker_data.processes,
+            size_param=marker_data.size_param,
+            size=marker_data.size,
+            sweep_params=marker_data.sweep_params,
+        )
+
+
+@dataclass
+class ResourceUsage:
+    """The resources used by the process while running the timed rounds."""
+
+    cpu_time_ns: float
+    """The process CPU time (user and system) per iteration."""
+    thread_time_ns: float
+    """The CPU time of the benchmarking thread per iteration."""
+    voluntary_context_switches: int | None = None
+    """
+    The total over all the rounds, None when not available on the platform, as well
+    as the other counters.
+    """
+    involuntary_context_switches: int | None = None
+    minor_page_faults: int | None = None
+    major_page_faults: int | None = None
+    cpu_migrations: int | None = None
+    """The moves of the benchmarking thread to another CPU, None when unknown."""
+
+
+class ResourceUsageMeter:
+    """Measure the resources used between start and stop."""
+
+    def start(self) -> None:
+        self._process_start_ns = process_time_ns()
+        self._thread_start_ns = thread_time_ns()
+        self._rusage_start = _getrusage()
+        self._migrations_start = read_cpu_migrations()
+
+    def stop(self, iterations: int) -> ResourceUsage:
+        thread_time = thread_time_ns() - self._thread_start_ns
+        process_time = process_time_ns() - self._process_start_ns
+        usage = ResourceUsage(
+            cpu_time_ns=process_time / iterations,
+            thread_time_ns=thread_time / iterations,
         )
+        migrations_end = read_cpu_migrations()
+        if self._migrations_start is not None and migrations_end is not None:
+            usage.cpu_migrations = migrations_end - self._migrations_start
+        start, end = self._rusage_start, _getrusage()
+        if start is not None and end is not None:
+            usage.voluntary_context_switches = end.ru_nvcsw - start.ru_nvcsw
+            usage.involuntary_context_switches = end.ru_nivcsw - start.ru_nivcsw
+            usage.minor_page_faults = end.ru_minflt - start.ru_minflt
+            usage.major_page_faults = end.ru_majflt - start.ru_majflt
+        return usage
+
+
+def _getrusage() -> Any:
+    if sys.platform == "win32":
+        return None
+    # Only count the benchmarking thread when the platform allows it
+    return resource.getrusage(getattr(resource, "RUSAGE_THREAD", resource.RUSAGE_SELF))
 
 
 @dataclass
@@ -93,56 +231,475 @@ class BenchmarkStats:
     stdev_outlier_rounds: int
     iter_per_round: int
     warmup_iters: int
+    warmup_steady: bool | None = None
+    """
+    Whether the warmup ended on a steady state, None with the fixed warmup strategy.
+    """
+
+    overhead_ns: float | None = None
+    """
+    The per-iteration cost of the benchmark harness itself, None when no calibration
+    was made (e.g. in pedantic mode).
+    """
+    overhead_stdev_ns: float | None = None
+    corrected_min_ns: float | None = None
+    corrected_median_ns: float | None = None
+    corrected_mean_ns: float | None = None
+
+    median_ci_ns: tuple[float, float] | None = None
+    """
+    The bootstrap confidence interval of the median, None when it was not computed.
+    """
+    mean_ci_ns: tuple[float, float] | None = None
+
+    resource_usage: ResourceUsage | None = None
+    gc: GcStats | None = None
+
+    def add_bootstrap_intervals(
+        self, times_per_round_ns: Sequence[float], resamples: int
+    ) -> None:
+        (median_low, median_high), (mean_low, mean_high) = (
+            bootstrap_confidence_intervals(times_per_round_ns, resamples)
+        )
+        self.median_ci_ns = (
+            median_low / self.iter_per_round,
+            median_high / self.iter_per_round,
+        )
+        self.mean_ci_ns = (
+            mean_low / self.iter_per_round,
+            mean_high / self.iter_per_round,
+        )
+
+    @property
+    def is_within_overhead_noise(self) -> bool:
+        if self.corrected_median_ns is None or self.overhead_stdev_ns is None:
+            return False
+        # Both the harness and the benchmark dispersion contribute to the noise, and
+        # nothing below the timer resolution can be told apart from zero
+        noise_ns = OVERHEAD_NOISE_FACTOR * sqrt(
+            self.overhead_stdev_ns**2 + self.stdev_ns**2
+        )
+        return self.corrected_median_ns <= noise_ns + (
+            TIMER_RESOLUTION_NS / self.iter_per_round
+        )
 
     @classmethod
     def from_list(
         cls,
-        times_per_round_ns: list[float],
+        times_per_round_ns: Sequence[float],
         *,
         rounds: int,
         iter_per_round: int,
         warmup_iters: int,
         total_time: float,
+        warmup_steady: bool | None = None,
+        overhead_ns: float | None = None,
+        overhead_stdev_ns: float | None = None,
+        resource_usage: ResourceUsage | None = None,
+        gc: GcStats | None = None,
     ) -> BenchmarkStats:
-        times_ns = [t / iter_per_round for t in times_per_round_ns]
-        stdev_ns = stdev(times_ns) if len(times_ns) > 1 else 0
-        mean_ns = mean(times_ns)
-        if len(times_ns) > 1:
-            q1_ns, median_ns, q3_ns = quantiles(times_ns, n=4)
+        # Statistics are computed on the per-round times and scaled afterwards, so the
+        # samples are only copied once, for sorting
+        sorted_times = sorted(times_per_round_ns)
+        n = len(sorted_times)
+        mean_round_ns = fsum(sorted_times) / n
+        stdev_round_ns = (
+            sqrt(fsum((t - mean_round_ns) ** 2 for t in sorted_times) / (n - 1))
+            if n > 1
+            else 0.0
+        )
+        if n > 1:
+            q1_round_ns, median_round_ns, q3_round_ns = _quartiles(sorted_times)
         else:
-            q1_ns, median_ns, q3_ns = (
-                mean_ns,
-                mean_ns,
-                mean_ns,
-            )
-        iqr_ns = q3_ns - q1_ns
-        iqr_outlier_rounds = sum(
-            1
-            for t in times_ns
-            if t < q1_ns - IQR_OUTLIER_FACTOR * iqr_ns
-            or t > q3_ns + IQR_OUTLIER_FACTOR * iqr_ns
+            q1_round_ns = median_round_ns = q3_round_ns = mean_round_ns
+        iqr_round_ns = q3_round_ns - q1_round_ns
+        iqr_outlier_rounds = _count_outside(
+            sorted_times,
+            q1_round_ns - IQR_OUTLIER_FACTOR * iqr_round_ns,
+            q3_round_ns + IQR_OUTLIER_FACTOR * iqr_round_ns,
         )
-        stdev_outlier_rounds = sum(
-            1
-            for t in times_ns
-            if t < mean_ns - STDEV_OUTLIER_FACTOR * stdev_ns
-            or t > mean_ns + STDEV_OUTLIER_FACTOR * stdev_ns
+        stdev_outlier_rounds = _count_outside(
+            sorted_times,
+            mean_round_ns - STDEV_OUTLIER_FACTOR * stdev_round_ns,
+            mean_round_ns + STDEV_OUTLIER_FACTOR * stdev_round_ns,
         )
 
-        return cls(
-            min_ns=min(times_ns),
-            max_ns=max(times_ns),
-            stdev_ns=stdev_ns,
-            mean_ns=mean_ns,
-            q1_ns=q1_ns,
-            median_ns=median_ns,
-            q3_ns=q3_ns,
+        return cls._from_round_stats(
+            min_round_ns=sorted_times[0],
+            max_round_ns=sorted_times[-1],
+            mean_round_ns=mean_round_ns,
+            stdev_round_ns=stdev_round_ns,
+            q1_round_ns=q1_round_ns,
+            median_round_ns=median_round_ns,
+            q3_round_ns=q3_round_ns,
             rounds=rounds,
             total_time=total_time,
             iqr_outlier_rounds=iqr_outlier_rounds,
             stdev_outlier_rounds=stdev_outlier_rounds,
             iter_per_round=iter_per_round,
             warmup_iters=warmup_iters,
+            warmup_steady=warmup_steady,
+            overhead_ns=overhead_ns,
+            overhead_stdev_ns=overhead_stdev_ns,
+            resource_usage=resource_usage,
+            gc=gc,
+        )
+
+    @classmethod
+    def from_streaming(
+        cls,
+        streaming_stats: StreamingStats,
+        *,
+        iter_per_round: int,
+        warmup_iters: int,
+        total_time: float,
+        warmup_steady: bool | None = None,
+        overhead_ns: float | None = None,
+        overhead_stdev_ns: float | None = None,
+        resource_usage: ResourceUsage | None = None,
+        gc: GcStats | None = None,
+    ) -> BenchmarkStats:
+        running = streaming_stats.running
+        return cls._from_round_stats(
+            min_round_ns=running.min,
+            max_round_ns=running.max,
+            mean_round_ns=running.mean,
+            stdev_round_ns=running.stdev,
+            q1_round_ns=streaming_stats.q1.value,
+            median_round_ns=streaming_stats.median.value,
+            q3_round_ns=streaming_stats.q3.value,
+            rounds=streaming_stats.count,
+            total_time=total_time,
+            iqr_outlier_rounds=streaming_stats.iqr_outliers,
+            stdev_outlier_rounds=streaming_stats.stdev_outliers,
+            iter_per_round=iter_per_round,
+            warmup_iters=warmup_iters,
+            warmup_steady=warmup_steady,
+            overhead_ns=overhead_ns,
+            overhead_stdev_ns=overhead_stdev_ns,
+            resource_usage=resource_usage,
+            gc=gc,
+        )
+
+    @classmethod
+    def _from_round_stats(
+        cls,
+        *,
+        min_round_ns: float,
+        max_round_ns: float,
+        mean_round_ns: float,
+        stdev_round_ns: float,
+        q1_round_ns: float,
+        median_round_ns: float,
+        q3_round_ns: float,
+        iter_per_round: int,
+        overhead_ns: float | None,
+        **kwargs: Any,
+    ) -> BenchmarkStats:
+        """Build the per-iteration stats from statistics computed on whole rounds."""
+        min_ns = min_round_ns / iter_per_round
+        mean_ns = mean_round_ns / iter_per_round
+        median_ns = median_round_ns / iter_per_round
+        if overhead_ns is not None:
+            corrected_min_ns: float | None = max(min_ns - overhead_ns, 0.0)
+            corrected_median_ns: float | None = max(median_ns - overhead_ns, 0.0)
+            corrected_mean_ns: float | None = max(mean_ns - overhead_ns, 0.0)
+        else:
+            corrected_min_ns = corrected_median_ns = corrected_mean_ns = None
+
+        return cls(
+            min_ns=min_ns,
+            max_ns=max_round_ns / iter_per_round,
+            stdev_ns=stdev_round_ns / iter_per_round,
+            mean_ns=mean_ns,
+            q1_ns=q1_round_ns / iter_per_round,
+            median_ns=median_ns,
+            q3_ns=q3_round_ns / iter_per_round,
+            iter_per_round=iter_per_round,
+            overhead_ns=overhead_ns,
+            corrected_min_ns=corrected_min_ns,
+            corrected_median_ns=corrected_median_ns,
+            corrected_mean_ns=corrected_mean_ns,
+            **kwargs,
+        )
+
+
+def _quartiles(sorted_data: Sequence[float]) -> tuple[float, float, float]:
+    """Same as statistics.quantiles(data, n=4), on already sorted data."""
+    ld = len(sorted_data)
+    m = ld + 1
+    result = []
+    for i in range(1, 4):
+        j = min(max(i * m // 4, 1), ld - 1)
+        delta = i * m - j * 4
+        result.append((sorted_data[j - 1] * (4 - delta) + sorted_data[j] * delta) / 4)
+    return result[0], result[1], result[2]
+
+
+def _count_outside(sorted_data: Sequence[float], low: float, high: float) -> int:
+    return (
+        bisect_left(sorted_data, low)
+        + len(sorted_data)
+        - bisect_right(sorted_data, high)
+    )
+
+
+def make_round_runner(
+    fn: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    event_loop: EventLoopRunner | None = None,
+) -> Callable[[int], int]:
+    """Build a function running a round with the given number of iterations of the
+    target, and returning its duration in nanoseconds.
+
+    Coroutine functions are awaited on the event loop, the whole round running as a
+    single task so that only the cost of an await is added to each iteration.
+    """
+    if event_loop is not None:
+        return _make_coroutine_round_runner(fn, args, kwargs, event_loop)
+
+    def __codspeed_root_frame__() -> Any:
+        return fn(*args, **kwargs)
+
+    def run_round(iterations: int) -> int:
+        iter_range = range(iterations)
+        start = perf_counter_ns()
+        for _ in iter_range:
+            __codspeed_root_frame__()
+        return perf_counter_ns() - start
+
+    return run_round
+
+
+def _make_coroutine_round_runner(
+    fn: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    event_loop: EventLoopRunner,
+) -> Callable[[int], int]:
+    async def __codspeed_root_frame__() -> Any:
+        return await fn(*args, **kwargs)
+
+    async def run_round_coroutine(iterations: int) -> int:
+        iter_range = range(iterations)
+        start = perf_counter_ns()
+        for _ in iter_range:
+            await __codspeed_root_frame__()
+        return perf_counter_ns() - start
+
+    def run_round(iterations: int) -> int:
+        return event_loop.run(run_round_coroutine(iterations))
+
+    return run_round
+
+
+def _noop(*args: Any, **kwargs: Any) -> None:
+    pass
+
+
+async def _async_noop(*args: Any, **kwargs: Any) -> None:
+    pass
+
+
+def calibrate_overhead(
+    iter_per_round: int,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    event_loop: EventLoopRunner | None = None,
+) -> tuple[float, float]:
+    """Measure the per-iteration cost of the measurement loop.
+
+    An empty target is called with the same arguments and through the same frame and
+    loop shape as the benchmarked function. For coroutine functions, this includes
+    the cost of creating and awaiting a coroutine.
+
+    Returns:
+        The median and the standard deviation of the per-iteration overhead (in ns)
+    """
+    run_round = make_round_runner(
+        _noop if event_loop is None else _async_noop, args, kwargs, event_loop
+    )
+    times_ns = [run_round(iter_per_round) for _ in range(CALIBRATION_ROUNDS)]
+    per_iteration_ns = [t / iter_per_round for t in times_ns]
+    return median(per_iteration_ns), stdev(per_iteration_ns)
+
+
+class RoundSamples:
+    """Round times stored in an array preallocated from the planned round count."""
+
+    def __init__(self, planned_rounds: int) -> None:
+        self.buffer = array(
+            "q", bytes(8 * min(planned_rounds, MAX_PREALLOCATED_ROUNDS))
+        )
+        self.count = 0
+
+    def add(self, round_time_ns: int) -> None:
+        if self.count < len(self.buffer):
+            self.buffer[self.count] = round_time_ns
+        else:
+            self.buffer.append(round_time_ns)
+        self.count += 1
+
+    def samples(self) -> array[int]:
+        """The recorded round times, dropping the unused preallocated space."""
+        del self.buffer[self.count :]
+        return self.buffer
+
+
+def summarize_rounds(
+    recorder: StreamingStats | RoundSamples, **stats_kwargs: Any
+) -> tuple[BenchmarkStats, array[int] | None]:
+    """Compute the stats of the recorded rounds, along with the raw samples if
+    they were stored."""
+    if isinstance(recorder, StreamingStats):
+        return BenchmarkStats.from_streaming(recorder, **stats_kwargs), None
+    samples = recorder.samples()
+    stats = BenchmarkStats.from_list(samples, rounds=len(samples), **stats_kwargs)
+    return stats, samples
+
+
+def warn_if_within_overhead_noise(name: str, stats: BenchmarkStats) -> None:
+    if stats.is_within_overhead_noise:
+        warnings.warn(
+            f"Benchmark {name!r} ({format_time(stats.median_ns)}) is within the "
+            "noise of the harness overhead "
+            f"({format_time(stats.overhead_ns or 0)}), its time is not meaningful",
+            RuntimeWarning,
+        )
+
+
+@dataclass
+class Warmup:
+    iters: int
+    mean_ns: float
+    """The mean time of an iteration, at the end of the warmup when it is steady."""
+    steady: bool | None
+
+
+class SteadyStateDetector:
+    """Detect when iteration times stop drifting.
+
+    The times are split into consecutive windows, and they are considered steady
+    once the medians of two consecutive windows are within a relative tolerance.
+    """
+
+    def __init__(
+        self, window: int = WARMUP_WINDOW, tolerance: float = WARMUP_STEADY_TOLERANCE
+    ) -> None:
+        self.window = window
+        self.tolerance = tolerance
+        self.window_times_ns: list[int] = []
+        self.previous_median_ns: float | None = None
+        self.window_mean_ns = 0.0
+
+    def is_steady(self, time_ns: int) -> bool:
+        self.window_times_ns.append(time_ns)
+        if len(self.window_times_ns) < self.window:
+            return False
+        current_median_ns = median(self.window_times_ns)
+        self.window_mean_ns = fsum(self.window_times_ns) / self.window
+        self.window_times_ns = []
+        previous_median_ns, self.previous_median_ns = (
+            self.previous_median_ns,
+            current_median_ns,
+        )
+        return (
+            previous_median_ns is not None
+            and abs(current_median_ns - previous_median_ns)
+            <= self.tolerance * previous_median_ns
+        )
+
+
+def run_warmup(
+    run_round: Callable[[int], int], warmup_time_ns: int, strategy: str
+) -> Warmup:
+    """Run the target until the warmup time is elapsed or, with the steady strategy,
+    until its timings are steady."""
+    detector = SteadyStateDetector() if strategy == "steady" else None
+    iters = 0
+    total_ns = 0
+    start = perf_counter_ns()
+    while True:
+        time_ns = run_round(1)
+        iters += 1
+        total_ns += time_ns
+        if detector is not None and detector.is_steady(time_ns):
+            return Warmup(iters=iters, mean_ns=detector.window_mean_ns, steady=True)
+        if perf_counter_ns() - start > warmup_time_ns:
+            break
+    return Warmup(
+        iters=iters,
+        mean_ns=total_ns / iters,
+        steady=None if detector is None else False,
+    )
+
+
+class PrecisionTarget:
+    """Decides when enough rounds were run to reach a target precision.
+
+    Rounds are kept sorted as they come in, so that each check only costs a few
+    lookups and does not weigh on the measured region. With streaming statistics,
+    nothing is stored and their approximate precision is used instead. Without a
+    precision, the target is never reached.
+    """
+
+    def __init__(
+        self, precision: float | None, streaming_stats: StreamingStats | None = None
+    ) -> None:
+        self.precision = precision
+        self.streaming_stats = streaming_stats
+        self.sorted_times_ns: list[float] = []
+        self.next_check = PRECISION_MIN_ROUNDS
+
+    def is_reached(self, round_time_ns: float) -> bool:
+        if self.precision is None:
+            return False
+        if self.streaming_stats is None:
+            insort(self.sorted_times_ns, round_time_ns)
+            rounds = len(self.sorted_times_ns)
+        else:
+            rounds = self.streaming_stats.count
+        if rounds < self.next_check:
+            return False
+        if self._current_precision() <= self.precision:
+            return True
+        self.next_check = ceil(rounds * PRECISION_CHECK_GROWTH)
+        return False
+
+    def _current_precision(self) -> float:
+        if self.streaming_stats is not None:
+            return self.streaming_stats.relative_median_precision()
+        return relative_median_precision(self.sorted_times_ns, is_sorted=True)
+
+
+@dataclass
+class PendingRounds:
+    """The timed rounds of a benchmark, run at once or interleaved with others."""
+
+    name: str
+    uri: str
+    config: BenchmarkConfig
+    run_round: Callable[[int], int]
+    rounds: int
+    iter_per_round: int
+    recorder: StreamingStats | RoundSamples
+    precision_target: PrecisionTarget
+    warmup: Warmup
+    overhead_ns: float
+    overhead_stdev_ns: float
+    elapsed_ns: int = 0
+    """The sum of the round times."""
+
+    def run_next_round(self) -> bool:
+        """Run a round and tell whether the benchmark is done."""
+        round_time_ns = self.run_round(self.iter_per_round)
+        self.recorder.add(round_time_ns)
+        self.elapsed_ns += round_time_ns
+        return (
+            self.recorder.count >= self.rounds
+            or self.elapsed_ns > self.config.max_time_ns
+            or self.precision_target.is_reached(round_time_ns)
         )
 
 
@@ -153,6 +710,78 @@ class Benchmark:
 
     config: BenchmarkConfig
     stats: BenchmarkStats
+    thread_scaling: list[ScalingPoint] | None = None
+    process_scaling: list[ScalingPoint] | None = None
+    allocations: AllocationStats | None = None
+    comparison: Comparison | None = None
+    """The comparison this benchmark is a variant of, shared by both variants."""
+
+
+@dataclass
+class Comparison:
+    """A candidate implementation compared to a baseline, in the same process."""
+
+    name: str
+    baseline_uri: str
+    candidate_uri: str
+    ratio: float
+    """The median time of the candidate over the one of the baseline."""
+    ratio_ci: tuple[float, float]
+    p_value: float
+    significant: bool
+    """Whether the times differ at the COMPARE_SIGNIFICANCE_LEVEL."""
+
+
+@dataclass
+class ComplexitySweep:
+    """The time complexity fitted on the benchmarks of a size sweep."""
+
+    name: str
+    uri: str
+    size_param: str
+    sizes: list[float]
+    fit: ComplexityFit
+
+
+def fit_sweeps(benchmarks: Sequence[Benchmark]) -> list[ComplexitySweep]:
+    """Fit the time complexity of each size sweep, grouping the benchmarks of a
+    parametrized function by their parameters other than the size.
+
+    Sweeps without enough distinct sizes to be fitted are skipped.
+    """
+    sweeps: dict[tuple[str, str], list[Benchmark]] = {}
+    for bench in benchmarks:
+        if bench.config.size is None:
+            continue
+        uri = bench.uri.split("[", 1)[0]
+        sweeps.setdefault((uri, bench.config.sweep_params or ""), []).append(bench)
+
+    results = []
+    for (uri, sweep_params), sweep in sweeps.items():
+        sweep.sort(key=lambda bench: bench.config.size or 0)
+        sizes = [bench.config.size or 0 for bench in sweep]
+        # The harness overhead would flatten the curve at small sizes
+        times = [
+            bench.stats.corrected_median_ns
+            if bench.stats.corrected_median_ns is not None
+            else bench.stats.median_ns
+            for bench in sweep
+        ]
+        try:
+            fit = fit_complexity(sizes, times)
+        except ValueError:
+            continue
+        name = sweep[0].name.split("[", 1)[0]
+        results.append(
+            ComplexitySweep(
+                name=f"{name}[{sweep_params}]" if sweep_params else name,
+                uri=uri,
+                size_param=sweep[0].config.size_param or "",
+                sizes=sizes,
+                fit=fit,
+            )
+        )
+    return results
 
 
 class WallTimeInstrument(Instrument):
@@ -173,6 +802,16 @@ class WallTimeInstrument(Instrument):
 
         self.config = config
         self.benchmarks: list[Benchmark] = []
+        # Rounds deferred to the end of the session, to be interleaved
+        self.interleaved: list[PendingRounds] = []
+        # Raw per-round times, only kept when they have to be saved
+        self.raw_samples: dict[str, array[int]] = {}
+        self._raw_samples_offsets: dict[str, int] = {}
+        self._finished_count = 0
+        # The time planned for each benchmark out of the budget of the session, and
+        # the time it actually took, by URI
+        self.time_plan: dict[str, TimePlan] = {}
+        self.spent_ns: dict[str, int] = {}
 
     def get_instrument_config_str_and_warns(self) -> tuple[str, list[str]]:
         config_str = (
@@ -181,8 +820,50 @@ class WallTimeInstrument(Instrument):
             f"{'enabled' if SUPPORTS_PERF_TRAMPOLINE else 'not supported'}, "
             f"timer_resolution: {TIMER_RESOLUTION_NS:.1f}ns"
         )
+        if self.config.cpus is not None:
+            config_str += f", cpus: {format_cpu_list(self.config.cpus)}"
+        if self.config.nice is not None:
+            config_str += f", nice: {self.config.nice}"
         return config_str, []
 
+    def set_time_plan(self, plan: dict[str, TimePlan]) -> None:
+        self.time_plan = plan
+
+    def _get_benchmark_config(
+        self, marker_options: BenchmarkMarkerOptions, uri: str
+    ) -> BenchmarkConfig:
+        benchmark_config = BenchmarkConfig.from_codspeed_config_and_marker_data(
+            self.config, marker_options
+        )
+        plan = self.time_plan.get(uri)
+        if plan is None:
+            return benchmark_config
+        # The plan takes precedence over the warmup and max times of the options
+        return replace(
+            benchmark_config,
+            warmup_time_ns=plan.warmup_time_ns,
+            max_time_ns=plan.max_time_ns,
+        )
+
+    @contextmanager
+    def _spending_time(self, uri: str) -> Iterator[None]:
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.spent_ns[uri] = self.spent_ns.get(uri, 0) + perf_counter_ns() - start
+
+    def _add_benchmark(self, benchmark: Benchmark, samples: array[int] | None) -> None:
+        self.benchmarks.append(benchmark)
+        if samples is None:
+            return
+        if self.config.bootstrap_resamples:
+            benchmark.stats.add_bootstrap_intervals(
+                samples, self.config.bootstrap_resamples
+            )
+        if self.config.save_samples:
+            self.raw_samples[benchmark.uri] = samples
+
     def measure(
         self,
         marker_options: BenchmarkMarkerOptions,
@@ -192,31 +873,119 @@ class WallTimeInstrument(Instrument):
         *args: P.args,
         **kwargs: P.kwargs,
     ) -> T:
-        benchmark_config = BenchmarkConfig.from_codspeed_config_and_marker_data(
-            self.config, marker_options
-        )
+        with self._spending_time(uri):
+            benchmark_config = self._get_benchmark_config(marker_options, uri)
+            is_scaling = (
+                benchmark_config.threads is not None
+                or benchmark_config.processes is not None
+            )
+            if is_coroutine_function(fn):
+                if is_scaling:
+                    raise ValueError(
+                        "threads and processes can't be used with coroutine functions"
+                    )
+                with EventLoopRunner(self.config.asyncio_loop_factory) as event_loop:
+                    return self._measure(
+                        benchmark_config, name, uri, fn, args, kwargs, event_loop
+                    )
 
-        def __codspeed_root_frame__() -> T:
-            return fn(*args, **kwargs)
+            out = self._measure(
+                benchmark_config,
+                name,
+                uri,
+                fn,
+                args,
+                kwargs,
+                # The scaling is measured right after, from the stats of the rounds
+                can_interleave=not is_scaling,
+            )
+            if is_scaling:
+                self._measure_scaling(self.benchmarks[-1], fn, args, kwargs)
+            return out
 
-        # Compute the actual result of the function
-        out = __codspeed_root_frame__()
+    def _measure_scaling(
+        self,
+        benchmark: Benchmark,
+        fn: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> None:
+        run_round = make_round_runner(fn, args, kwargs)
+        config = benchmark.config
+        if config.threads is not None:
+            benchmark.thread_scaling = measure_thread_scaling(
+                run_round,
+                config.threads,
+                time_budget_ns=config.max_time_ns,
+                mean_ns=benchmark.stats.mean_ns,
+            )
+        if config.processes is not None:
+            benchmark.process_scaling = measure_process_scaling(
+                run_round,
+                config.processes,
+                time_budget_ns=config.max_time_ns,
+                mean_ns=benchmark.stats.mean_ns,
+            )
 
-        # Warmup
-        times_per_round_ns: list[float] = []
-        warmup_start = start = perf_counter_ns()
-        while True:
-            start = perf_counter_ns()
-            __codspeed_root_frame__()
-            end = perf_counter_ns()
-            times_per_round_ns.append(end - start)
-            if end - warmup_start > benchmark_config.warmup_time_ns:
-                break
+    def _measure(
+        self,
+        benchmark_config: BenchmarkConfig,
+        name: str,
+        uri: str,
+        fn: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        event_loop: EventLoopRunner | None = None,
+        can_interleave: bool = False,
+    ) -> Any:
+        out, pending = self._prepare_rounds(
+            benchmark_config,
+            name,
+            uri,
+            fn,
+            args,
+            kwargs,
+            event_loop,
+            streaming=self.config.streaming_stats,
+        )
+        if (
+            can_interleave
+            and self.config.interleave
+            # The rounds run outside of the test, with the collector disabled
+            and benchmark_config.gc_policy == "disabled"
+        ):
+            self.interleaved.append(pending)
+        else:
+            self._run_rounds(pending)
+        return out
+
+    def _prepare_rounds(
+        self,
+        benchmark_config: BenchmarkConfig,
+        name: str,
+        uri: str,
+        fn: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        event_loop: EventLoopRunner | None,
+        streaming: bool,
+    ) -> tuple[Any, PendingRounds]:
+        """Compute the result of the function, then warm it up and size its rounds."""
+        out = (
+            fn(*args, **kwargs)
+            if event_loop is None
+            else event_loop.run(fn(*args, **kwargs))
+        )
+        run_round = make_round_runner(fn, args, kwargs, event_loop)
+
+        warmup = run_warmup(
+            run_round,
+            benchmark_config.warmup_time_ns,
+            benchmark_config.warmup_strategy,
+        )
 
         # Round sizing
-        warmup_mean_ns = mean(times_per_round_ns)
-        warmup_iters = len(times_per_round_ns)
-        times_per_round_ns.clear()
+        warmup_mean_ns = warmup.mean_ns
         iter_per_round = (
             int(ceil(benchmark_config.min_round_time_ns / warmup_mean_ns))
             if warmup_mean_ns <= benchmark_config.min_round_time_ns
@@ -229,41 +998,220 @@ class WallTimeInstrument(Instrument):
             rounds = benchmark_config.max_rounds
         rounds = max(1, rounds)
 
-        # Benchmark
-        iter_range = range(iter_per_round)
+        overhead_ns, overhead_stdev_ns = calibrate_overhead(
+            iter_per_round, args, kwargs, event_loop
+        )
+
+        recorder: StreamingStats | RoundSamples = (
+            StreamingStats(IQR_OUTLIER_FACTOR, STDEV_OUTLIER_FACTOR)
+            if streaming
+            else RoundSamples(rounds)
+        )
+        pending = PendingRounds(
+            name=name,
+            uri=uri,
+            config=benchmark_config,
+            run_round=run_round,
+            rounds=rounds,
+            iter_per_round=iter_per_round,
+            recorder=recorder,
+            precision_target=PrecisionTarget(
+                benchmark_config.target_precision,
+                recorder if isinstance(recorder, StreamingStats) else None,
+            ),
+            warmup=warmup,
+            overhead_ns=overhead_ns,
+            overhead_stdev_ns=overhead_stdev_ns,
+        )
+        return out, pending
+
+    def _run_rounds(self, pending: PendingRounds) -> None:
+        resource_meter = ResourceUsageMeter()
+        gc_monitor = GcMonitor()
+        resource_meter.start()
+        gc_monitor.start()
         run_start = perf_counter_ns()
         if self.instrument_hooks:
             self.instrument_hooks.start_benchmark()
-        for _ in range(rounds):
-            start = perf_counter_ns()
-            for _ in iter_range:
-                __codspeed_root_frame__()
-            end = perf_counter_ns()
-            times_per_round_ns.append(end - start)
-
-            if end - run_start > benchmark_config.max_time_ns:
-                # TODO: log something
-                break
+        while not (
+            pending.run_next_round()
+            # TODO: log something when max_time is reached
+            or perf_counter_ns() - run_start > pending.config.max_time_ns
+        ):
+            pass
         if self.instrument_hooks:
             self.instrument_hooks.stop_benchmark()
-            self.instrument_hooks.set_executed_benchmark(uri)
+            self.instrument_hooks.set_executed_benchmark(pending.uri)
         benchmark_end = perf_counter_ns()
-        total_time = (benchmark_end - run_start) / 1e9
+        iterations = pending.recorder.count * pending.iter_per_round
+        gc_stats = gc_monitor.stop(iterations)
+        resource_usage = resource_meter.stop(iterations)
+        self._record_rounds(
+            pending,
+            total_time=(benchmark_end - run_start) / 1e9,
+            resource_usage=resource_usage,
+            gc_stats=gc_stats,
+        )
 
-        stats = BenchmarkStats.from_list(
-            times_per_round_ns,
-            rounds=rounds,
+    def run_deferred(self) -> None:
+        """Run the rounds of the interleaved benchmarks.
+
+        Each pass runs a round of every benchmark that is not done yet, in a random
+        order, so that a drift of the environment spreads over all of them.
+        """
+        interleaved, self.interleaved = self.interleaved, []
+        schedule = random.Random(INTERLEAVE_SEED)
+        active = list(interleaved)
+        with apply_gc_policy("disabled"):
+            while active:
+                schedule.shuffle(active)
+                active = [pending for pending in active if not pending.run_next_round()]
+        for pending in interleaved:
+            # The resource usage and the collections can't be told apart between
+            # the benchmarks
+            self._record_rounds(pending, total_time=pending.elapsed_ns / 1e9)
+            self.spent_ns[pending.uri] = (
+                self.spent_ns.get(pending.uri, 0) + pending.elapsed_ns
+            )
+
+    def _record_rounds(
+        self,
+        pending: PendingRounds,
+        total_time: float,
+        resource_usage: ResourceUsage | None = None,
+        gc_stats: GcStats | None = None,
+    ) -> None:
+        stats, samples = summarize_rounds(
+            pending.recorder,
             total_time=total_time,
-            iter_per_round=iter_per_round,
-            warmup_iters=warmup_iters,
+            iter_per_round=pending.iter_per_round,
+            warmup_iters=pending.warmup.iters,
+            warmup_steady=pending.warmup.steady,
+            overhead_ns=pending.overhead_ns,
+            overhead_stdev_ns=pending.overhead_stdev_ns,
+            resource_usage=resource_usage,
+            gc=gc_stats,
         )
+        warn_if_within_overhead_noise(pending.name, stats)
 
-        self.benchmarks.append(
-            Benchmark(name=name, uri=uri, config=benchmark_config, stats=stats)
+        # Traced after the timed rounds, which the tracing would slow down
+        allocations = (
+            measure_allocations(pending.run_round, stats.mean_ns)
+            if self.config.trace_allocations
+            else None
         )
-        return out
 
-    def measure_pedantic(  # noqa: C901
+        self._add_benchmark(
+            Benchmark(
+                name=pending.name,
+                uri=pending.uri,
+                config=pending.config,
+                stats=stats,
+                allocations=allocations,
+            ),
+            samples,
+        )
+
+    def measure_compare(
+        self,
+        marker_options: BenchmarkMarkerOptions,
+        compare_options: CompareOptions,
+        name: str,
+        uri: str,
+    ) -> tuple[Any, Any]:
+        benchmark_config = self._get_benchmark_config(marker_options, uri)
+        if (
+            benchmark_config.threads is not None
+            or benchmark_config.processes is not None
+        ):
+            raise ValueError("threads and processes can't be used to compare")
+        with self._spending_time(uri):
+            if not (
+                is_coroutine_function(compare_options.baseline)
+                or is_coroutine_function(compare_options.candidate)
+            ):
+                return self._measure_compare(
+                    benchmark_config, compare_options, name, uri
+                )
+            with EventLoopRunner(self.config.asyncio_loop_factory) as event_loop:
+                return self._measure_compare(
+                    benchmark_config, compare_options, name, uri, event_loop
+                )
+
+    def _measure_compare(
+        self,
+        benchmark_config: BenchmarkConfig,
+        compare_options: CompareOptions,
+        name: str,
+        uri: str,
+        event_loop: EventLoopRunner | None = None,
+    ) -> tuple[Any, Any]:
+        # Both variants share the time budget, and their rounds run until one of
+        # them is done, so that they are compared on the same number of rounds
+        variant_config = replace(
+            benchmark_config,
+            max_time_ns=benchmark_config.max_time_ns // 2,
+            target_precision=None,
+        )
+        outs = []
+        variants = []
+        for variant, fn in (
+            ("baseline", compare_options.baseline),
+            ("candidate", compare_options.candidate),
+        ):
+            out, pending = self._prepare_rounds(
+                variant_config,
+                compare_variant(name, variant),
+                compare_variant(uri, variant),
+                fn,
+                compare_options.args,
+                compare_options.kwargs,
+                event_loop if is_coroutine_function(fn) else None,
+                # The samples are needed for the comparison
+                streaming=False,
+            )
+            outs.append(out)
+            variants.append(pending)
+        baseline, candidate = variants
+        baseline.rounds = candidate.rounds = min(baseline.rounds, candidate.rounds)
+
+        # The order alternates, so that neither variant always runs first
+        order = [baseline, candidate]
+        done = False
+        while not done or baseline.recorder.count < COMPARE_MIN_ROUNDS:
+            for pending in order:
+                if self.instrument_hooks:
+                    self.instrument_hooks.start_benchmark()
+                done = pending.run_next_round() or done
+                if self.instrument_hooks:
+                    self.instrument_hooks.stop_benchmark()
+                    self.instrument_hooks.set_executed_benchmark(pending.uri)
+            order.reverse()
+
+        per_iteration_ns = []
+        for pending in variants:
+            # The collections and the resource usage are shared by both variants
+            self._record_rounds(pending, total_time=pending.elapsed_ns / 1e9)
+            assert isinstance(pending.recorder, RoundSamples)
+            per_iteration_ns.append(
+                [t / pending.iter_per_round for t in pending.recorder.samples()]
+            )
+        baseline_ns, candidate_ns = per_iteration_ns
+        ratio = compare_samples(baseline_ns, candidate_ns)
+        comparison = Comparison(
+            name=name,
+            baseline_uri=baseline.uri,
+            candidate_uri=candidate.uri,
+            ratio=ratio.ratio,
+            ratio_ci=ratio.ratio_ci,
+            p_value=ratio.p_value,
+            significant=ratio.p_value < COMPARE_SIGNIFICANCE_LEVEL,
+        )
+        for bench in self.benchmarks[-2:]:
+            bench.comparison = comparison
+        return outs[0], outs[1]
+
+    def measure_pedantic(
         self,
         marker_options: BenchmarkMarkerOptions,
         pedantic_options: PedanticOptions[T],
@@ -273,32 +1221,54 @@ class WallTimeInstrument(Instrument):
         benchmark_config = BenchmarkConfig.from_codspeed_config_and_marker_data(
             self.config, marker_options
         )
+        if (
+            benchmark_config.threads is not None
+            or benchmark_config.processes is not None
+        ):
+            raise ValueError("threads and processes can't be used in pedantic mode")
+        # The rounds are given, so the time plan is not followed, only tracked
+        with self._spending_time(uri):
+            if not is_coroutine_function(pedantic_options.target):
+                return self._measure_pedantic(
+                    benchmark_config, pedantic_options, name, uri
+                )
+            with EventLoopRunner(self.config.asyncio_loop_factory) as event_loop:
+                return self._measure_pedantic(
+                    benchmark_config, pedantic_options, name, uri, event_loop
+                )
 
-        def __codspeed_root_frame__(*args, **kwargs) -> T:
-            return pedantic_options.target(*args, **kwargs)
-
-        iter_range = range(pedantic_options.iterations)
+    def _measure_pedantic(
+        self,
+        benchmark_config: BenchmarkConfig,
+        pedantic_options: PedanticOptions[T],
+        name: str,
+        uri: str,
+        event_loop: EventLoopRunner | None = None,
+    ) -> T:
+        target: Callable[..., Any] = pedantic_options.target
+        iterations = pedantic_options.iterations
 
         # Warmup
         for _ in range(pedantic_options.warmup_rounds):
             args, kwargs = pedantic_options.setup_and_get_args_kwargs()
-            for _ in iter_range:
-                __codspeed_root_frame__(*args, **kwargs)
+            make_round_runner(target, args, kwargs, event_loop)(iterations)
             if pedantic_options.teardown is not None:
                 pedantic_options.teardown(*args, **kwargs)
 
         # Benchmark
-        times_per_round_ns: list[float] = []
+        times_per_round_ns = array("q", bytes(8 * pedantic_options.rounds))
+        # Includes the setup and teardown of each round
+        resource_meter = ResourceUsageMeter()
+        gc_monitor = GcMonitor()
+        resource_meter.start()
+        gc_monitor.start()
         benchmark_start = perf_counter_ns()
         if self.instrument_hooks:
             self.instrument_hooks.start_benchmark()
-        for _ in range(pedantic_options.rounds):
+        for round_index in range(pedantic_options.rounds):
             args, kwargs = pedantic_options.setup_and_get_args_kwargs()
-            start = perf_counter_ns()
-            for _ in iter_range:
-                __codspeed_root_frame__(*args, **kwargs)
-            end = perf_counter_ns()
-            times_per_round_ns.append(end - start)
+            run_round = make_round_runner(target, args, kwargs, event_loop)
+            times_per_round_ns[round_index] = run_round(iterations)
             if pedantic_options.teardown is not None:
                 pedantic_options.teardown(*args, **kwargs)
         if self.instrument_hooks:
@@ -306,22 +1276,31 @@ class WallTimeInstrument(Instrument):
             self.instrument_hooks.set_executed_benchmark(uri)
         benchmark_end = perf_counter_ns()
         total_time = (benchmark_end - benchmark_start) / 1e9
+        iterations_count = pedantic_options.rounds * iterations
+        gc_stats = gc_monitor.stop(iterations_count)
         stats = BenchmarkStats.from_list(
             times_per_round_ns,
             rounds=pedantic_options.rounds,
             total_time=total_time,
-            iter_per_round=pedantic_options.iterations,
+            iter_per_round=iterations,
             warmup_iters=pedantic_options.warmup_rounds,
+            resource_usage=resource_meter.stop(iterations_count),
+            gc=gc_stats,
         )
 
         # Compute the actual result of the function
         args, kwargs = pedantic_options.setup_and_get_args_kwargs()
-        out = __codspeed_root_frame__(*args, **kwargs)
+        out = (
+            target(*args, **kwargs)
+            if event_loop is None
+            else event_loop.run(target(*args, **kwargs))
+        )
         if pedantic_options.teardown is not None:
             pedantic_options.teardown(*args, **kwargs)
 
-        self.benchmarks.append(
-            Benchmark(name=name, uri=uri, config=benchmark_config, stats=stats)
+        self._add_benchmark(
+            Benchmark(name=name, uri=uri, config=benchmark_config, stats=stats),
+            times_per_round_ns,
         )
         return out
 
@@ -336,6 +1315,22 @@ class WallTimeInstrument(Instrument):
             )
             return
         self._print_benchmark_table()
+        if any(bench.thread_scaling for bench in self.benchmarks):
+            self._print_scaling_table("Thread Scaling", "Threads", "thread_scaling")
+        if any(bench.process_scaling for bench in self.benchmarks):
+            self._print_scaling_table("Process Scaling", "Processes", "process_scaling")
+        sweeps = fit_sweeps(self.benchmarks)
+        if sweeps:
+            self._print_complexity_table(sweeps)
+        if any(bench.comparison for bench in self.benchmarks):
+            self._print_comparison_table()
+        if self.time_plan:
+            self._print_time_budget_table()
+            planned_ns = sum(plan.total_ns for plan in self.time_plan.values())
+            reporter.write_line(
+                f"codspeed: spent {sum(self.spent_ns.values()) / 1e9:.2f}s of the "
+                f"{planned_ns / 1e9:.2f}s budget"
+            )
         reporter.write_sep(
             "=",
             f"{len(self.benchmarks)} benchmarked",
@@ -346,10 +1341,26 @@ class WallTimeInstrument(Instrument):
 
         table.add_column("Benchmark", justify="right", style="cyan", no_wrap=True)
         table.add_column("Time (best)", justify="right", style="green bold")
+        table.add_column("Time (corrected)", justify="right")
         table.add_column(
             "Rel. StdDev",
             justify="right",
         )
+        show_ci = any(bench.stats.median_ci_ns for bench in self.benchmarks)
+        if show_ci:
+            table.add_column("Median 95% CI", justify="right")
+        if self.config.show_resource_usage:
+            table.add_column("CPU time", justify="right")
+            table.add_column("CPU %", justify="right")
+            table.add_column("Ctx switches", justify="right")
+            table.add_column("Page faults", justify="right")
+        show_gc = any(bench.config.gc_policy != "disabled" for bench in self.benchmarks)
+        if show_gc:
+            table.add_column("GC time", justify="right")
+        if self.config.trace_allocations:
+            table.add_column("Allocated", justify="right")
+            table.add_column("Retained", justify="right")
+            table.add_column("Peak memory", justify="right")
         table.add_column("Run time", justify="right")
         table.add_column("Iters", justify="right")
 
@@ -358,10 +1369,27 @@ class WallTimeInstrument(Instrument):
             rsd_text = Text(f"{rsd * 100:.1f}%")
             if rsd > 0.1:
                 rsd_text.stylize("red bold")
+            ci_cells = [format_median_ci(bench.stats)] if show_ci else []
+            resource_cells = (
+                format_resource_usage(bench.stats)
+                if self.config.show_resource_usage
+                else []
+            )
+            gc_cells = [format_gc(bench)] if show_gc else []
+            allocation_cells = (
+                format_allocations(bench) if self.config.trace_allocations else []
+            )
             table.add_row(
                 escape(bench.name),
-                format_time(bench.stats.min_ns / bench.stats.iter_per_round),
+                format_time(bench.stats.min_ns),
+                format_time(bench.stats.corrected_min_ns)
+                if bench.stats.corrected_min_ns is not None
+                else "-",
                 rsd_text,
+                *ci_cells,
+                *resource_cells,
+                *gc_cells,
+                *allocation_cells,
                 f"{bench.stats.total_time:,.2f}s",
                 f"{bench.stats.iter_per_round * bench.stats.rounds:,}",
             )
@@ -370,13 +1398,173 @@ class WallTimeInstrument(Instrument):
         print("\n")
         console.print(table)
 
+    def _print_scaling_table(self, title: str, workers: str, attribute: str) -> None:
+        table = Table(title=title)
+
+        table.add_column("Benchmark", justify="right", style="cyan", no_wrap=True)
+        table.add_column(workers, justify="right")
+        table.add_column("Throughput", justify="right", style="green bold")
+        table.add_column("Latency", justify="right")
+        table.add_column("Efficiency", justify="right")
+
+        for bench in self.benchmarks:
+            for point in getattr(bench, attribute) or []:
+                efficiency_text = Text(f"{point.efficiency * 100:.0f}%")
+                if point.efficiency < 0.5:
+                    efficiency_text.stylize("red bold")
+                table.add_row(
+                    escape(bench.name),
+                    str(point.workers),
+                    f"{point.ops_per_sec:,.0f} ops/s",
+                    format_time(point.latency_ns),
+                    efficiency_text,
+                )
+
+        console = Console()
+        console.print(table)
+
+    def _print_complexity_table(self, sweeps: list[ComplexitySweep]) -> None:
+        table = Table(title="Complexity")
+
+        table.add_column("Benchmark", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Sizes", justify="right")
+        table.add_column("Best fit", justify="right", style="bold")
+        table.add_column("Coefficient", justify="right")
+        table.add_column("Fit error", justify="right")
+
+        for sweep in sweeps:
+            best_fit_text = Text(sweep.fit.best_fit)
+            if sweep.fit.best_fit == "O(n^2)":
+                best_fit_text.stylize("red bold")
+            table.add_row(
+                escape(sweep.name),
+                f"{sweep.size_param}: "
+                f"{format_size(sweep.sizes[0])}..{format_size(sweep.sizes[-1])}",
+                best_fit_text,
+                # Per unit of the model, so it can be far below a nanosecond
+                f"{sweep.fit.coefficient:.3g}ns",
+                f"{sweep.fit.rms * 100:.1f}%",
+            )
+
+        console = Console()
+        console.print(table)
+
+    def _print_comparison_table(self) -> None:
+        table = Table(title="Comparisons")
+
+        table.add_column("Benchmark", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Baseline", justify="right")
+        table.add_column("Candidate", justify="right")
+        table.add_column("Ratio (95% CI)", justify="right", style="bold")
+        table.add_column("p-value", justify="right")
+        table.add_column("Verdict", justify="right")
+
+        by_uri = {bench.uri: bench for bench in self.benchmarks}
+        comparisons = {
+            id(bench.comparison): bench.comparison
+            for bench in self.benchmarks
+            if bench.comparison is not None
+        }
+        for comparison in comparisons.values():
+            baseline = by_uri[comparison.baseline_uri]
+            candidate = by_uri[comparison.candidate_uri]
+            if not comparison.significant:
+                verdict = Text("no difference")
+            elif comparison.ratio < 1:
+                verdict = Text("faster", style="green bold")
+            else:
+                verdict = Text("slower", style="red bold")
+            low, high = comparison.ratio_ci
+            table.add_row(
+                escape(comparison.name),
+                format_time(baseline.stats.median_ns),
+                format_time(candidate.stats.median_ns),
+                f"{comparison.ratio:.3f}x ({low:.3f}..{high:.3f})",
+                f"{comparison.p_value:.3g}",
+                verdict,
+            )
+
+        console = Console()
+        console.print(table)
+
+    def _print_time_budget_table(self) -> None:
+        table = Table(title="Time Budget")
+
+        table.add_column("Benchmark", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Planned", justify="right")
+        table.add_column("Actual", justify="right", style="bold")
+        table.add_column("Overrun", justify="right")
+
+        for uri, plan in self.time_plan.items():
+            if uri not in self.spent_ns:
+                continue
+            spent_ns = self.spent_ns[uri]
+            overrun = Text(f"{(spent_ns / plan.total_ns - 1) * 100:+.1f}%")
+            if spent_ns > plan.total_ns:
+                overrun.stylize("yellow")
+            table.add_row(
+                # The name of a benchmark is its URI without the file path
+                escape(uri.split("::", 1)[-1]),
+                format_time(plan.total_ns),
+                format_time(spent_ns),
+                overrun,
+            )
+
+        console = Console()
+        console.print(table)
+
+    def write_raw_samples(self, path: Path) -> dict[str, Any] | None:
+        if not self.raw_samples:
+            return None
+        offset = 0
+        with path.open("wb") as f:
+            for uri, samples in self.raw_samples.items():
+                if sys.byteorder != "little":
+                    samples = array("q", samples)
+                    samples.byteswap()
+                samples.tofile(f)
+                self._raw_samples_offsets[uri] = offset
+                offset += len(samples)
+        return {
+            "path": path.name,
+            "dtype": "<i8",
+            "description": "per-round times in nanoseconds",
+        }
+
+    def pop_finished_benchmarks(self) -> list[dict[str, Any]]:
+        finished = self.benchmarks[self._finished_count :]
+        self._finished_count = len(self.benchmarks)
+        return [asdict(bench) for bench in finished]
+
     def get_result_dict(self) -> dict[str, Any]:
+        benchmarks = []
+        for bench in self.benchmarks:
+            bench_dict = asdict(bench)
+            if bench.uri in self._raw_samples_offsets:
+                bench_dict["samples"] = {
+                    "offset": self._raw_samples_offsets[bench.uri],
+                    "count": len(self.raw_samples[bench.uri]),
+                }
+            benchmarks.append(bench_dict)
         return {
             "instrument": {
                 "type": self.instrument,
                 "clock_info": get_clock_info("perf_counter").__dict__,
+                "cpus": list(self.config.cpus) if self.config.cpus else None,
+                "nice": self.config.nice,
             },
-            "benchmarks": [asdict(bench) for bench in self.benchmarks],
+            "benchmarks": benchmarks,
+            "complexity": [asdict(sweep) for sweep in fit_sweeps(self.benchmarks)],
+            "time_budget": [
+                {
+                    "uri": uri,
+                    "planned_ns": plan.total_ns,
+                    "actual_ns": self.spent_ns.get(uri),
+                }
+                for uri, plan in self.time_plan.items()
+            ]
+            if self.time_plan
+            else None,
         }
 
 
@@ -411,3 +1599,55 @@ def format_time(time_ns: float) -> str:
     else:
         # 1 second or more - show in seconds
         return f"{time_ns / 1_000_000_000:.2f}s"
+
+
+def format_median_ci(stats: BenchmarkStats) -> str:
+    """Format the median confidence interval as a half-width relative to the
+    median."""
+    if stats.median_ci_ns is None or stats.median_ns <= 0:
+        return "-"
+    low, high = stats.median_ci_ns
+    return f"±{(high - low) / 2 / stats.median_ns * 100:.1f}%"
+
+
+def format_resource_usage(stats: BenchmarkStats) -> list[str]:
+    """Format the resource usage columns of the results table."""
+    usage = stats.resource_usage
+    if usage is None:
+        return ["-"] * 4
+    cells = [
+        format_time(usage.cpu_time_ns),
+        f"{usage.cpu_time_ns / stats.mean_ns * 100:.0f}%" if stats.mean_ns else "-",
+    ]
+    if usage.voluntary_context_switches is None:
+        return [*cells, "-", "-"]
+    return [
+        *cells,
+        f"{usage.voluntary_context_switches:,}/{usage.involuntary_context_switches:,}",
+        f"{usage.minor_page_faults:,}/{usage.major_page_faults:,}",
+    ]
+
+
+def format_gc(bench: Benchmark) -> str:
+    """Format the time spent in collections per iteration, and their count."""
+    gc = bench.stats.gc
+    if gc is None or bench.config.gc_policy == "disabled":
+        return "-"
+    return f"{format_time(gc.time_ns)} ({gc.collections:,})"
+
+
+def format_allocations(bench: Benchmark) -> list[str]:
+    """Format the allocation columns of the results table."""
+    allocations = bench.allocations
+    if allocations is None:
+        return ["-"] * 3
+    return [
+        format_bytes(allocations.allocated_bytes),
+        f"{format_bytes(allocations.retained_bytes)} "
+        f"({allocations.retained_blocks:,.1f} blocks)",
+        format_bytes(allocations.peak_bytes),
+    ]
+
+
+def format_size(size: float) -> str:
+    return f"{size:,.0f}" if size.is_integer() else f"{size:,g}"
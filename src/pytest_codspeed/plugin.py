@@ -1,35 +1,92 @@
 from __future__ import annotations
 
+import argparse
 import functools
-import gc
 import json
 import os
 import random
-from dataclasses import dataclass, field
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from time import time
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, cast, overload
 
 import pytest
 from _pytest.fixtures import FixtureManager
 
+from pytest_codspeed.budget import get_weight, plan_time_budget
 from pytest_codspeed.config import (
     BenchmarkMarkerOptions,
     CodSpeedConfig,
+    CompareOptions,
     PedanticOptions,
+    parse_cpu_list,
+    parse_precision,
+    parse_shard,
+    parse_threshold,
 )
-from pytest_codspeed.instruments import MeasurementMode, get_instrument_from_mode
+from pytest_codspeed.cpu_isolation import CpuIsolation, format_cpu_list
+from pytest_codspeed.distributed import (
+    WORKER_CPUS_KEY,
+    assign_worker_cpus,
+    get_available_cpus,
+    get_worker_cpus,
+    get_worker_index,
+    group_physical_cores,
+    is_xdist_controller,
+    is_xdist_worker,
+    merge_worker_results,
+    print_worker_results_table,
+    receive_worker_results,
+    send_worker_results,
+)
+from pytest_codspeed.environment import get_referenced_environment_metadata
+from pytest_codspeed.event_loop import (
+    EventLoopRunner,
+    is_coroutine_function,
+    load_loop_factory,
+)
+from pytest_codspeed.gc_policy import DEFAULT_GC_POLICY, GC_POLICIES, apply_gc_policy
+from pytest_codspeed.history import (
+    DEFAULT_HISTORY_RUNS,
+    HISTORY_FILE_NAME,
+    HistoryStore,
+    load_latest_stats,
+    print_trends,
+)
+from pytest_codspeed.instruments import (
+    MeasurementMode,
+    compare_variant,
+    get_instrument_from_mode,
+)
+from pytest_codspeed.regression import (
+    ResultsFile,
+    diff_results,
+    find_latest_results,
+    print_diff_table,
+)
+from pytest_codspeed.results_stream import (
+    CHECKPOINT_FILE_NAME,
+    ResultsStream,
+    assemble_results,
+    load_checkpoint,
+)
+from pytest_codspeed.sharding import get_duration, load_durations, partition
 from pytest_codspeed.utils import (
     BEFORE_PYTEST_8_1_1,
     IS_PYTEST_BENCHMARK_INSTALLED,
     IS_PYTEST_SPEED_INSTALLED,
+    get_environment_fingerprint,
     get_environment_metadata,
+    get_git_commit,
     get_git_relative_uri_and_name,
 )
 
 from . import __version__
 
 if TYPE_CHECKING:
+    from collections.abc import Coroutine, Iterator
     from typing import Any, Callable, ParamSpec, TypeVar
 
     from pytest_codspeed.instruments import Instrument
@@ -61,6 +118,27 @@ def pytest_addoption(parser: pytest.Parser):
             "The time to warm up the benchmark for (in seconds), only for walltime mode"
         ),
     )
+    group.addoption(
+        "--codspeed-warmup-strategy",
+        action="store",
+        choices=("fixed", "steady"),
+        default="fixed",
+        help=(
+            "How the warmup ends: 'fixed' runs for the whole warmup time, 'steady' "
+            "stops once the iteration times are steady, bounded by the warmup time "
+            "(5s by default), only for walltime mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-gc",
+        action="store",
+        choices=GC_POLICIES,
+        help=(
+            "The garbage collection policy while benchmarks run: 'disabled' "
+            "(default), 'enabled', or 'freeze' to collect only the objects created "
+            "by the benchmark. Overridden by the gc option of the benchmark marker"
+        ),
+    )
     group.addoption(
         "--codspeed-max-time",
         action="store",
@@ -79,6 +157,217 @@ def pytest_addoption(parser: pytest.Parser):
             ", only for walltime mode"
         ),
     )
+    group.addoption(
+        "--codspeed-target-precision",
+        action="store",
+        type=_precision_option,
+        help=(
+            "Stop a benchmark as soon as the confidence interval of its median is "
+            "within this relative precision (e.g. 0.5%%), only for walltime mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-save-samples",
+        action="store_true",
+        default=False,
+        help=(
+            "Save the raw round times in a binary file next to the results, "
+            "only for walltime mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-streaming-stats",
+        action="store_true",
+        default=False,
+        help=(
+            "Compute the statistics as rounds are run, in constant memory, instead "
+            "of storing every round (quartiles become estimates), only for walltime "
+            "mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-bootstrap-resamples",
+        action="store",
+        type=int,
+        default=0,
+        help=(
+            "Compute bootstrap confidence intervals of the median and mean with this "
+            "many resamples (vectorized when numpy is installed), only for walltime "
+            "mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-asyncio-loop-factory",
+        action="store",
+        type=_loop_factory_option,
+        help=(
+            "The event loop factory used to benchmark coroutine functions, as "
+            "'module:callable' (e.g. 'uvloop:new_event_loop'), defaults to the "
+            "asyncio one"
+        ),
+    )
+    group.addoption(
+        "--codspeed-show-resource-usage",
+        action="store_true",
+        default=False,
+        help=(
+            "Show the CPU time per iteration, the share of wall time spent on CPU, "
+            "the voluntary/involuntary context switches and the minor/major page "
+            "faults of the benchmarks in the results table, only for walltime mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-trace-allocations",
+        action="store_true",
+        default=False,
+        help=(
+            "Trace the memory allocations of the benchmarks with tracemalloc, in a "
+            "separate pass after the timed rounds, only for walltime mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-interleave",
+        action="store_true",
+        default=False,
+        help=(
+            "Defer the timed rounds of the benchmarks to the end of the session and "
+            "run them interleaved in a random order, so that a drift of the "
+            "environment spreads over all the benchmarks, only for walltime mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-cpu",
+        action="store",
+        type=_cpu_list_option,
+        help=(
+            "Pin the benchmarking process on these CPUs (e.g. 2,3 or 2-3), so that "
+            "it does not migrate between cores, only for walltime mode on Linux"
+        ),
+    )
+    group.addoption(
+        "--codspeed-nice",
+        action="store",
+        type=int,
+        help=(
+            "Set the niceness of the benchmarking process, negative values raise its "
+            "scheduling priority but require privileges, only for walltime mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-compare",
+        action="store",
+        nargs="?",
+        const="latest",
+        metavar="FILE",
+        help=(
+            "Compare the benchmarks with a previous results file, or with the latest "
+            "one of the .codspeed folder when no file is given, only for walltime "
+            "mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-compare-fail-threshold",
+        action="store",
+        type=_threshold_option,
+        help=(
+            "Fail the session when a benchmark is significantly slower than in the "
+            "compared results by more than this threshold (e.g. 5%%)"
+        ),
+    )
+    group.addoption(
+        "--codspeed-stream-results",
+        action="store_true",
+        default=False,
+        help=(
+            "Append the results of each benchmark to a JSON Lines file as soon as it "
+            "finishes, so that they survive a crash of the session, and assemble the "
+            "results file from it at the end"
+        ),
+    )
+    group.addoption(
+        "--codspeed-resume",
+        action="store_true",
+        default=False,
+        help=(
+            "Checkpoint the results of the benchmarks as they finish, and skip the "
+            "ones already measured by an interrupted session in the same "
+            "environment, merging their results into the results file"
+        ),
+    )
+    group.addoption(
+        "--codspeed-total-budget",
+        action="store",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "The time to share between the benchmarks of the session (in seconds), "
+            "by their duration and noise in the local history. Replaces the warmup "
+            "and max times of each benchmark, only for walltime mode"
+        ),
+    )
+    group.addoption(
+        "--codspeed-shard",
+        action="store",
+        type=_shard_option,
+        metavar="I/N",
+        help=(
+            "Only run the I-th of N shards of the benchmarks, balanced by their "
+            "duration in the local history or the latest results, e.g. 2/4. Every "
+            "machine needs the same .codspeed folder to compute the same shards"
+        ),
+    )
+    group.addoption(
+        "--codspeed-history",
+        action="store",
+        metavar="PATTERN",
+        help=(
+            "Print the trend of the benchmarks whose URI contains the pattern over "
+            "the last walltime sessions, from the local history, then exit"
+        ),
+    )
+    group.addoption(
+        "--codspeed-history-runs",
+        action="store",
+        type=int,
+        default=DEFAULT_HISTORY_RUNS,
+        help="The number of sessions shown by --codspeed-history (default: 10)",
+    )
+
+
+def _precision_option(value: str) -> float:
+    try:
+        return parse_precision(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _threshold_option(value: str) -> float:
+    try:
+        return parse_threshold(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _shard_option(value: str) -> tuple[int, int]:
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _cpu_list_option(value: str) -> tuple[int, ...]:
+    try:
+        return parse_cpu_list(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _loop_factory_option(value: str) -> str:
+    try:
+        load_loop_factory(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
 
 
 @dataclass(unsafe_hash=True)
@@ -90,6 +379,23 @@ class CodSpeedPlugin:
     disabled_plugins: tuple[str, ...]
     profile_folder: Path | None
     benchmark_count: int = field(default=0, hash=False, compare=False)
+    cpu_isolation: CpuIsolation | None = field(default=None, hash=False, compare=False)
+    previous_results: ResultsFile | None = field(
+        default=None, hash=False, compare=False
+    )
+    results_stream: ResultsStream | None = field(
+        default=None, hash=False, compare=False
+    )
+    resumed_benchmarks: list[dict[str, Any]] = field(
+        default_factory=list, hash=False, compare=False
+    )
+    worker_cores: list[tuple[int, ...]] = field(
+        default_factory=list, hash=False, compare=False
+    )
+    """The physical cores the xdist workers are pinned on, on the controller."""
+    worker_results: dict[str, dict[str, Any]] = field(
+        default_factory=dict, hash=False, compare=False
+    )
 
 
 PLUGIN_NAME = "codspeed_plugin"
@@ -140,6 +446,20 @@ def pytest_configure(config: pytest.Config):
     profile_folder = os.environ.get("CODSPEED_PROFILE_FOLDER")
 
     codspeed_config = CodSpeedConfig.from_pytest_config(config)
+    _check_incompatible_options(codspeed_config, mode)
+    codspeed_config = _configure_xdist(config, codspeed_config)
+
+    cpu_isolation = None
+    if (
+        is_codspeed_enabled
+        and mode == MeasurementMode.WallTime
+        and (codspeed_config.cpus is not None or codspeed_config.nice is not None)
+    ):
+        cpu_isolation = CpuIsolation(codspeed_config.cpus, codspeed_config.nice)
+        try:
+            cpu_isolation.apply()
+        except ValueError as e:
+            raise pytest.UsageError(str(e)) from None
 
     plugin = CodSpeedPlugin(
         disabled_plugins=tuple(disabled_plugins),
@@ -148,10 +468,202 @@ def pytest_configure(config: pytest.Config):
         instrument=instrument(codspeed_config, mode),
         config=codspeed_config,
         profile_folder=Path(profile_folder) if profile_folder else None,
+        cpu_isolation=cpu_isolation,
+        previous_results=_load_previous_results(config, codspeed_config),
+        worker_cores=_get_worker_cores(config, codspeed_config, mode)
+        if is_codspeed_enabled
+        else [],
     )
+    if is_codspeed_enabled and (
+        codspeed_config.stream_results or codspeed_config.resume
+    ):
+        _open_results_stream(config, plugin)
     config.pluginmanager.register(plugin, PLUGIN_NAME)
 
 
+def _configure_xdist(
+    config: pytest.Config, codspeed_config: CodSpeedConfig
+) -> CodSpeedConfig:
+    """Check the options against pytest-xdist, and pin the worker on the CPUs
+    assigned by the controller."""
+    if is_xdist_controller(config):
+        if codspeed_config.resume or codspeed_config.stream_results:
+            raise pytest.UsageError(
+                "--codspeed-resume and --codspeed-stream-results can't be used with "
+                "pytest-xdist"
+            )
+        if codspeed_config.save_samples:
+            raise pytest.UsageError(
+                "--codspeed-save-samples can't be used with pytest-xdist"
+            )
+    worker_cpus = get_worker_cpus(config)
+    if worker_cpus is not None:
+        return replace(codspeed_config, cpus=worker_cpus)
+    return codspeed_config
+
+
+def _get_worker_cores(
+    config: pytest.Config, codspeed_config: CodSpeedConfig, mode: MeasurementMode
+) -> list[tuple[int, ...]]:
+    """The physical cores to pin the xdist workers on, by the controller."""
+    if mode != MeasurementMode.WallTime or not is_xdist_controller(config):
+        return []
+    return group_physical_cores(get_available_cpus(codspeed_config.cpus))
+
+
+def _open_results_stream(config: pytest.Config, plugin: CodSpeedPlugin) -> None:
+    if plugin.config.resume:
+        # The checkpoint has a fixed path, to be found by the next attempt
+        stream_path = config.rootpath / ".codspeed" / CHECKPOINT_FILE_NAME
+    else:
+        stream_path = _get_result_path(config, plugin).with_suffix(".jsonl")
+    _make_results_folder(stream_path.parent)
+    metadata = {
+        **_get_environment_metadata(config, plugin),
+        "instrument": {"type": plugin.instrument.instrument},
+    }
+    if plugin.config.resume:
+        plugin.resumed_benchmarks = load_checkpoint(
+            stream_path,
+            get_environment_fingerprint(metadata),
+            plugin.instrument.instrument,
+        )
+    plugin.results_stream = ResultsStream(stream_path)
+    # The resumed benchmarks are written again, to be kept by a later attempt
+    plugin.results_stream.open(metadata, plugin.resumed_benchmarks)
+
+
+def _get_environment_metadata(
+    config: pytest.Config, plugin: CodSpeedPlugin
+) -> dict[str, Any]:
+    if plugin.profile_folder:
+        # Read by the CodSpeed runner, with the Python environment inlined
+        return get_environment_metadata()
+    return get_referenced_environment_metadata(config.rootpath / ".codspeed")
+
+
+def _get_result_path(config: pytest.Config, plugin: CodSpeedPlugin) -> Path:
+    if plugin.profile_folder:
+        return plugin.profile_folder / "results" / f"{os.getpid()}.json"
+    # Default to a .codspeed folder in the root of the project, where the results
+    # are kept for local comparisons between runs.
+    return config.rootpath / f".codspeed/results_{time() * 1000:.0f}.json"
+
+
+def _make_results_folder(path: Path) -> None:
+    created = not path.exists()
+    path.mkdir(parents=True, exist_ok=True)
+    if created:
+        (path / ".gitignore").write_text("*\n")
+
+
+def _load_previous_results(
+    config: pytest.Config, codspeed_config: CodSpeedConfig
+) -> ResultsFile | None:
+    """Load the results to compare with, before this session writes its own."""
+    if codspeed_config.compare is None:
+        return None
+    if codspeed_config.compare == "latest":
+        path = find_latest_results(config.rootpath / ".codspeed")
+        if path is None:
+            return None
+    else:
+        path = Path(codspeed_config.compare)
+    try:
+        return ResultsFile.load(path)
+    except ValueError as e:
+        raise pytest.UsageError(str(e)) from None
+
+
+def _check_incompatible_options(
+    codspeed_config: CodSpeedConfig, mode: MeasurementMode
+) -> None:
+    if codspeed_config.save_samples and codspeed_config.streaming_stats:
+        raise pytest.UsageError(
+            "--codspeed-save-samples can't be used with --codspeed-streaming-stats"
+        )
+    if codspeed_config.interleave and os.environ.get("CODSPEED_ENV") is not None:
+        raise pytest.UsageError(
+            "--codspeed-interleave can't be used with the CodSpeed runner, which "
+            "measures the benchmarks one at a time"
+        )
+    if codspeed_config.resume and os.environ.get("CODSPEED_ENV") is not None:
+        raise pytest.UsageError(
+            "--codspeed-resume can't be used with the CodSpeed runner, which "
+            "collects the measurements of every benchmark itself"
+        )
+    if codspeed_config.compare is not None and mode != MeasurementMode.WallTime:
+        raise pytest.UsageError("--codspeed-compare is only available in walltime mode")
+    if codspeed_config.total_budget_ns is not None:
+        if mode != MeasurementMode.WallTime:
+            raise pytest.UsageError(
+                "--codspeed-total-budget is only available in walltime mode"
+            )
+        if codspeed_config.total_budget_ns <= 0:
+            raise pytest.UsageError("--codspeed-total-budget must be positive")
+    if (
+        codspeed_config.compare_fail_threshold is not None
+        and codspeed_config.compare is None
+    ):
+        raise pytest.UsageError(
+            "--codspeed-compare-fail-threshold requires --codspeed-compare"
+        )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config: pytest.Config):
+    pattern = config.getoption("--codspeed-history", None)
+    if pattern is None:
+        return None
+    history_path = config.rootpath / ".codspeed" / HISTORY_FILE_NAME
+    if not history_path.exists():
+        print(f"codspeed: no history found in {history_path.parent}")
+        return pytest.ExitCode.NO_TESTS_COLLECTED
+    with HistoryStore(history_path) as store:
+        found = print_trends(
+            store, pattern, config.getoption("--codspeed-history-runs")
+        )
+    if not found:
+        print(f"codspeed: no benchmark matching {pattern!r} in the history")
+        return pytest.ExitCode.NO_TESTS_COLLECTED
+    return pytest.ExitCode.OK
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node: Any):
+    """Assign a dedicated CPU to an xdist worker, in walltime mode."""
+    plugin = get_plugin(node.config)
+    if not plugin.worker_cores:
+        return
+    worker_index = get_worker_index(node.workerinput["workerid"])
+    if worker_index == len(plugin.worker_cores):
+        reporter = node.config.pluginmanager.get_plugin("terminalreporter")
+        if reporter is not None:
+            reporter.write_line(
+                f"codspeed: more workers than the {len(plugin.worker_cores)} "
+                "physical core(s) available, the workers share them and their "
+                "timings interfere"
+            )
+    node.workerinput[WORKER_CPUS_KEY] = format_cpu_list(
+        assign_worker_cpus(plugin.worker_cores, worker_index)
+    )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node: Any, error: object | None):
+    plugin = get_plugin(node.config)
+    results = receive_worker_results(node)
+    if results is not None:
+        plugin.worker_results[node.workerinput["workerid"]] = results
+
+
+@pytest.hookimpl()
+def pytest_unconfigure(config: pytest.Config):
+    plugin = get_plugin(config)
+    if plugin is not None and plugin.cpu_isolation is not None:
+        plugin.cpu_isolation.restore()
+
+
 @pytest.hookimpl()
 def pytest_plugin_registered(plugin, manager: pytest.PytestPluginManager):
     """
@@ -193,6 +705,11 @@ def pytest_report_header(config: pytest.Config):
         ),
         *warns,
     ]
+    if plugin.resumed_benchmarks:
+        out.append(
+            f"codspeed: resuming the session, {len(plugin.resumed_benchmarks)} "
+            "benchmark(s) already measured"
+        )
     if len(plugin.disabled_plugins) > 0:
         out.append(
             "\033[93mCodSpeed had to disable the following plugins: "
@@ -231,8 +748,101 @@ def pytest_collection_modifyitems(
                 selected.append(item)
             else:
                 deselected.append(item)
+        if plugin.config.shard is not None:
+            selected = _select_shard(config, plugin.config.shard, selected, deselected)
         config.hook.pytest_deselected(items=deselected)
         items[:] = selected
+        if plugin.resumed_benchmarks:
+            _skip_resumed_items(config, plugin, selected)
+        if plugin.config.total_budget_ns is not None:
+            _plan_time_budget(config, plugin, selected)
+
+
+def _select_shard(
+    config: pytest.Config,
+    shard: tuple[int, int],
+    items: list[pytest.Item],
+    deselected: list[pytest.Item],
+) -> list[pytest.Item]:
+    """Keep the items of the shard, moving the others to the deselected ones."""
+    index, count = shard
+    durations = load_durations(config.rootpath / ".codspeed")
+    uris = [
+        get_git_relative_uri_and_name(item.nodeid, config.rootpath)[0] for item in items
+    ]
+    shards = partition(uris, durations, count)
+    selected = []
+    for item, item_shard in zip(items, shards):
+        if item_shard == index - 1:
+            selected.append(item)
+        else:
+            deselected.append(item)
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    if reporter is not None:
+        known = sum(get_duration(durations, uri) is not None for uri in uris)
+        reporter.write_line(
+            f"codspeed: shard {index}/{count}, {len(selected)} of {len(items)} "
+            f"benchmark(s), balanced with the duration of {known} of them"
+        )
+    return selected
+
+
+def _plan_time_budget(
+    config: pytest.Config, plugin: CodSpeedPlugin, items: list[pytest.Item]
+) -> None:
+    assert plugin.config.total_budget_ns is not None
+    uris = [
+        get_git_relative_uri_and_name(item.nodeid, config.rootpath)[0]
+        for item in items
+        # Not the skipped ones, like the resumed ones
+        if item.get_closest_marker("skip") is None
+    ]
+    latest_stats = load_latest_stats(config.rootpath / ".codspeed")
+    plugin.instrument.set_time_plan(
+        plan_time_budget(uris, latest_stats, plugin.config.total_budget_ns)
+    )
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    if reporter is not None:
+        known = sum(get_weight(latest_stats, uri) is not None for uri in uris)
+        reporter.write_line(
+            f"codspeed: planned the {plugin.config.total_budget_ns / 1e9:g}s budget "
+            f"over {len(uris)} benchmark(s), {known} of them with a history"
+        )
+
+
+def _skip_resumed_items(
+    config: pytest.Config, plugin: CodSpeedPlugin, items: list[pytest.Item]
+) -> None:
+    resumed_uris = {bench["uri"] for bench in plugin.resumed_benchmarks}
+    for item in items:
+        uri, _ = get_git_relative_uri_and_name(item.nodeid, config.rootpath)
+        if uri in resumed_uris or compare_variant(uri, "baseline") in resumed_uris:
+            item.add_marker(
+                pytest.mark.skip(reason="codspeed: already measured, resumed")
+            )
+
+
+@contextmanager
+def _benchmark_context(
+    plugin: CodSpeedPlugin, node: pytest.Item, config: pytest.Config
+) -> Iterator[tuple[BenchmarkMarkerOptions, str, str]]:
+    """Prepare the interpreter for a benchmark, giving its options, name and URI."""
+    marker_options = BenchmarkMarkerOptions.from_pytest_item(node)
+    random.seed(0)
+    gc_policy = marker_options.gc or plugin.config.gc_policy or DEFAULT_GC_POLICY
+    with apply_gc_policy(gc_policy):
+        uri, name = get_git_relative_uri_and_name(node.nodeid, config.rootpath)
+        try:
+            yield marker_options, name, uri
+        finally:
+            _stream_finished_benchmarks(plugin)
+
+
+def _stream_finished_benchmarks(plugin: CodSpeedPlugin) -> None:
+    if plugin.results_stream is not None:
+        plugin.results_stream.write_benchmarks(
+            plugin.instrument.pop_finished_benchmarks()
+        )
 
 
 def _measure(
@@ -244,14 +854,7 @@ def _measure(
     args: tuple[Any, ...],
     kwargs: dict[str, Any],
 ) -> T:
-    marker_options = BenchmarkMarkerOptions.from_pytest_item(node)
-    random.seed(0)
-    is_gc_enabled = gc.isenabled()
-    if is_gc_enabled:
-        gc.collect()
-        gc.disable()
-    try:
-        uri, name = get_git_relative_uri_and_name(node.nodeid, config.rootpath)
+    with _benchmark_context(plugin, node, config) as (marker_options, name, uri):
         if pedantic_options is None:
             return plugin.instrument.measure(
                 marker_options, name, uri, fn, *args, **kwargs
@@ -260,10 +863,18 @@ def _measure(
             return plugin.instrument.measure_pedantic(
                 marker_options, pedantic_options, name, uri
             )
-    finally:
-        # Ensure GC is re-enabled even if the test failed
-        if is_gc_enabled:
-            gc.enable()
+
+
+def _measure_compare(
+    plugin: CodSpeedPlugin,
+    node: pytest.Item,
+    config: pytest.Config,
+    compare_options: CompareOptions,
+) -> tuple[Any, Any]:
+    with _benchmark_context(plugin, node, config) as (marker_options, name, uri):
+        return plugin.instrument.measure_compare(
+            marker_options, compare_options, name, uri
+        )
 
 
 def wrap_runtest(
@@ -298,23 +909,132 @@ def pytest_runtest_protocol(item: pytest.Item, nextitem: pytest.Item | None):
 @pytest.hookimpl()
 def pytest_sessionfinish(session: pytest.Session, exitstatus):
     plugin = get_plugin(session.config)
-    if plugin.is_codspeed_enabled:
+    if not plugin.is_codspeed_enabled:
+        return
+    # With the CodSpeed runner, every process writes its own results
+    is_distributed = not plugin.profile_folder
+    if is_distributed and is_xdist_worker(session.config):
+        # The results are merged and written by the controller
+        plugin.instrument.run_deferred()
+        send_worker_results(session.config, plugin.instrument.get_result_dict())
+        return
+    if is_distributed and is_xdist_controller(session.config):
+        timestamp = time()
+        result_path = _get_result_path(session.config, plugin)
+        _make_results_folder(result_path.parent)
+        data = _merge_worker_results(session, plugin)
+        result_path.write_text(json.dumps(data, indent=2))
+    else:
+        plugin.instrument.run_deferred()
+        _stream_finished_benchmarks(plugin)
         plugin.instrument.report(session)
-        if plugin.profile_folder:
-            result_path = plugin.profile_folder / "results" / f"{os.getpid()}.json"
-        else:
-            # Default to a .codspeed folder in the root of the project.
-            # Storing the results will be later used for features such as
-            # local comparison between runs.
-            result_path = (
-                session.config.rootpath / f".codspeed/results_{time() * 1000:.0f}.json"
+        timestamp = time()
+        result_path, data = _write_results(session, plugin)
+    if not plugin.profile_folder and data["instrument"]["type"] == "walltime":
+        _append_to_history(session, timestamp, result_path, data)
+    if plugin.config.compare is not None:
+        _compare_with_previous_results(session, plugin, result_path, data)
+
+
+def _write_results(
+    session: pytest.Session, plugin: CodSpeedPlugin
+) -> tuple[Path, dict[str, Any]]:
+    if plugin.results_stream is not None and not plugin.config.resume:
+        result_path = plugin.results_stream.path.with_suffix(".json")
+    else:
+        result_path = _get_result_path(session.config, plugin)
+    _make_results_folder(result_path.parent)
+    samples = plugin.instrument.write_raw_samples(result_path.with_suffix(".samples"))
+    session_results = plugin.instrument.get_result_dict()
+    if samples is not None:
+        session_results["samples"] = samples
+    if plugin.results_stream is not None:
+        plugin.results_stream.close(session_results)
+        data = assemble_results(plugin.results_stream.path)
+    else:
+        data = {
+            **_get_environment_metadata(session.config, plugin),
+            **session_results,
+        }
+    result_path.write_text(json.dumps(data, indent=2))
+    if plugin.results_stream is not None:
+        plugin.results_stream.path.unlink()
+    return result_path, data
+
+
+def _merge_worker_results(
+    session: pytest.Session, plugin: CodSpeedPlugin
+) -> dict[str, Any]:
+    data = merge_worker_results(
+        {
+            **_get_environment_metadata(session.config, plugin),
+            # Kept when no worker sent results, e.g. when they all crashed
+            **plugin.instrument.get_result_dict(),
+        },
+        plugin.worker_results,
+    )
+    benchmarks = data.get("benchmarks", [])
+    if benchmarks and data["instrument"]["type"] == "walltime":
+        print_worker_results_table(benchmarks)
+    reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+    assert reporter is not None, "terminalreporter not found"
+    reporter.write_sep(
+        "=",
+        f"{len(benchmarks)} benchmarked on {len(plugin.worker_results)} worker(s)",
+    )
+    return data
+
+
+def _append_to_history(
+    session: pytest.Session,
+    timestamp: float,
+    result_path: Path,
+    data: dict[str, Any],
+) -> None:
+    try:
+        with HistoryStore(result_path.parent / HISTORY_FILE_NAME) as store:
+            store.append_session(
+                timestamp=timestamp,
+                git_commit=get_git_commit(session.config.rootpath),
+                environment=get_environment_fingerprint(data),
+                results_file=result_path.name,
+                benchmarks=data["benchmarks"],
             )
-        data = {**get_environment_metadata(), **plugin.instrument.get_result_dict()}
-        created = not result_path.parent.exists()
-        result_path.parent.mkdir(parents=True, exist_ok=True)
-        if created:
-            (result_path.parent / ".gitignore").write_text("*\n")
-        result_path.write_text(json.dumps(data, indent=2))
+    except sqlite3.Error as e:
+        reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+        assert reporter is not None, "terminalreporter not found"
+        reporter.write_line(f"codspeed: cannot append to the history: {e}")
+
+
+def _compare_with_previous_results(
+    session: pytest.Session,
+    plugin: CodSpeedPlugin,
+    result_path: Path,
+    data: dict[str, Any],
+) -> None:
+    reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+    assert reporter is not None, "terminalreporter not found"
+    previous = plugin.previous_results
+    if previous is None:
+        reporter.write_line("codspeed: no previous results to compare with")
+        return
+    diffs = diff_results(previous, ResultsFile(path=result_path, data=data))
+    threshold = plugin.config.compare_fail_threshold
+    if diffs:
+        print_diff_table(diffs, previous.path, threshold)
+    else:
+        reporter.write_line(f"codspeed: no benchmark in common with {previous.path}")
+    if threshold is None:
+        return
+    regressions = [diff for diff in diffs if diff.is_regression(threshold)]
+    if regressions:
+        reporter.write_sep(
+            "=",
+            f"{len(regressions)} benchmark(s) regressed by more than "
+            f"{threshold * 100:g}%",
+            red=True,
+        )
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
 
 
 class BenchmarkFixture:
@@ -340,6 +1060,19 @@ class BenchmarkFixture:
         self._plugin = get_plugin(self._config)
         self._called = False
 
+    @overload
+    def __call__(
+        self,
+        target: Callable[P, Coroutine[Any, Any, T]],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T: ...
+
+    @overload
+    def __call__(
+        self, target: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> T: ...
+
     def __call__(self, target: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
         if self._called:
             raise RuntimeError("The benchmark fixture can only be used once per test")
@@ -355,7 +1088,7 @@ class BenchmarkFixture:
                 kwargs,
             )
         else:
-            return target(*args, **kwargs)
+            return self._call_without_codspeed(target, args, kwargs)
 
     def pedantic(
         self,
@@ -393,11 +1126,53 @@ class BenchmarkFixture:
             )
         else:
             args, kwargs = pedantic_options.setup_and_get_args_kwargs()
-            result = target(*args, **kwargs)
+            result = self._call_without_codspeed(target, args, kwargs)
             if pedantic_options.teardown is not None:
                 pedantic_options.teardown(*args, **kwargs)
             return result
 
+    def compare(
+        self,
+        baseline: Callable[..., Any],
+        candidate: Callable[..., Any],
+        args: tuple[Any, ...] = (),
+        kwargs: dict[str, Any] = {},
+    ) -> tuple[Any, Any]:
+        """Benchmark a candidate implementation against a baseline, both called with
+        the same arguments.
+
+        In walltime mode, their rounds alternate and the ratio of their times is
+        reported with its confidence interval and significance.
+
+        Returns:
+            The results of the baseline and of the candidate
+        """
+        if self._called:
+            raise RuntimeError("The benchmark fixture can only be used once per test")
+        self._called = True
+        compare_options = CompareOptions(
+            baseline=baseline, candidate=candidate, args=args, kwargs=kwargs
+        )
+        if self._plugin.is_codspeed_enabled:
+            return _measure_compare(
+                self._plugin, self._request.node, self._config, compare_options
+            )
+        return (
+            self._call_without_codspeed(baseline, args, kwargs),
+            self._call_without_codspeed(candidate, args, kwargs),
+        )
+
+    def _call_without_codspeed(
+        self,
+        target: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        if not is_coroutine_function(target):
+            return target(*args, **kwargs)
+        with EventLoopRunner(self._plugin.config.asyncio_loop_factory) as event_loop:
+            return event_loop.run(target(*args, **kwargs))
+
 
 @pytest.fixture(scope="function")
 def codspeed_benchmark(request: pytest.FixtureRequest) -> Callable:
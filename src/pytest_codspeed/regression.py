@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+from rich.text import Text
+
+from pytest_codspeed.instruments.walltime import format_time
+from pytest_codspeed.stats import mann_whitney_u_test, median_notch
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any
+
+RESULTS_FILE_PATTERN = "results_*.json"
+SIGNIFICANCE_LEVEL = 0.05
+
+
+@dataclass
+class ResultsFile:
+    """The walltime results of a session, as written in the .codspeed folder."""
+
+    path: Path
+    data: dict[str, Any]
+
+    @classmethod
+    def load(cls, path: Path) -> ResultsFile:
+        """
+        Raises:
+            ValueError: If the file can't be read or does not hold walltime results
+        """
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            raise ValueError(f"cannot read the results file {path}: {e}") from None
+        instrument = data.get("instrument", {}).get("type")
+        if instrument != "walltime":
+            raise ValueError(
+                f"{path} holds {instrument} results, only walltime results can be "
+                "compared"
+            )
+        return cls(path=path, data=data)
+
+    @property
+    def benchmarks_by_uri(self) -> dict[str, dict[str, Any]]:
+        return {bench["uri"]: bench for bench in self.data["benchmarks"]}
+
+    def per_iteration_samples(self, bench: dict[str, Any]) -> list[float] | None:
+        """The raw per-iteration times of a benchmark, if they were saved."""
+        if "samples" not in self.data or "samples" not in bench:
+            return None
+        samples = array("q")
+        try:
+            with (self.path.parent / self.data["samples"]["path"]).open("rb") as f:
+                f.seek(bench["samples"]["offset"] * samples.itemsize)
+                samples.fromfile(f, bench["samples"]["count"])
+        except (OSError, EOFError):
+            return None
+        if sys.byteorder != "little":
+            samples.byteswap()
+        iter_per_round = bench["stats"]["iter_per_round"]
+        return [t / iter_per_round for t in samples]
+
+
+def find_latest_results(folder: Path) -> Path | None:
+    """The most recent results file of the folder, by the timestamp in its name."""
+    paths = list(folder.glob(RESULTS_FILE_PATTERN))
+    if not paths:
+        return None
+    return max(paths, key=lambda path: int(path.stem.split("_", 1)[1]))
+
+
+@dataclass
+class BenchmarkDiff:
+    name: str
+    uri: str
+    previous_ns: float
+    current_ns: float
+    """The median time of an iteration in the current session."""
+    p_value: float | None
+    """
+    The p-value of the Mann-Whitney U test, None when the raw samples of both
+    sessions were not saved and the median notches were compared instead.
+    """
+    significant: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ns / self.previous_ns
+
+    def is_regression(self, threshold: float) -> bool:
+        return self.significant and self.ratio > 1 + threshold
+
+
+def diff_results(previous: ResultsFile, current: ResultsFile) -> list[BenchmarkDiff]:
+    """Compare the benchmarks found in both sessions, matched by URI.
+
+    The rounds are compared with the Mann-Whitney U test when their raw samples were
+    saved in both sessions, and by the overlap of the notches around their medians
+    otherwise, since only the quartiles are known then. Both are non-parametric.
+    """
+    previous_benchmarks = previous.benchmarks_by_uri
+    diffs = []
+    for uri, bench in current.benchmarks_by_uri.items():
+        previous_bench = previous_benchmarks.get(uri)
+        if previous_bench is None:
+            continue
+        previous_samples = previous.per_iteration_samples(previous_bench)
+        current_samples = current.per_iteration_samples(bench)
+        p_value = None
+        if previous_samples and current_samples:
+            p_value = mann_whitney_u_test(previous_samples, current_samples)
+            significant = p_value < SIGNIFICANCE_LEVEL
+        else:
+            previous_low, previous_high = _notch(previous_bench["stats"])
+            current_low, current_high = _notch(bench["stats"])
+            significant = current_low > previous_high or current_high < previous_low
+        diffs.append(
+            BenchmarkDiff(
+                name=bench["name"],
+                uri=uri,
+                previous_ns=previous_bench["stats"]["median_ns"],
+                current_ns=bench["stats"]["median_ns"],
+                p_value=p_value,
+                significant=significant,
+            )
+        )
+    return diffs
+
+
+def _notch(stats: dict[str, Any]) -> tuple[float, float]:
+    return median_notch(
+        stats["q1_ns"], stats["median_ns"], stats["q3_ns"], stats["rounds"]
+    )
+
+
+def print_diff_table(
+    diffs: list[BenchmarkDiff], previous_path: Path, threshold: float | None
+) -> None:
+    table = Table(title=f"Comparison with {previous_path.name}")
+
+    table.add_column("Benchmark", justify="right", style="cyan", no_wrap=True)
+    table.add_column("Previous", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right", style="bold")
+    table.add_column("p-value", justify="right")
+    table.add_column("Verdict", justify="right")
+
+    for diff in diffs:
+        if not diff.significant:
+            verdict = Text("no change")
+        elif diff.ratio < 1:
+            verdict = Text(f"{1 / diff.ratio:.2f}x faster", style="green bold")
+        elif threshold is not None and diff.is_regression(threshold):
+            verdict = Text(f"{diff.ratio:.2f}x slower", style="red bold")
+        else:
+            verdict = Text(f"{diff.ratio:.2f}x slower", style="yellow")
+        table.add_row(
+            escape(diff.name),
+            format_time(diff.previous_ns),
+            format_time(diff.current_ns),
+            f"{(diff.ratio - 1) * 100:+.1f}%",
+            f"{diff.p_value:.3g}" if diff.p_value is not None else "-",
+            verdict,
+        )
+
+    console = Console()
+    console.print(table)
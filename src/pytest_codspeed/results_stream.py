@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import os
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from pytest_codspeed.utils import get_environment_fingerprint
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any, TextIO
+
+# The records are flushed right away, but only synced to the disk in batches
+STREAM_FSYNC_RECORDS = 16
+STREAM_FSYNC_INTERVAL_S = 1.0
+
+# The fields of a benchmark only known at the end of the session
+LATE_BENCHMARK_FIELDS = ("samples",)
+
+# The stream kept between the attempts of a session, to resume it
+CHECKPOINT_FILE_NAME = "checkpoint.jsonl"
+
+
+class ResultsStream:
+    """Append the results of the benchmarks to a JSON Lines file as they finish.
+
+    The first record holds the environment metadata, then each benchmark gets its
+    own record, and a last one holds the results of the whole session. If the
+    session is killed, every benchmark that finished before is still in the file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file: TextIO | None = None
+        self._unsynced_records = 0
+        self._last_sync = monotonic()
+
+    def open(
+        self, metadata: dict[str, Any], benchmarks: list[dict[str, Any]] = []
+    ) -> None:
+        """Start the stream, with the benchmarks already finished when resuming a
+        session."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("w")
+        self._write({"type": "header", **metadata})
+        for benchmark in benchmarks:
+            self._write({"type": "benchmark", **benchmark})
+        self._sync()
+
+    def write_benchmarks(self, benchmarks: list[dict[str, Any]]) -> None:
+        for benchmark in benchmarks:
+            self._write({"type": "benchmark", **benchmark})
+        if (
+            self._unsynced_records >= STREAM_FSYNC_RECORDS
+            or monotonic() - self._last_sync >= STREAM_FSYNC_INTERVAL_S
+        ):
+            self._sync()
+
+    def close(self, session_results: dict[str, Any]) -> None:
+        """Write the results of the whole session, then close the stream.
+
+        The benchmarks are already in the stream, so only their late fields are
+        written again.
+        """
+        record = {"type": "session", **session_results}
+        if "benchmarks" in record:
+            record["benchmarks"] = [
+                {
+                    "uri": bench["uri"],
+                    **{
+                        field: bench[field]
+                        for field in LATE_BENCHMARK_FIELDS
+                        if field in bench
+                    },
+                }
+                for bench in record["benchmarks"]
+            ]
+        self._write(record)
+        self._sync()
+        assert self._file is not None, "the stream is not open"
+        self._file.close()
+        self._file = None
+
+    def _write(self, record: dict[str, Any]) -> None:
+        assert self._file is not None, "the stream is not open"
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self._unsynced_records += 1
+
+    def _sync(self) -> None:
+        assert self._file is not None, "the stream is not open"
+        os.fsync(self._file.fileno())
+        self._unsynced_records = 0
+        self._last_sync = monotonic()
+
+
+def assemble_results(path: Path) -> dict[str, Any]:
+    """Build the results of a session from its stream.
+
+    The stream can be incomplete, e.g. when the session was killed: the results
+    then hold the benchmarks that finished, and a truncated last line is ignored.
+    The fields that are only known at the end of the session, like the location of
+    the raw samples, are taken from the session record and merged into the
+    benchmarks with the same URI.
+    """
+    results: dict[str, Any] = {}
+    benchmarks: list[dict[str, Any]] = []
+    session_results: dict[str, Any] = {}
+    with path.open() as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Partially written when the session was killed
+                break
+            record_type = record.pop("type")
+            if record_type == "header":
+                results.update(record)
+            elif record_type == "benchmark":
+                benchmarks.append(record)
+            elif record_type == "session":
+                session_results = record
+    late_fields = session_results.pop("benchmarks", None)
+    results.update(session_results)
+    if late_fields is not None or benchmarks:
+        late_fields_by_uri = {fields.pop("uri"): fields for fields in late_fields or []}
+        for bench in benchmarks:
+            bench.update(late_fields_by_uri.get(bench["uri"], {}))
+        results["benchmarks"] = benchmarks
+    return results
+
+
+def load_checkpoint(
+    path: Path, fingerprint: str, instrument: str
+) -> list[dict[str, Any]]:
+    """The benchmarks finished by a previous attempt of the session.
+
+    They are only reused if they were measured by the same instrument, in the same
+    environment.
+
+    Args:
+        fingerprint: The fingerprint of the current environment
+        instrument: The current instrument type
+    """
+    if not path.exists():
+        return []
+    checkpoint = assemble_results(path)
+    if (
+        ("python" not in checkpoint and "environment" not in checkpoint)
+        or get_environment_fingerprint(checkpoint) != fingerprint
+        or checkpoint.get("instrument", {}).get("type") != instrument
+    ):
+        return []
+    return checkpoint.get("benchmarks", [])
@@ -0,0 +1,61 @@
+"""Split the benchmarks of a suite across several machines, balanced by duration.
+
+Every machine computes the same partition independently, so they need the same
+history: the .codspeed folder of a previous session, e.g. restored from a CI cache.
+"""
+
+from __future__ import annotations
+
+import heapq
+import statistics
+from typing import TYPE_CHECKING
+
+from pytest_codspeed.history import load_latest_stats
+from pytest_codspeed.instruments import compare_variant
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def load_durations(folder: Path) -> dict[str, float]:
+    """The last known total time of the benchmarks, in seconds, by URI."""
+    return {
+        uri: stats["total_time"] for uri, stats in load_latest_stats(folder).items()
+    }
+
+
+def get_duration(durations: dict[str, float], uri: str) -> float | None:
+    """The duration of a benchmark, summing both variants of a compared one."""
+    if uri in durations:
+        return durations[uri]
+    variants = [compare_variant(uri, variant) for variant in ("baseline", "candidate")]
+    if all(variant in durations for variant in variants):
+        return sum(durations[variant] for variant in variants)
+    return None
+
+
+def partition(
+    uris: list[str], durations: dict[str, float], shard_count: int
+) -> list[int]:
+    """Assign each benchmark to a shard, so that the shards take about the same time.
+
+    The longest benchmarks are placed first, each one on the least loaded shard.
+    The benchmarks without a known duration are assumed to take the median one,
+    so without any history the shards get the same number of benchmarks.
+
+    Returns:
+        The index of the shard of each benchmark, from 0
+    """
+    known = [get_duration(durations, uri) for uri in uris]
+    known_durations = [d for d in known if d is not None]
+    default = statistics.median(known_durations) if known_durations else 1.0
+    weights = [d if d is not None else default for d in known]
+    # Sorted by URI on ties, so that every machine computes the same partition
+    order = sorted(range(len(uris)), key=lambda i: (-weights[i], uris[i]))
+    loads = [(0.0, shard) for shard in range(shard_count)]
+    shards = [0] * len(uris)
+    for i in order:
+        load, shard = heapq.heappop(loads)
+        shards[i] = shard
+        heapq.heappush(loads, (load + weights[i], shard))
+    return shards
@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from math import ceil, exp, floor, fsum, log, log2, pi, sqrt
+from statistics import NormalDist
+from typing import TYPE_CHECKING
+
+from pytest_codspeed.utils import IS_NUMPY_INSTALLED
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import Callable
+
+DEFAULT_CONFIDENCE = 0.95
+# Fixed so that the intervals of a given run are reproducible
+BOOTSTRAP_SEED = 0
+# Bounds the memory used by the vectorized bootstrap, in resampled values
+BOOTSTRAP_CHUNK_SIZE = 1_000_000
+
+
+def _median_ci_from_sorted(
+    sorted_samples: Sequence[float], confidence: float
+) -> tuple[float, float]:
+    n = len(sorted_samples)
+    if n == 0:
+        raise ValueError("Cannot compute a confidence interval without samples")
+    spread = NormalDist().inv_cdf((1 + confidence) / 2) * sqrt(n)
+    # 1-based ranks of the bounds, see Conover, Practical Nonparametric Statistics
+    lower_rank = max(1, floor((n - spread) / 2))
+    upper_rank = min(n, ceil(1 + (n + spread) / 2))
+    return sorted_samples[lower_rank - 1], sorted_samples[upper_rank - 1]
+
+
+def median_confidence_interval(
+    samples: Sequence[float], confidence: float = DEFAULT_CONFIDENCE
+) -> tuple[float, float]:
+    """Compute a distribution-free confidence interval of the median.
+
+    The bounds are order statistics of the samples, so no assumption is made
+    about the shape of the distribution (which is usually skewed for timings).
+
+    Args:
+        samples: The measured samples, in any order
+        confidence: The confidence level of the interval
+
+    Returns:
+        The lower and upper bounds of the interval
+    """
+    return _median_ci_from_sorted(sorted(samples), confidence)
+
+
+def relative_median_precision(
+    samples: Sequence[float],
+    confidence: float = DEFAULT_CONFIDENCE,
+    *,
+    is_sorted: bool = False,
+) -> float:
+    """Half-width of the median confidence interval, relative to the median.
+
+    When the samples are already sorted, the computation is done in constant time.
+    """
+    sorted_samples = samples if is_sorted else sorted(samples)
+    low, high = _median_ci_from_sorted(sorted_samples, confidence)
+    n = len(sorted_samples)
+    center = (sorted_samples[(n - 1) // 2] + sorted_samples[n // 2]) / 2
+    if center <= 0:
+        return 0.0 if high == low else float("inf")
+    return (high - low) / 2 / center
+
+
+def _percentile_interval(
+    sorted_estimates: Sequence[float], confidence: float
+) -> tuple[float, float]:
+    n = len(sorted_estimates)
+    alpha = (1 - confidence) / 2
+    return (
+        sorted_estimates[floor(alpha * (n - 1))],
+        sorted_estimates[ceil((1 - alpha) * (n - 1))],
+    )
+
+
+def _bootstrap_estimates_numpy(
+    samples: Sequence[float], resamples: int
+) -> tuple[list[float], list[float]]:
+    import numpy as np
+
+    values = np.asarray(samples, dtype=np.float64)
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+    chunk_rows = max(1, BOOTSTRAP_CHUNK_SIZE // len(values))
+    medians, means = [], []
+    for start in range(0, resamples, chunk_rows):
+        rows = min(chunk_rows, resamples - start)
+        draws = values[rng.integers(0, len(values), size=(rows, len(values)))]
+        medians.append(np.median(draws, axis=1))
+        means.append(draws.mean(axis=1))
+    return (
+        np.sort(np.concatenate(medians)).tolist(),
+        np.sort(np.concatenate(means)).tolist(),
+    )
+
+
+def _bootstrap_estimates_python(
+    samples: Sequence[float], resamples: int
+) -> tuple[list[float], list[float]]:
+    rng = random.Random(BOOTSTRAP_SEED)
+    n = len(samples)
+    medians, means = [], []
+    for _ in range(resamples):
+        draws = sorted(rng.choices(samples, k=n))
+        medians.append((draws[(n - 1) // 2] + draws[n // 2]) / 2)
+        means.append(fsum(draws) / n)
+    medians.sort()
+    means.sort()
+    return medians, means
+
+
+def bootstrap_confidence_intervals(
+    samples: Sequence[float],
+    resamples: int,
+    confidence: float = DEFAULT_CONFIDENCE,
+) -> tuple[tuple[float, float], tuple[float, float]]:
+    """Compute percentile bootstrap confidence intervals of the median and the mean.
+
+    The resampling is vectorized with NumPy when it is installed, and done in pure
+    Python otherwise.
+
+    Args:
+        samples: The measured samples, in any order
+        resamples: The number of bootstrap resamples to draw
+        confidence: The confidence level of the intervals
+
+    Returns:
+        The lower and upper bounds of the median and the mean intervals
+    """
+    if not samples:
+        raise ValueError("Cannot compute a confidence interval without samples")
+    if resamples < 1:
+        raise ValueError("resamples must be at least 1")
+    if IS_NUMPY_INSTALLED:
+        medians, means = _bootstrap_estimates_numpy(samples, resamples)
+    else:
+        medians, means = _bootstrap_estimates_python(samples, resamples)
+    return (
+        _percentile_interval(medians, confidence),
+        _percentile_interval(means, confidence),
+    )
+
+
+class RunningStats:
+    """Mean, variance and extrema updated in constant memory (Welford's algorithm)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def stdev(self) -> float:
+        """The sample standard deviation, 0 with less than two values."""
+        if self.count < 2:
+            return 0.0
+        return sqrt(self._m2 / (self.count - 1))
+
+
+class P2Quantile:
+    """Estimate a quantile in constant memory with the P² algorithm.
+
+    See Jain & Chlamtac, "The P² algorithm for dynamic calculation of quantiles and
+    histograms without storing observations" (1985).
+    """
+
+    def __init__(self, p: float) -> None:
+        if not 0 < p < 1:
+            raise ValueError("p must be between 0 and 1")
+        self.p = p
+        self._heights: list[float] = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, value: float) -> None:
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= heights[k + 1]:
+                k += 1
+        positions = self._positions
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (
+                d <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (
+                        positions[i + step] - positions[i]
+                    )
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float:
+        heights = self._heights
+        if not heights:
+            raise ValueError("Cannot estimate a quantile without samples")
+        if len(heights) < 5:
+            # Exact quantile, by linear interpolation between the sorted samples
+            rank = self.p * (len(heights) - 1)
+            low = floor(rank)
+            high = min(low + 1, len(heights) - 1)
+            return heights[low] + (heights[high] - heights[low]) * (rank - low)
+        return heights[2]
+
+
+class StreamingStats:
+    """Summary statistics of a stream of samples, updated in constant memory.
+
+    Quartiles are P² estimates, and outliers are counted against the estimates
+    available when each sample comes in, so both are approximations of the values
+    computed on the full list of samples.
+    """
+
+    def __init__(self, iqr_outlier_factor: float, stdev_outlier_factor: float) -> None:
+        self.running = RunningStats()
+        self.q1 = P2Quantile(0.25)
+        self.median = P2Quantile(0.5)
+        self.q3 = P2Quantile(0.75)
+        self.iqr_outlier_factor = iqr_outlier_factor
+        self.stdev_outlier_factor = stdev_outlier_factor
+        self.iqr_outliers = 0
+        self.stdev_outliers = 0
+
+    @property
+    def count(self) -> int:
+        return self.running.count
+
+    def add(self, value: float) -> None:
+        if self.running.count >= 5:
+            q1, q3 = self.q1.value, self.q3.value
+            iqr = q3 - q1
+            if (
+                value < q1 - self.iqr_outlier_factor * iqr
+                or value > q3 + self.iqr_outlier_factor * iqr
+            ):
+                self.iqr_outliers += 1
+            if (
+                abs(value - self.running.mean)
+                > self.stdev_outlier_factor * self.running.stdev
+            ):
+                self.stdev_outliers += 1
+        self.running.add(value)
+        self.q1.add(value)
+        self.median.add(value)
+        self.q3.add(value)
+
+    def relative_median_precision(
+        self, confidence: float = DEFAULT_CONFIDENCE
+    ) -> float:
+        """Approximate half-width of the median confidence interval, relative to the
+        median.
+
+        Uses the asymptotic standard error of the median, with the spread estimated
+        from the interquartile range to stay robust to outliers.
+        """
+        n = self.count
+        if n < 2:
+            return float("inf")
+        center = self.median.value
+        if center <= 0:
+            return float("inf")
+        # The IQR of a normal distribution spans 1.349 standard deviations
+        spread = (self.q3.value - self.q1.value) / 1.349 or self.running.stdev
+        standard_error = sqrt(pi / 2) * spread / sqrt(n)
+        return NormalDist().inv_cdf((1 + confidence) / 2) * standard_error / center
+
+
+COMPLEXITY_MODELS: dict[str, Callable[[float], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: log2(n),
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * log2(n),
+    "O(n^2)": lambda n: n * n,
+}
+# The minimum number of distinct sizes needed to tell the models apart
+COMPLEXITY_MIN_SIZES = 3
+
+
+@dataclass
+class ComplexityFit:
+    best_fit: str
+    """The name of the model with the lowest error, e.g. "O(n log n)"."""
+    coefficient: float
+    """The coefficient of the best model, in the unit of the times."""
+    rms: float
+    """The root mean square error of the best model, relative to the mean time."""
+    errors: dict[str, float]
+    """The relative root mean square error of every model."""
+
+
+def fit_complexity(sizes: Sequence[float], times: Sequence[float]) -> ComplexityFit:
+    """Fit the times measured at each input size to the usual complexity classes.
+
+    Each model is fitted as time = coefficient * f(size) by least squares, and the
+    one with the lowest root mean square error is selected, like Google Benchmark's
+    asymptotic complexity computation.
+
+    Raises:
+        ValueError: If there are less than COMPLEXITY_MIN_SIZES distinct sizes, or
+            sizes lower than 2 (where log n can't be told apart from a constant)
+    """
+    if len(set(sizes)) < COMPLEXITY_MIN_SIZES:
+        raise ValueError(
+            f"at least {COMPLEXITY_MIN_SIZES} distinct sizes are needed to fit a "
+            "complexity"
+        )
+    if len(sizes) != len(times):
+        raise ValueError("sizes and times must have the same length")
+    if min(sizes) < 2:
+        raise ValueError("sizes must be at least 2")
+    mean_time = fsum(times) / len(times)
+    errors: dict[str, float] = {}
+    coefficients: dict[str, float] = {}
+    for name, model in COMPLEXITY_MODELS.items():
+        values = [model(size) for size in sizes]
+        coefficient = fsum(t * v for t, v in zip(times, values)) / fsum(
+            v * v for v in values
+        )
+        residuals = fsum((t - coefficient * v) ** 2 for t, v in zip(times, values))
+        coefficients[name] = coefficient
+        errors[name] = sqrt(residuals / len(times)) / mean_time if mean_time else 0.0
+    best_fit = min(errors, key=errors.__getitem__)
+    return ComplexityFit(
+        best_fit=best_fit,
+        coefficient=coefficients[best_fit],
+        rms=errors[best_fit],
+        errors=errors,
+    )
+
+
+@dataclass
+class RatioComparison:
+    ratio: float
+    """The median of the candidate over the median of the baseline."""
+    ratio_ci: tuple[float, float]
+    p_value: float
+    """
+    The two-sided p-value of the Mann-Whitney U test, under the hypothesis that
+    neither sample tends to be larger than the other.
+    """
+
+
+def compare_samples(
+    baseline: Sequence[float],
+    candidate: Sequence[float],
+    confidence: float = DEFAULT_CONFIDENCE,
+) -> RatioComparison:
+    """Compare the samples of a candidate to the ones of a baseline.
+
+    The confidence interval of the ratio combines the distribution-free intervals
+    of both medians, with their widths added in quadrature in log space.
+
+    Raises:
+        ValueError: If a sample has less than 2 values, or values that are not
+            positive
+    """
+    if len(baseline) < 2 or len(candidate) < 2:
+        raise ValueError("at least 2 samples of each are needed to compare them")
+    if min(baseline) <= 0 or min(candidate) <= 0:
+        raise ValueError("samples must be positive to compare them")
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    log_medians = []
+    log_variance = 0.0
+    for samples in (baseline, candidate):
+        sorted_samples = sorted(samples)
+        n = len(sorted_samples)
+        median = (sorted_samples[(n - 1) // 2] + sorted_samples[n // 2]) / 2
+        low, high = _median_ci_from_sorted(sorted_samples, confidence)
+        log_medians.append(log(median))
+        log_variance += ((log(high) - log(low)) / (2 * z)) ** 2
+    log_ratio = log_medians[1] - log_medians[0]
+    half_width = z * sqrt(log_variance)
+    return RatioComparison(
+        ratio=exp(log_ratio),
+        ratio_ci=(exp(log_ratio - half_width), exp(log_ratio + half_width)),
+        p_value=mann_whitney_u_test(baseline, candidate),
+    )
+
+
+# Makes non-overlapping notches a test at roughly the 95% level (McGill et al.)
+NOTCH_FACTOR = 1.57
+
+
+def median_notch(
+    q1: float, median: float, q3: float, count: int
+) -> tuple[float, float]:
+    """The notch of a box plot around the median, median ± 1.57 IQR / sqrt(n).
+
+    When only the quartiles of two samples are known, their medians differ
+    significantly if their notches do not overlap.
+    """
+    half_width = NOTCH_FACTOR * (q3 - q1) / sqrt(count)
+    return median - half_width, median + half_width
+
+
+def mann_whitney_u_test(first: Sequence[float], second: Sequence[float]) -> float:
+    """Compute the two-sided p-value of the Mann-Whitney U test.
+
+    Uses the normal approximation, with the tie and continuity corrections, which
+    is accurate from about 20 samples in each.
+    """
+    n1, n2 = len(first), len(second)
+    n = n1 + n2
+    combined = sorted(
+        [(value, 0) for value in first] + [(value, 1) for value in second]
+    )
+    first_rank_sum = 0.0
+    tie_term = 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        # Tied values share the average of their 1-based ranks
+        average_rank = (i + j) / 2 + 1
+        first_rank_sum += average_rank * sum(
+            1 for k in range(i, j + 1) if combined[k][1] == 0
+        )
+        ties = j - i + 1
+        tie_term += ties**3 - ties
+        i = j + 1
+    u = first_rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = max(abs(u - mean) - 0.5, 0) / sqrt(variance)
+    return min(1.0, 2 * (1 - NormalDist().cdf(z)))
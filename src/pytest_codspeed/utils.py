@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import hashlib
 import importlib.util
+import json
 import os
+import subprocess
 import sys
 import sysconfig
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pytest
 
 from pytest_codspeed import __semver_version__
 
+if TYPE_CHECKING:
+    from typing import Any
+
 if sys.version_info < (3, 10):
     import importlib_metadata as importlib_metadata
 else:
@@ -18,6 +25,7 @@ else:
 
 IS_PYTEST_BENCHMARK_INSTALLED = importlib.util.find_spec("pytest_benchmark") is not None
 IS_PYTEST_SPEED_INSTALLED = importlib.util.find_spec("pytest_speed") is not None
+IS_NUMPY_INSTALLED = importlib.util.find_spec("numpy") is not None
 BEFORE_PYTEST_8_1_1 = pytest.version_tuple < (8, 1, 1)
 SUPPORTS_PERF_TRAMPOLINE = sysconfig.get_config_var("PY_HAVE_PERF_TRAMPOLINE") == 1
 
@@ -56,17 +64,57 @@ def get_git_relative_uri_and_name(nodeid: str, pytest_rootdir: Path) -> tuple[st
     return (f"{str(relative_git_path)}::{bench_name}", bench_name)
 
 
+def get_creator_metadata() -> dict[str, Any]:
+    return {
+        "name": "pytest-codspeed",
+        "version": __semver_version__,
+        "pid": os.getpid(),
+    }
+
+
+def is_gil_enabled() -> bool:
+    # Free-threaded builds can still enable the GIL at runtime
+    return getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def get_python_metadata() -> dict[str, Any]:
+    return {
+        "gil_disabled": sysconfig.get_config_var("Py_GIL_DISABLED") == 1,
+        "gil_enabled": is_gil_enabled(),
+        "sysconfig": sysconfig.get_config_vars(),
+        "dependencies": {d.name: d.version for d in importlib_metadata.distributions()},
+    }
+
+
 def get_environment_metadata() -> dict[str, dict]:
     return {
-        "creator": {
-            "name": "pytest-codspeed",
-            "version": __semver_version__,
-            "pid": os.getpid(),
-        },
-        "python": {
-            "sysconfig": sysconfig.get_config_vars(),
-            "dependencies": {
-                d.name: d.version for d in importlib_metadata.distributions()
-            },
-        },
+        "creator": get_creator_metadata(),
+        "python": get_python_metadata(),
     }
+
+
+def get_environment_fingerprint(metadata: dict[str, Any]) -> str:
+    """A hash of the Python environment described by the metadata, telling whether
+    the results of two sessions come from the same interpreter and dependencies.
+
+    The metadata either holds the Python environment, or references it by this
+    fingerprint.
+    """
+    if "python" not in metadata:
+        return metadata["environment"]
+    content = json.dumps(metadata["python"], sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def get_git_commit(path: Path) -> str | None:
+    """The commit checked out in the git repository containing the path, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=path,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -15,6 +15,7 @@ def test_sleep(benchmark, sleep_time):
     benchmark(sleep, sleep_time)
 
 
+@pytest.mark.benchmark(size_param="array_size")
 @pytest.mark.parametrize("array_size", [100, 1_000, 10_000, 100_000])
 def test_array_alloc(benchmark, array_size):
     benchmark(lambda: [0] * array_size)
@@ -53,6 +54,7 @@ def test_fs_write(benchmark, content_length):
     f.close()
 
 
+@pytest.mark.benchmark(size_param="content_length")
 @pytest.mark.parametrize("content_length", [100, 1000, 10_000, 100_000, 1_000_000])
 def test_fs_read(benchmark, content_length):
     with open("/dev/urandom", "rb") as f:
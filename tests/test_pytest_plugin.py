@@ -8,6 +8,10 @@ from conftest import (
     skip_without_valgrind,
 )
 
+from pytest_codspeed.config import parse_shard
+from pytest_codspeed.history import HISTORY_FILE_NAME, HistoryStore
+from pytest_codspeed.sharding import partition
+
 
 @pytest.mark.parametrize("mode", [*MeasurementMode])
 def test_plugin_enabled_with_kwargs(
@@ -293,6 +297,49 @@ def test_pytest_benchmark_return_value(
     assert result.ret == 0, "the run should have succeeded"
 
 
+@pytest.mark.parametrize("mode", [*MeasurementMode])
+def test_coroutine_benchmark(pytester: pytest.Pytester, mode: MeasurementMode) -> None:
+    pytester.makepyfile(
+        """
+        import asyncio
+
+        loops = set()
+
+        async def calculate_something(value):
+            loops.add(asyncio.get_running_loop())
+            await asyncio.sleep(0)
+            return value + 1
+
+        def test_call(benchmark):
+            assert benchmark(calculate_something, 1) == 2
+            # The warmup and every round run on the same loop
+            assert len(loops) == 1
+
+        def test_pedantic(benchmark):
+            value = benchmark.pedantic(
+                calculate_something, args=(2,), rounds=3, warmup_rounds=1
+            )
+            assert value == 3
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, mode)
+    result.assert_outcomes(passed=2)
+
+
+def test_coroutine_benchmark_without_codspeed(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        async def calculate_something():
+            return 1 + 1
+
+        def test_call(benchmark):
+            assert benchmark(calculate_something) == 2
+        """
+    )
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1)
+
+
 @pytest.mark.parametrize("mode", [*MeasurementMode])
 def test_print(pytester: pytest.Pytester, mode: MeasurementMode) -> None:
     """Test print statements are captured by pytest (i.e., not printed to terminal in
@@ -438,3 +485,146 @@ def test_benchmark_fixture_used_normal_pedantic(
     result.stdout.fnmatch_lines(
         ["*RuntimeError: The benchmark fixture can only be used once per test*"]
     )
+
+
+@pytest.mark.parametrize("mode", [*MeasurementMode])
+def test_compare(pytester: pytest.Pytester, mode: MeasurementMode) -> None:
+    pytester.makepyfile(
+        """
+        def test_compare(benchmark):
+            assert benchmark.compare(min, max, args=([3, 1, 2],)) == (1, 3)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, mode)
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*2 benchmark*"])
+
+
+def test_compare_without_codspeed(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_compare(benchmark):
+            assert benchmark.compare(min, max, args=([3, 1, 2],)) == (1, 3)
+        """
+    )
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1)
+
+
+@pytest.mark.parametrize("mode", [*MeasurementMode])
+def test_gc_policy(pytester: pytest.Pytester, mode: MeasurementMode) -> None:
+    pytester.makepyfile(
+        """
+        import gc
+        import pytest
+
+        def test_disabled_by_default(benchmark):
+            assert benchmark(gc.isenabled) is False
+            assert gc.isenabled()
+
+        @pytest.mark.benchmark(gc="enabled")
+        def test_enabled(benchmark):
+            assert benchmark(gc.isenabled) is True
+
+        @pytest.mark.benchmark(gc="freeze")
+        def test_freeze(benchmark):
+            assert benchmark(gc.get_freeze_count) > 0
+            assert gc.get_freeze_count() == 0
+            assert gc.isenabled()
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, mode)
+    result.assert_outcomes(passed=3)
+
+
+def test_gc_policy_option(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import gc
+        import pytest
+
+        def test_from_option(benchmark):
+            assert benchmark(gc.isenabled) is True
+
+        @pytest.mark.benchmark(gc="disabled")
+        def test_marker_overrides_option(benchmark):
+            assert benchmark(gc.isenabled) is False
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-gc=enabled"
+    )
+    result.assert_outcomes(passed=2)
+
+
+def test_parse_shard() -> None:
+    assert parse_shard("2/4") == (2, 4)
+    for value in ["", "2", "a/4", "0/4", "5/4"]:
+        with pytest.raises(ValueError, match="shard"):
+            parse_shard(value)
+
+
+def test_partition() -> None:
+    uris = ["a", "b", "c", "d", "e"]
+    durations = {"a": 6.0, "b": 3.0, "c": 3.0, "d": 2.0, "e": 1.0}
+    assert partition(uris, durations, 2) == [0, 1, 1, 0, 1]
+    # Without any known duration, the shards get the same number of benchmarks
+    assert sorted(partition(uris, {}, 2)) == [0, 0, 0, 1, 1]
+    # The unknown durations are assumed to be the median one
+    assert partition(uris, {"a": 10.0, "b": 1.0, "c": 1.0}, 2) == [0, 1, 1, 1, 1]
+
+
+def test_shard(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.parametrize("i", range(4))
+        def test_bench(benchmark, i):
+            benchmark(sum, range(10))
+
+        def test_not_benchmarked():
+            pass
+        """
+    )
+    codspeed_folder = pytester.path / ".codspeed"
+    codspeed_folder.mkdir()
+    stats = dict.fromkeys(
+        ["min_ns", "median_ns", "mean_ns", "stdev_ns", "q1_ns", "q3_ns"], 1.0
+    )
+    with HistoryStore(codspeed_folder / HISTORY_FILE_NAME) as store:
+        store.append_session(
+            timestamp=0,
+            git_commit=None,
+            environment="",
+            results_file=None,
+            benchmarks=[
+                {
+                    "uri": f"{pytester.path / 'test_shard.py'}::test_bench[{i}]",
+                    "name": f"test_bench[{i}]",
+                    "stats": {
+                        **stats,
+                        "rounds": 1,
+                        "iter_per_round": 1,
+                        "total_time": total_time,
+                    },
+                }
+                for i, total_time in enumerate([3.0, 1.0, 1.0, 1.0])
+            ],
+        )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.Simulation, "--codspeed-shard", "1/2", "-v"
+    )
+    result.assert_outcomes(passed=1, deselected=4)
+    result.stdout.fnmatch_lines(
+        [
+            "*codspeed: shard 1/2, 1 of 4 benchmark(s), balanced with the duration "
+            "of 4 of them",
+            "*test_bench?0? PASSED*",
+        ]
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.Simulation, "--codspeed-shard", "2/2", "-v"
+    )
+    result.assert_outcomes(passed=3, deselected=2)
+    assert "test_bench[0]" not in result.stdout.str()
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from conftest import run_pytest_codspeed_with_mode
+
+from pytest_codspeed.instruments import MeasurementMode, get_instrument_from_mode
+from pytest_codspeed.instruments.analysis import AnalysisInstrument
+from pytest_codspeed.instruments.memory import LocalMemoryInstrument
+
+
+def test_local_memory_instrument_without_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("CODSPEED_ENV", raising=False)
+    assert get_instrument_from_mode(MeasurementMode.Memory) is LocalMemoryInstrument
+    monkeypatch.setenv("CODSPEED_ENV", "1")
+    assert get_instrument_from_mode(MeasurementMode.Memory) is AnalysisInstrument
+
+
+def test_local_memory_profile(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def make_objects():
+            return [object() for _ in range(10_000)]
+
+        def test_objects(benchmark):
+            assert len(benchmark(make_objects)) == 10_000
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.Memory)
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "codspeed: * (enabled, mode: memory, profiler: tracemalloc (local))",
+            "*Memory Profile*",
+            "*test_objects*test_local_memory_profile*",
+            "*1 benchmarked*",
+        ]
+    )
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    results = json.loads(results_path.read_text())
+    assert results["instrument"]["type"] == "memory"
+    [bench] = results["benchmarks"]
+    profile = bench["profile"]
+    # The result is still alive when the benchmark ends
+    assert profile["allocated_blocks"] >= 10_000
+    assert profile["allocated_bytes"] >= 10_000 * 16
+    assert profile["peak_bytes"] >= 10_000 * 16
+    [top_site, *_] = profile["top_sites"]
+    assert top_site["filename"].endswith("test_local_memory_profile.py")
+    assert top_site["lineno"] == 2
+    assert top_site["blocks"] >= 10_000
+
+
+def test_local_memory_profile_pedantic(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_setup_not_profiled(benchmark):
+            def setup():
+                return (bytearray(10_000_000),), {}
+
+            benchmark.pedantic(len, setup=setup)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.Memory)
+    result.assert_outcomes(passed=1)
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    assert bench["profile"]["peak_bytes"] < 10_000_000
+
+
+def test_local_memory_stream_results(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_objects(benchmark):
+            benchmark(list, range(1_000))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.Memory, "--codspeed-stream-results"
+    )
+    result.assert_outcomes(passed=1)
+    [results_path] = (pytester.path / ".codspeed").glob("*.json")
+    results = json.loads(results_path.read_text())
+    assert results["instrument"]["type"] == "memory"
+    [bench] = results["benchmarks"]
+    assert bench["name"] == "test_objects"
+    assert bench["profile"]["allocated_blocks"] > 0
@@ -1,19 +1,47 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import statistics
+import sys
+import tracemalloc
+from array import array
 
-from conftest import run_pytest_codspeed_with_mode
-
-if TYPE_CHECKING:
-    import pytest
+import pytest
+from conftest import run_pytest_codspeed_with_mode, skip_without_pytest_xdist
 
+from pytest_codspeed.budget import plan_time_budget
 from pytest_codspeed.config import (
     BenchmarkMarkerOptions,
     CodSpeedConfig,
     PedanticOptions,
+    parse_cpu_list,
+)
+from pytest_codspeed.distributed import (
+    assign_worker_cpus,
+    get_worker_index,
+    group_physical_cores,
+    merge_worker_results,
 )
+from pytest_codspeed.history import HistoryStore
 from pytest_codspeed.instruments import MeasurementMode
-from pytest_codspeed.instruments.walltime import WallTimeInstrument
+from pytest_codspeed.instruments.memory import (
+    ALLOCATION_MAX_ITERATIONS,
+    measure_allocations,
+)
+from pytest_codspeed.instruments.walltime import (
+    PRECISION_MIN_ROUNDS,
+    Benchmark,
+    BenchmarkConfig,
+    BenchmarkStats,
+    SteadyStateDetector,
+    WallTimeInstrument,
+)
+from pytest_codspeed.regression import ResultsFile, diff_results
+from pytest_codspeed.results_stream import assemble_results
 
 
 def test_bench_enabled_header_with_perf(
@@ -141,3 +169,1482 @@ def test_benchmark_pedantic_walltime_setup_not_timed(monkeypatch: pytest.MonkeyP
     assert len(instrument.benchmarks) == 1
     # Two rounds should each measure target-only time (400ns), excluding setup (200ns).
     assert instrument.benchmarks[0].stats.min_ns == 400
+
+
+def test_benchmark_target_precision_stops_early(monkeypatch: pytest.MonkeyPatch):
+    """A perfectly stable benchmark should stop as soon as the precision is
+    checked instead of running until max_time."""
+    current_time_ns = 0
+
+    def fake_perf_counter_ns() -> int:
+        return current_time_ns
+
+    monkeypatch.setattr(
+        "pytest_codspeed.instruments.walltime.perf_counter_ns", fake_perf_counter_ns
+    )
+
+    def target() -> None:
+        nonlocal current_time_ns
+        current_time_ns += 10_000_000
+
+    instrument = WallTimeInstrument(
+        CodSpeedConfig(warmup_time_ns=0, target_precision=0.005),
+        MeasurementMode.WallTime,
+    )
+    instrument.measure(
+        BenchmarkMarkerOptions(max_time=100),
+        name="test_stable",
+        uri="tests/test_benchmark.py::test_stable",
+        fn=target,
+    )
+
+    stats = instrument.benchmarks[0].stats
+    assert stats.rounds == PRECISION_MIN_ROUNDS
+    assert instrument.benchmarks[0].config.target_precision == 0.005
+
+
+def test_benchmark_target_precision_keeps_noisy_benchmarks_running(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """A noisy benchmark must keep running past the first precision check, and the
+    marker precision takes precedence over the configured one."""
+    current_time_ns = 0
+
+    def fake_perf_counter_ns() -> int:
+        return current_time_ns
+
+    monkeypatch.setattr(
+        "pytest_codspeed.instruments.walltime.perf_counter_ns", fake_perf_counter_ns
+    )
+    calls = itertools.count()
+
+    def target() -> None:
+        nonlocal current_time_ns
+        current_time_ns += 10_000_000 if next(calls) % 2 else 15_000_000
+
+    instrument = WallTimeInstrument(
+        # Loose enough to stop at the first check without the marker
+        CodSpeedConfig(warmup_time_ns=0, target_precision=0.5),
+        MeasurementMode.WallTime,
+    )
+    instrument.measure(
+        BenchmarkMarkerOptions(max_time=100, max_rounds=100, target_precision="0.5%"),
+        name="test_noisy",
+        uri="tests/test_benchmark.py::test_noisy",
+        fn=target,
+    )
+
+    benchmark = instrument.benchmarks[0]
+    assert benchmark.config.target_precision == 0.005
+    assert benchmark.stats.rounds == 100
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(0.005, 0.005), ("0.5%", 0.005), ("0.02", 0.02)],
+)
+def test_target_precision_marker_parsing(value: float | str, expected: float) -> None:
+    options = BenchmarkMarkerOptions(target_precision=value)  # type: ignore[arg-type]
+    assert options.target_precision == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("value", [0, 1, "150%", "-1%", "fast"])
+def test_target_precision_marker_invalid(value: float | str) -> None:
+    with pytest.raises(ValueError, match="precision"):
+        BenchmarkMarkerOptions(target_precision=value)  # type: ignore[arg-type]
+
+
+def test_target_precision_option(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        class FakeClock:
+            now = 0
+
+            def perf_counter_ns(self):
+                return self.now
+
+        @pytest.mark.benchmark(max_time=100)
+        def test_stable(benchmark, monkeypatch):
+            clock = FakeClock()
+            monkeypatch.setattr(
+                "pytest_codspeed.instruments.walltime.perf_counter_ns",
+                clock.perf_counter_ns,
+            )
+
+            def target():
+                clock.now += 10_000_000
+
+            benchmark(target)
+        """
+    )
+    result = pytester.runpytest(
+        "--codspeed",
+        "--codspeed-mode=walltime",
+        "--codspeed-warmup-time=0",
+        "--codspeed-target-precision=1%",
+    )
+    result.assert_outcomes(passed=1)
+    results = json.loads(next((pytester.path / ".codspeed").glob("*.json")).read_text())
+    benchmark = results["benchmarks"][0]
+    assert benchmark["config"]["target_precision"] == 0.01
+    assert benchmark["stats"]["rounds"] == PRECISION_MIN_ROUNDS
+
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-target-precision=120%"
+    )
+    assert result.ret == 4
+    result.stderr.fnmatch_lines(["*precision must be between 0 and 100%*"])
+
+
+def test_benchmark_overhead_calibration(monkeypatch: pytest.MonkeyPatch):
+    """The harness overhead is measured with an empty target and reported
+    separately from the raw timings."""
+    current_time_ns = 0
+
+    def fake_perf_counter_ns() -> int:
+        nonlocal current_time_ns
+        # Every clock read costs 1ns, the same for the target and the empty loop
+        current_time_ns += 1
+        return current_time_ns
+
+    monkeypatch.setattr(
+        "pytest_codspeed.instruments.walltime.perf_counter_ns", fake_perf_counter_ns
+    )
+
+    def target() -> None:
+        nonlocal current_time_ns
+        current_time_ns += 100
+
+    instrument = WallTimeInstrument(
+        CodSpeedConfig(warmup_time_ns=0), MeasurementMode.WallTime
+    )
+    instrument.measure(
+        BenchmarkMarkerOptions(max_rounds=5, min_time=0),
+        name="test_overhead",
+        uri="tests/test_benchmark.py::test_overhead",
+        fn=target,
+    )
+
+    stats = instrument.benchmarks[0].stats
+    assert stats.overhead_ns == 1
+    assert stats.min_ns == 101
+    assert stats.corrected_min_ns == 100
+    assert stats.corrected_median_ns == 100
+    assert not stats.is_within_overhead_noise
+
+
+def test_benchmark_within_overhead_noise_warns(monkeypatch: pytest.MonkeyPatch):
+    # A clock ticking on every read: the target costs nothing more than the harness
+    monkeypatch.setattr(
+        "pytest_codspeed.instruments.walltime.perf_counter_ns",
+        itertools.count().__next__,
+    )
+
+    instrument = WallTimeInstrument(
+        CodSpeedConfig(warmup_time_ns=0), MeasurementMode.WallTime
+    )
+    with pytest.warns(RuntimeWarning, match="within the noise of the harness"):
+        instrument.measure(
+            BenchmarkMarkerOptions(max_rounds=5, min_time=0),
+            name="test_empty",
+            uri="tests/test_benchmark.py::test_empty",
+            fn=lambda: None,
+        )
+
+    stats = instrument.benchmarks[0].stats
+    assert stats.corrected_median_ns == 0
+    assert stats.is_within_overhead_noise
+
+
+def test_benchmark_pedantic_is_not_calibrated(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_pedantic(benchmark):
+            benchmark.pedantic(lambda: None, rounds=2)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*test_pedantic*-*"])
+    results = json.loads(next((pytester.path / ".codspeed").glob("*.json")).read_text())
+    stats = results["benchmarks"][0]["stats"]
+    assert stats["overhead_ns"] is None
+    assert stats["corrected_min_ns"] is None
+
+
+def test_benchmark_table_shows_per_iteration_times(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    instrument = WallTimeInstrument(CodSpeedConfig(), MeasurementMode.WallTime)
+    config = BenchmarkConfig.from_codspeed_config_and_marker_data(
+        CodSpeedConfig(), BenchmarkMarkerOptions()
+    )
+    stats = BenchmarkStats.from_list(
+        [2_000, 2_000],
+        rounds=2,
+        iter_per_round=10,
+        warmup_iters=0,
+        total_time=0.1,
+        overhead_ns=50,
+        overhead_stdev_ns=0,
+    )
+    instrument.benchmarks.append(
+        Benchmark(
+            name="test_table", uri="test.py::test_table", config=config, stats=stats
+        )
+    )
+
+    instrument._print_benchmark_table()
+
+    row = next(
+        line for line in capsys.readouterr().out.splitlines() if "test_table" in line
+    )
+    assert "200ns" in row
+    assert "150ns" in row
+
+
+def test_benchmark_stats_from_list_matches_statistics() -> None:
+    times_per_round_ns = array("q", [(i * 7919) % 1000 + 500 for i in range(101)])
+    times_per_round_ns.append(10_000)  # outlier
+    stats = BenchmarkStats.from_list(
+        times_per_round_ns,
+        rounds=len(times_per_round_ns),
+        iter_per_round=4,
+        warmup_iters=0,
+        total_time=1.0,
+    )
+
+    times_ns = [t / 4 for t in times_per_round_ns]
+    q1_ns, median_ns, q3_ns = statistics.quantiles(times_ns, n=4)
+    assert stats.q1_ns == pytest.approx(q1_ns)
+    assert stats.median_ns == pytest.approx(median_ns)
+    assert stats.q3_ns == pytest.approx(q3_ns)
+    assert stats.mean_ns == pytest.approx(statistics.mean(times_ns))
+    assert stats.stdev_ns == pytest.approx(statistics.stdev(times_ns))
+    assert stats.min_ns == min(times_ns)
+    assert stats.max_ns == max(times_ns)
+    assert stats.iqr_outlier_rounds == 1
+    assert stats.stdev_outlier_rounds == 1
+
+
+def test_save_raw_samples(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+
+        def test_second(benchmark):
+            benchmark(sum, range(100))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-save-samples"
+    )
+    result.assert_outcomes(passed=2)
+
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    results = json.loads(results_path.read_text())
+    assert results["samples"]["dtype"] == "<i8"
+    samples_path = results_path.parent / results["samples"]["path"]
+    assert samples_path == results_path.with_suffix(".samples")
+    with samples_path.open("rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        all_samples = memoryview(mapped).cast("q")
+        for bench in results["benchmarks"]:
+            offset, count = bench["samples"]["offset"], bench["samples"]["count"]
+            samples = all_samples[offset : offset + count].tolist()
+            assert count == bench["stats"]["rounds"] == 2
+            assert min(samples) / bench["stats"]["iter_per_round"] == pytest.approx(
+                bench["stats"]["min_ns"]
+            )
+        all_samples.release()
+
+
+def test_streaming_stats(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-streaming-stats"
+    )
+    result.assert_outcomes(passed=1)
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    stats = bench["stats"]
+    assert stats["rounds"] == 2
+    assert stats["min_ns"] <= stats["median_ns"] <= stats["max_ns"]
+
+
+def test_streaming_stats_cannot_save_samples(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile("def test_nothing(): pass")
+    result = run_pytest_codspeed_with_mode(
+        pytester,
+        MeasurementMode.WallTime,
+        "--codspeed-streaming-stats",
+        "--codspeed-save-samples",
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+
+
+def test_bootstrap_confidence_intervals(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester,
+        MeasurementMode.WallTime,
+        "--codspeed-bootstrap-resamples=100",
+        "--codspeed-max-rounds=30",
+    )
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*test_first*±*%*"])
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    stats = bench["stats"]
+    assert stats["median_ci_ns"][0] <= stats["median_ns"] <= stats["median_ci_ns"][1]
+    assert stats["mean_ci_ns"][0] <= stats["mean_ns"] <= stats["mean_ci_ns"][1]
+
+
+def test_bootstrap_confidence_intervals_disabled_by_default(
+    pytester: pytest.Pytester,
+) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    assert "±" not in result.stdout.str()
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    assert bench["stats"]["median_ci_ns"] is None
+
+
+def test_coroutine_overhead_is_calibrated(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        async def test_target():
+            pass
+
+        def test_first(benchmark):
+            benchmark(test_target)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    assert bench["stats"]["overhead_ns"] > 0
+    assert bench["stats"]["corrected_median_ns"] is not None
+
+
+def test_asyncio_loop_factory(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        loops="""
+        import asyncio
+
+        created = []
+
+        def new_event_loop():
+            loop = asyncio.new_event_loop()
+            created.append(loop)
+            return loop
+        """
+    )
+    pytester.makepyfile(
+        """
+        import asyncio
+        import loops
+
+        async def get_loop():
+            return asyncio.get_running_loop()
+
+        def test_first(benchmark):
+            loop = benchmark(get_loop)
+            assert loops.created == [loop]
+            assert loop.is_closed()
+        """
+    )
+    pytester.syspathinsert()
+    result = run_pytest_codspeed_with_mode(
+        pytester,
+        MeasurementMode.WallTime,
+        "--codspeed-asyncio-loop-factory=loops:new_event_loop",
+    )
+    result.assert_outcomes(passed=1)
+
+
+def test_asyncio_loop_factory_invalid(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile("def test_nothing(): pass")
+    result = run_pytest_codspeed_with_mode(
+        pytester,
+        MeasurementMode.WallTime,
+        "--codspeed-asyncio-loop-factory=not_a_module:factory",
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*cannot import loop factory*"])
+
+
+def test_resource_usage(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import time
+
+        def test_sleep(benchmark):
+            benchmark(time.sleep, 0.002)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-show-resource-usage"
+    )
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*Ctx*", "*test_sleep*%*/*/*"])
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    usage = bench["stats"]["resource_usage"]
+    # Sleeping is off-CPU: most of the wall time is not CPU time
+    assert 0 < usage["cpu_time_ns"] < bench["stats"]["mean_ns"] / 2
+    assert usage["thread_time_ns"] <= usage["cpu_time_ns"]
+    if sys.platform != "win32":
+        assert usage["voluntary_context_switches"] >= 1
+        assert usage["minor_page_faults"] >= 0
+
+
+def test_resource_usage_hidden_by_default(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    assert "Ctx" not in result.stdout.str()
+
+
+@pytest.mark.parametrize(
+    "value, expected", [([4, 1, 2], (1, 2, 4)), ((2, 2), (2,)), (range(1, 3), (1, 2))]
+)
+def test_threads_marker_parsing(value: list[int], expected: tuple[int, ...]) -> None:
+    options = BenchmarkMarkerOptions(threads=value)  # type: ignore[arg-type]
+    assert options.threads == expected
+
+
+@pytest.mark.parametrize("value", [[], [0, 1], [1.5], "12", [True]])
+def test_threads_marker_invalid(value: list[int]) -> None:
+    with pytest.raises(ValueError, match="worker counts"):
+        BenchmarkMarkerOptions(threads=value)  # type: ignore[arg-type]
+
+
+def test_thread_scaling(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import threading
+        import pytest
+
+        seen_threads = set()
+
+        def target():
+            seen_threads.add(threading.get_ident())
+            sum(range(100))
+
+        @pytest.mark.benchmark(threads=[1, 3], max_time=0.05)
+        def test_scaling(benchmark):
+            benchmark(target)
+            # Thread identifiers can be reused once a thread has exited
+            assert len(seen_threads) >= 4
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*Thread Scaling*", "*test_scaling*3*ops/s*"])
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    assert bench["config"]["threads"] == [1, 3]
+    one, three = bench["thread_scaling"]
+    assert (one["workers"], three["workers"]) == (1, 3)
+    assert one["efficiency"] == 1.0
+    assert one["ops_per_sec"] > 0 and three["ops_per_sec"] > 0
+    assert three["latency_ns"] > 0
+
+
+def test_thread_scaling_error_in_thread(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import threading
+        import pytest
+
+        def target():
+            if threading.current_thread() is not threading.main_thread():
+                raise RuntimeError("not thread-safe")
+
+        @pytest.mark.benchmark(threads=[2], max_time=0.01)
+        def test_scaling(benchmark):
+            benchmark(target)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*RuntimeError: not thread-safe*"])
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires fork"
+)
+def test_process_scaling(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        def target():
+            sum(range(1000))
+
+        @pytest.mark.benchmark(processes=[1, 2], max_time=0.05)
+        def test_scaling(benchmark):
+            benchmark(target)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*Process Scaling*", "*test_scaling*2*ops/s*"])
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    assert bench["config"]["processes"] == [1, 2]
+    one, two = bench["process_scaling"]
+    assert (one["workers"], two["workers"]) == (1, 2)
+    assert one["efficiency"] == 1.0
+    assert two["ops_per_sec"] > 0 and two["latency_ns"] > 0
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires fork"
+)
+def test_process_scaling_error_in_worker(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import os
+        import pytest
+
+        parent_pid = os.getpid()
+
+        def target():
+            if os.getpid() != parent_pid:
+                raise RuntimeError("failed in worker")
+
+        @pytest.mark.benchmark(processes=[2], max_time=0.01)
+        def test_scaling(benchmark):
+            benchmark(target)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*RuntimeError: failed in worker*"])
+
+
+def test_complexity_sweep(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        def quadratic(n):
+            for i in range(n):
+                for j in range(n):
+                    pass
+
+        @pytest.mark.benchmark(size_param="n", max_time=0.05)
+        @pytest.mark.parametrize("n", [10, 40, 160])
+        @pytest.mark.parametrize("variant", ["a", "b"])
+        def test_quadratic(benchmark, n, variant):
+            benchmark(quadratic, n)
+
+        @pytest.mark.benchmark(size_param="data", max_time=0.05)
+        @pytest.mark.parametrize("data", [[0] * 10, [0] * 100, [0] * 1000])
+        def test_sized(benchmark, data):
+            benchmark(sum, data)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-max-rounds=10"
+    )
+    result.assert_outcomes(passed=9)
+    result.stdout.fnmatch_lines(["*Complexity*", "*test_quadratic*O(n^2)*"])
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    sweeps = json.loads(results_path.read_text())["complexity"]
+    by_name = {sweep["name"]: sweep for sweep in sweeps}
+    assert set(by_name) == {
+        "test_quadratic[variant='a']",
+        "test_quadratic[variant='b']",
+        "test_sized",
+    }
+    quadratic = by_name["test_quadratic[variant='a']"]
+    assert quadratic["size_param"] == "n"
+    assert quadratic["sizes"] == [10, 40, 160]
+    assert quadratic["fit"]["best_fit"] == "O(n^2)"
+    assert by_name["test_sized"]["sizes"] == [10, 100, 1000]
+
+
+@pytest.mark.parametrize(
+    "marker, error",
+    [
+        ('size_param="missing"', "is not a parameter of the benchmark"),
+        ('size_param="n"', "must be a number or a sized collection"),
+    ],
+)
+def test_complexity_sweep_invalid_size(
+    pytester: pytest.Pytester, marker: str, error: str
+) -> None:
+    pytester.makepyfile(
+        f"""
+        import pytest
+
+        @pytest.mark.benchmark({marker})
+        @pytest.mark.parametrize("n", [object()])
+        def test_sweep(benchmark, n):
+            benchmark(lambda: None)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines([f"*{error}*"])
+
+
+def test_raw_samples_not_saved_by_default(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    assert list((pytester.path / ".codspeed").glob("*.samples")) == []
+    results = json.loads(next((pytester.path / ".codspeed").glob("*.json")).read_text())
+    assert "samples" not in results
+    assert "samples" not in results["benchmarks"][0]
+
+
+def test_steady_state_detector() -> None:
+    detector = SteadyStateDetector(window=4, tolerance=0.05)
+    # Drifting times are never steady
+    assert not any(detector.is_steady(t) for t in [400, 390, 380, 370])
+    assert not any(detector.is_steady(t) for t in [300, 290, 280, 270])
+    assert not any(detector.is_steady(t) for t in [100, 101, 99, 100])
+    # Two consecutive windows with close medians are steady
+    assert [detector.is_steady(t) for t in [102, 98, 100, 101]] == [
+        False,
+        False,
+        False,
+        True,
+    ]
+    assert detector.window_mean_ns == pytest.approx(100.25)
+
+
+def test_steady_warmup_strategy(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester,
+        MeasurementMode.WallTime,
+        "--codspeed-warmup-strategy=steady",
+        "--codspeed-warmup-time=1",
+    )
+    result.assert_outcomes(passed=1)
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    assert bench["config"]["warmup_strategy"] == "steady"
+    assert isinstance(bench["stats"]["warmup_steady"], bool)
+    assert bench["stats"]["warmup_iters"] >= 1
+
+
+def test_fixed_warmup_strategy_by_default(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    assert bench["config"]["warmup_strategy"] == "fixed"
+    assert bench["stats"]["warmup_steady"] is None
+
+
+def test_gc_marker_invalid() -> None:
+    with pytest.raises(ValueError, match="gc must be one of"):
+        BenchmarkMarkerOptions(gc="sometimes")
+
+
+def test_gc_time_is_measured(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        def make_cycles():
+            for _ in range(1_000):
+                cycle = []
+                cycle.append(cycle)
+
+        @pytest.mark.benchmark(gc="enabled")
+        def test_enabled(benchmark):
+            benchmark(make_cycles)
+
+        def test_disabled(benchmark):
+            benchmark(make_cycles)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-max-rounds=20"
+    )
+    result.assert_outcomes(passed=2)
+    assert "GC time" in result.stdout.str()
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    benches = {
+        bench["name"]: bench
+        for bench in json.loads(results_path.read_text())["benchmarks"]
+    }
+    enabled = benches["test_enabled"]
+    assert enabled["config"]["gc_policy"] == "enabled"
+    assert enabled["stats"]["gc"]["collections"] > 0
+    assert enabled["stats"]["gc"]["collected"] > 0
+    assert 0 < enabled["stats"]["gc"]["time_ns"] < enabled["stats"]["mean_ns"]
+    assert benches["test_disabled"]["stats"]["gc"]["collections"] == 0
+
+
+def test_measure_allocations() -> None:
+    retained = []
+
+    def run_round(iterations: int) -> int:
+        for _ in range(iterations):
+            retained.append(bytearray(10_000))
+            bytearray(100_000)
+        return 0
+
+    allocations = measure_allocations(run_round, mean_ns=1_000)
+    assert allocations.iterations == ALLOCATION_MAX_ITERATIONS
+    assert 110_000 <= allocations.allocated_bytes < 115_000
+    assert 10_000 <= allocations.retained_bytes < 11_000
+    # The bytearray object and its buffer
+    assert 2 <= allocations.retained_blocks < 2.5
+    assert allocations.peak_bytes >= ALLOCATION_MAX_ITERATIONS * 10_000
+    assert not tracemalloc.is_tracing()
+
+
+def test_trace_allocations(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_allocate(benchmark):
+            benchmark(bytearray, 1_000_000)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-trace-allocations"
+    )
+    result.assert_outcomes(passed=1)
+    assert "Peak" in result.stdout.str()
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    allocations = bench["allocations"]
+    assert allocations["allocated_bytes"] >= 1_000_000
+    # Nothing is kept across iterations, besides a few interpreter caches
+    assert allocations["retained_blocks"] < 1
+    assert allocations["peak_bytes"] >= 1_000_000
+
+
+def test_allocations_not_traced_by_default(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_allocate(benchmark):
+            benchmark(bytearray, 1_000)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    results_path = next((pytester.path / ".codspeed").glob("*.json"))
+    [bench] = json.loads(results_path.read_text())["benchmarks"]
+    assert bench["allocations"] is None
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("0", (0,)), ("3,1", (1, 3)), ("0-2,2,5", (0, 1, 2, 5))],
+)
+def test_parse_cpu_list(value: str, expected: tuple[int, ...]) -> None:
+    assert parse_cpu_list(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "a", "1,", "3-1", "-1"])
+def test_parse_cpu_list_invalid(value: str) -> None:
+    with pytest.raises(ValueError, match="invalid CPU list"):
+        parse_cpu_list(value)
+
+
+skip_without_affinity = pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="CPU affinity is not supported"
+)
+
+
+@skip_without_affinity
+def test_cpu_pinning(pytester: pytest.Pytester) -> None:
+    affinity = os.sched_getaffinity(0)
+    cpu = min(affinity)
+    pytester.makepyfile(
+        f"""
+        import os
+
+        def test_pinned(benchmark):
+            assert benchmark(os.sched_getaffinity, 0) == {{{cpu}}}
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, f"--codspeed-cpu={cpu}"
+    )
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(
+        [f"codspeed: * (enabled, mode: walltime, *cpus: {cpu})"]
+    )
+    # Restored once the session is over
+    assert os.sched_getaffinity(0) == affinity
+    results = json.loads(next((pytester.path / ".codspeed").glob("*.json")).read_text())
+    assert results["instrument"]["cpus"] == [cpu]
+    [bench] = results["benchmarks"]
+    migrations = bench["stats"]["resource_usage"]["cpu_migrations"]
+    assert migrations is None or migrations >= 0
+
+
+@skip_without_affinity
+def test_cpu_pinning_invalid_cpu(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-cpu=100000"
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*cannot pin the process on CPUs 100000*"])
+
+
+def test_nice(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import os
+
+        def test_nice(benchmark):
+            assert benchmark(os.getpriority, os.PRIO_PROCESS, 0) == 5
+        """
+    )
+    # In a subprocess, since the priority may not be restored without privileges
+    result = pytester.runpytest_subprocess(
+        "--codspeed",
+        "--codspeed-mode=walltime",
+        "--codspeed-warmup-time=0",
+        "--codspeed-max-rounds=2",
+        "--codspeed-nice=5",
+    )
+    result.assert_outcomes(passed=1)
+    results = json.loads(next((pytester.path / ".codspeed").glob("*.json")).read_text())
+    assert results["instrument"]["nice"] == 5
+
+
+@pytest.mark.filterwarnings("ignore:.*within the noise:RuntimeWarning")
+def test_interleaved_rounds() -> None:
+    calls: list[str] = []
+    instrument = WallTimeInstrument(
+        CodSpeedConfig(warmup_time_ns=0, max_rounds=20, interleave=True),
+        MeasurementMode.WallTime,
+    )
+    for name in ["a", "b", "c"]:
+        out = instrument.measure(
+            BenchmarkMarkerOptions(min_time=0),
+            name,
+            f"tests/test_benchmark.py::{name}",
+            calls.append,
+            name,
+        )
+        # The result is available right away, the rounds are deferred
+        assert out is None
+    assert instrument.benchmarks == []
+
+    calls.clear()
+    instrument.run_deferred()
+    assert [bench.name for bench in instrument.benchmarks] == ["a", "b", "c"]
+    assert all(bench.stats.rounds == 20 for bench in instrument.benchmarks)
+    # Each pass runs a round of every benchmark, in a random order
+    passes = [calls[i : i + 3] for i in range(0, len(calls), 3)]
+    assert len(passes) == 20
+    assert all(sorted(current) == ["a", "b", "c"] for current in passes)
+    assert len({tuple(current) for current in passes}) > 1
+    assert instrument.interleaved == []
+
+
+def test_interleave_option(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        def test_first(benchmark):
+            assert benchmark(sum, range(10)) == 45
+
+        @pytest.mark.benchmark
+        def test_marker():
+            pass
+
+        @pytest.mark.benchmark(gc="enabled")
+        def test_gc_enabled(benchmark):
+            benchmark(sum, range(10))
+
+        def test_pedantic(benchmark):
+            benchmark.pedantic(sum, args=(range(10),), rounds=3)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-interleave"
+    )
+    result.assert_outcomes(passed=4)
+    results = json.loads(next((pytester.path / ".codspeed").glob("*.json")).read_text())
+    # The benchmarks that can't be interleaved are measured right away
+    assert [bench["name"] for bench in results["benchmarks"]] == [
+        "test_gc_enabled",
+        "test_pedantic",
+        "test_first",
+        "test_marker",
+    ]
+
+
+def test_interleave_with_runner(pytester: pytest.Pytester, codspeed_env) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    with codspeed_env():
+        result = run_pytest_codspeed_with_mode(
+            pytester, MeasurementMode.WallTime, "--codspeed-interleave"
+        )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*can't be used with the CodSpeed runner*"])
+
+
+def test_compare(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import time
+
+        def slow(duration):
+            time.sleep(duration)
+            return "slow"
+
+        def fast(duration):
+            time.sleep(duration / 4)
+            return "fast"
+
+        def test_sleep(benchmark):
+            assert benchmark.compare(slow, fast, args=(0.002,)) == ("slow", "fast")
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-max-rounds=20"
+    )
+    result.assert_outcomes(passed=1)
+    assert "Comparisons" in result.stdout.str()
+    results = json.loads(next((pytester.path / ".codspeed").glob("*.json")).read_text())
+    baseline, candidate = results["benchmarks"]
+    assert baseline["name"] == "test_sleep[baseline]"
+    assert candidate["name"] == "test_sleep[candidate]"
+    assert baseline["stats"]["rounds"] == candidate["stats"]["rounds"] == 20
+    comparison = baseline["comparison"]
+    assert comparison == candidate["comparison"]
+    assert comparison["name"] == "test_sleep"
+    assert comparison["baseline_uri"] == baseline["uri"]
+    assert comparison["candidate_uri"] == candidate["uri"]
+    assert comparison["ratio"] < 0.5
+    assert comparison["ratio_ci"][0] < comparison["ratio"] < comparison["ratio_ci"][1]
+    assert comparison["significant"]
+
+
+def test_compare_coroutine(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import asyncio
+        import pytest
+
+        def baseline(x):
+            return x
+
+        async def candidate(x):
+            await asyncio.sleep(0)
+            return x
+
+        @pytest.mark.parametrize("x", [1])
+        def test_mixed(benchmark, x):
+            assert benchmark.compare(baseline, candidate, kwargs={"x": x}) == (x, x)
+        """
+    )
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    results = json.loads(next((pytester.path / ".codspeed").glob("*.json")).read_text())
+    assert [bench["name"] for bench in results["benchmarks"]] == [
+        "test_mixed[1-baseline]",
+        "test_mixed[1-candidate]",
+    ]
+
+
+COMPARED_BENCHMARKS = """
+    import time
+
+    def test_sleep(benchmark):
+        benchmark(time.sleep, 0.001)
+    """
+
+
+def test_compare_with_latest_results(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(COMPARED_BENCHMARKS)
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-compare"
+    )
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["codspeed: no previous results to compare with"])
+    [previous_path] = (pytester.path / ".codspeed").glob("results_*.json")
+
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "--codspeed-compare"
+    )
+    result.assert_outcomes(passed=1)
+    assert f"Comparison with {previous_path.name}" in result.stdout.str()
+
+
+def test_compare_fail_threshold(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(COMPARED_BENCHMARKS)
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result.assert_outcomes(passed=1)
+    [results_path] = (pytester.path / ".codspeed").glob("results_*.json")
+    # Make the previous session 10 times faster
+    results = json.loads(results_path.read_text())
+    for key in ("q1_ns", "median_ns", "q3_ns"):
+        results["benchmarks"][0]["stats"][key] /= 10
+    previous_path = pytester.path / "previous.json"
+    previous_path.write_text(json.dumps(results))
+
+    result = run_pytest_codspeed_with_mode(
+        pytester,
+        MeasurementMode.WallTime,
+        f"--codspeed-compare={previous_path}",
+        "--codspeed-compare-fail-threshold=5%",
+    )
+    result.assert_outcomes(passed=1)
+    assert result.ret == pytest.ExitCode.TESTS_FAILED
+    result.stdout.fnmatch_lines(["*1 benchmark(s) regressed by more than 5%*"])
+
+    result = run_pytest_codspeed_with_mode(
+        pytester,
+        MeasurementMode.WallTime,
+        f"--codspeed-compare={previous_path}",
+        "--codspeed-compare-fail-threshold=2000%",
+    )
+    assert result.ret == pytest.ExitCode.OK
+
+
+def test_compare_with_saved_samples(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(COMPARED_BENCHMARKS)
+    for _ in range(2):
+        result = run_pytest_codspeed_with_mode(
+            pytester,
+            MeasurementMode.WallTime,
+            "--codspeed-save-samples",
+            "--codspeed-max-rounds=20",
+        )
+        result.assert_outcomes(passed=1)
+    previous_path, current_path = sorted(
+        (pytester.path / ".codspeed").glob("results_*.json"),
+        key=lambda path: int(path.stem.split("_")[1]),
+    )
+    [diff] = diff_results(
+        ResultsFile.load(previous_path), ResultsFile.load(current_path)
+    )
+    assert diff.name == "test_sleep"
+    # The raw samples were used for a Mann-Whitney U test
+    assert diff.p_value is not None
+    assert diff.ratio == pytest.approx(1, rel=0.5)
+
+
+@pytest.mark.parametrize(
+    "args, error",
+    [
+        (
+            ["--codspeed-compare-fail-threshold=5%"],
+            "*--codspeed-compare-fail-threshold requires --codspeed-compare*",
+        ),
+        (["--codspeed-compare=missing.json"], "*cannot read the results file*"),
+        (["--codspeed-compare-fail-threshold=-1"], "*threshold must be positive*"),
+    ],
+)
+def test_compare_invalid_options(
+    pytester: pytest.Pytester, args: list[str], error: str
+) -> None:
+    pytester.makepyfile(COMPARED_BENCHMARKS)
+    result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime, *args)
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines([error])
+
+
+def test_compare_requires_walltime(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(COMPARED_BENCHMARKS)
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.Simulation, "--codspeed-compare"
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*only available in walltime mode*"])
+
+
+def test_history_appended(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(COMPARED_BENCHMARKS)
+    for _ in range(2):
+        result = run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+        result.assert_outcomes(passed=1)
+    results_paths = sorted(
+        (pytester.path / ".codspeed").glob("results_*.json"),
+        key=lambda path: int(path.stem.split("_")[1]),
+    )
+    with HistoryStore(pytester.path / ".codspeed" / "history.db") as store:
+        [uri] = store.find_uris("test_sleep")
+        first, second = store.trend(uri, runs=10)
+        assert store.trend(uri, runs=1) == [second]
+        sessions = store.connection.execute(
+            "SELECT results_file FROM sessions ORDER BY id"
+        ).fetchall()
+    assert [results_file for (results_file,) in sessions] == [
+        path.name for path in results_paths
+    ]
+    assert first.timestamp < second.timestamp
+    # Same interpreter and dependencies
+    assert first.environment == second.environment
+    results = json.loads(results_paths[1].read_text())
+    assert second.median_ns == results["benchmarks"][0]["stats"]["median_ns"]
+
+
+def test_history_option(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(COMPARED_BENCHMARKS)
+    result = pytester.runpytest("--codspeed-history", "test_sleep")
+    assert result.ret == pytest.ExitCode.NO_TESTS_COLLECTED
+    result.stdout.fnmatch_lines(["codspeed: no history found in *"])
+
+    run_pytest_codspeed_with_mode(pytester, MeasurementMode.WallTime)
+    result = pytester.runpytest("--codspeed-history", "test_sleep")
+    assert result.ret == pytest.ExitCode.OK
+    # The title of the trend table, with the URI, is wrapped
+    assert "Median" in result.stdout.str()
+
+    result = pytester.runpytest("--codspeed-history", "test_unknown")
+    assert result.ret == pytest.ExitCode.NO_TESTS_COLLECTED
+    result.stdout.fnmatch_lines(
+        ["codspeed: no benchmark matching 'test_unknown' in the history"]
+    )
+
+
+def test_stream_results(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+
+        def test_second(benchmark):
+            benchmark(sum, range(100))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester,
+        MeasurementMode.WallTime,
+        "--codspeed-stream-results",
+        "--codspeed-save-samples",
+    )
+    result.assert_outcomes(passed=2)
+    codspeed_folder = pytester.path / ".codspeed"
+    # The stream is removed once the results file is assembled from it
+    assert list(codspeed_folder.glob("*.jsonl")) == []
+    [results_path] = codspeed_folder.glob("results_*.json")
+    results = json.loads(results_path.read_text())
+    assert results["creator"]["name"] == "pytest-codspeed"
+    assert results["instrument"]["type"] == "walltime"
+    assert results["samples"]["path"] == results_path.with_suffix(".samples").name
+    first, second = results["benchmarks"]
+    assert first["name"] == "test_first"
+    assert second["name"] == "test_second"
+    assert first["stats"]["rounds"] == 2
+    # The location of the samples is only known at the end
+    assert first["samples"] == {"offset": 0, "count": 2}
+    assert second["samples"] == {"offset": 2, "count": 2}
+
+
+def test_stream_results_after_crash(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import os
+
+        def test_first(benchmark):
+            benchmark(sum, range(10))
+
+        def test_crash(benchmark):
+            os._exit(1)
+        """
+    )
+    result = pytester.runpytest_subprocess(
+        "--codspeed",
+        "--codspeed-mode=walltime",
+        "--codspeed-warmup-time=0",
+        "--codspeed-max-rounds=2",
+        "--codspeed-stream-results",
+    )
+    assert result.ret == 1
+    codspeed_folder = pytester.path / ".codspeed"
+    assert list(codspeed_folder.glob("*.json")) == []
+    [stream_path] = codspeed_folder.glob("results_*.jsonl")
+    # Simulate a record partially written when the session was killed
+    with stream_path.open("a") as f:
+        f.write('{"type": "benchm')
+    results = assemble_results(stream_path)
+    assert results["creator"]["name"] == "pytest-codspeed"
+    [bench] = results["benchmarks"]
+    assert bench["name"] == "test_first"
+    assert bench["stats"]["rounds"] == 2
+
+
+RESUMED_BENCHMARKS = """
+    import os
+
+    def test_first(benchmark):
+        benchmark(sum, range(10))
+
+    def test_second(benchmark):
+        if os.environ.get("CRASH"):
+            os._exit(1)
+        benchmark(sum, range(100))
+    """
+
+
+def run_resumed_session(
+    pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch, crash: bool
+) -> pytest.RunResult:
+    if crash:
+        monkeypatch.setenv("CRASH", "1")
+    else:
+        monkeypatch.delenv("CRASH", raising=False)
+    return pytester.runpytest_subprocess(
+        "--codspeed",
+        "--codspeed-mode=walltime",
+        "--codspeed-warmup-time=0",
+        "--codspeed-max-rounds=2",
+        "--codspeed-resume",
+    )
+
+
+def test_resume(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch) -> None:
+    pytester.makepyfile(RESUMED_BENCHMARKS)
+    codspeed_folder = pytester.path / ".codspeed"
+    result = run_resumed_session(pytester, monkeypatch, crash=True)
+    assert result.ret == 1
+    assert (codspeed_folder / "checkpoint.jsonl").exists()
+
+    result = run_resumed_session(pytester, monkeypatch, crash=False)
+    result.assert_outcomes(passed=1, skipped=1)
+    result.stdout.fnmatch_lines(
+        ["codspeed: resuming the session, 1 benchmark(s) already measured"]
+    )
+    # The checkpoint is removed once the session completes
+    assert not (codspeed_folder / "checkpoint.jsonl").exists()
+    [results_path] = codspeed_folder.glob("results_*.json")
+    results = json.loads(results_path.read_text())
+    assert [bench["name"] for bench in results["benchmarks"]] == [
+        "test_first",
+        "test_second",
+    ]
+
+
+def test_resume_in_another_environment(
+    pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pytester.makepyfile(RESUMED_BENCHMARKS)
+    result = run_resumed_session(pytester, monkeypatch, crash=True)
+    assert result.ret == 1
+    checkpoint_path = pytester.path / ".codspeed" / "checkpoint.jsonl"
+    header, *records = checkpoint_path.read_text().splitlines()
+    header_record = json.loads(header)
+    # Measured with other dependencies
+    header_record["environment"] = "0" * 16
+    checkpoint_path.write_text("\n".join([json.dumps(header_record), *records]))
+
+    result = run_resumed_session(pytester, monkeypatch, crash=False)
+    result.assert_outcomes(passed=2)
+    assert "resuming the session" not in result.stdout.str()
+
+
+def test_group_physical_cores(monkeypatch: pytest.MonkeyPatch) -> None:
+    # 4 cores with 2 hyperthreads each, numbered as on most x86 machines
+    monkeypatch.setattr(
+        "pytest_codspeed.distributed.read_thread_siblings",
+        lambda cpu: (cpu % 4, cpu % 4 + 4),
+    )
+    cores = group_physical_cores(range(8))
+    assert cores == [(0, 4), (1, 5), (2, 6), (3, 7)]
+    assert [assign_worker_cpus(cores, i) for i in range(6)] == [
+        (0,),
+        (1,),
+        (2,),
+        (3,),
+        (0,),
+        (1,),
+    ]
+    # The siblings outside of the available CPUs are left out
+    assert group_physical_cores([1, 5, 6]) == [(1, 5), (6,)]
+
+
+def test_merge_worker_results() -> None:
+    def worker_results(*names: str) -> dict:
+        return {
+            "instrument": {"type": "walltime"},
+            "benchmarks": [{"name": name} for name in names],
+        }
+
+    merged = merge_worker_results(
+        {"python": {}},
+        {"gw10": worker_results("c"), "gw2": worker_results("a", "b")},
+    )
+    assert get_worker_index("gw10") == 10
+    assert merged["instrument"] == {"type": "walltime"}
+    assert [bench["name"] for bench in merged["benchmarks"]] == ["a", "b", "c"]
+
+
+@skip_without_pytest_xdist
+def test_xdist_workers_results(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.parametrize("i", range(4))
+        def test_bench(benchmark, i):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "-n", "2"
+    )
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines(["*4 benchmarked on 2 worker(s)*"])
+    [results_path] = (pytester.path / ".codspeed").glob("results_*.json")
+    results = json.loads(results_path.read_text())
+    assert results["instrument"]["type"] == "walltime"
+    assert "environment" in results
+    benchmarks = results["benchmarks"]
+    assert len(benchmarks) == 4
+    assert {bench["worker"] for bench in benchmarks} <= {"gw0", "gw1"}
+    for bench in benchmarks:
+        assert len(bench["cpus"]) == 1
+
+
+@skip_without_pytest_xdist
+def test_xdist_incompatible_options(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_bench(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.WallTime, "-n", "2", "--codspeed-resume"
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*can't be used with pytest-xdist*"])
+
+
+def test_plan_time_budget() -> None:
+    def stats(mean_ns: float, stdev_ns: float) -> dict:
+        return {"mean_ns": mean_ns, "stdev_ns": stdev_ns, "iter_per_round": 1}
+
+    plans = plan_time_budget(
+        ["a", "b", "c"],
+        # b has the same rounds as a but noisier, c has no history
+        {"a": stats(1000, 0), "b": stats(1000, 1000)},
+        budget_ns=10_000_000_000,
+    )
+    assert sum(plan.total_ns for plan in plans.values()) == pytest.approx(
+        10_000_000_000, abs=3
+    )
+    assert plans["a"].total_ns < plans["c"].total_ns < plans["b"].total_ns
+    # Half of the budget is shared equally
+    assert plans["a"].total_ns > 10_000_000_000 / 6
+    assert plans["a"].warmup_time_ns == plans["a"].total_ns // 5
+    # Without history, the budget is shared equally
+    plans = plan_time_budget(["a", "b"], {}, budget_ns=1_000_000_000)
+    assert plans["a"] == plans["b"]
+    assert plans["a"].total_ns == 500_000_000
+
+
+def test_total_budget(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import time
+
+        def test_first(benchmark):
+            benchmark(time.sleep, 0.001)
+
+        def test_second(benchmark):
+            benchmark(time.sleep, 0.001)
+        """
+    )
+    result = pytester.runpytest(
+        "--codspeed", "--codspeed-mode=walltime", "--codspeed-total-budget=0.4"
+    )
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(
+        [
+            "*codspeed: planned the 0.4s budget over 2 benchmark(s), 0 of them "
+            "with a history",
+            "*Time Budget*",
+            "codspeed: spent *s of the 0.40s budget",
+        ]
+    )
+    results_path = next((pytester.path / ".codspeed").glob("results_*.json"))
+    results = json.loads(results_path.read_text())
+    time_budget = results["time_budget"]
+    assert [entry["planned_ns"] for entry in time_budget] == [200_000_000] * 2
+    for entry, bench in zip(time_budget, results["benchmarks"]):
+        assert entry["uri"] == bench["uri"]
+        # Bounded by the plan instead of the default 1s warmup and 3s max time,
+        # give or take the first call, the calibration and the last round
+        assert entry["actual_ns"] < 2 * entry["planned_ns"]
+        assert bench["config"]["max_time_ns"] == 160_000_000
+
+
+def test_total_budget_only_in_walltime(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_bench(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = run_pytest_codspeed_with_mode(
+        pytester, MeasurementMode.Simulation, "--codspeed-total-budget=10"
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(
+        ["*--codspeed-total-budget is only available in walltime mode*"]
+    )
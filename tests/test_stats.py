@@ -0,0 +1,189 @@
+import math
+import random
+import statistics
+
+import pytest
+
+from pytest_codspeed.stats import (
+    P2Quantile,
+    RunningStats,
+    StreamingStats,
+    bootstrap_confidence_intervals,
+    compare_samples,
+    fit_complexity,
+    mann_whitney_u_test,
+    median_confidence_interval,
+    median_notch,
+    relative_median_precision,
+)
+
+
+def test_median_confidence_interval_contains_median():
+    samples = [float(i) for i in range(1, 101)]
+    low, high = median_confidence_interval(samples)
+    assert low < 50.5 < high
+    # Roughly ±1 standard error of the median around the center
+    assert 39 <= low <= 42
+    assert 59 <= high <= 62
+
+
+def test_median_confidence_interval_small_sample_is_full_range():
+    assert median_confidence_interval([3.0, 1.0, 2.0]) == (1.0, 3.0)
+
+
+def test_median_confidence_interval_requires_samples():
+    with pytest.raises(ValueError):
+        median_confidence_interval([])
+
+
+def test_relative_median_precision():
+    assert relative_median_precision([100.0] * 30) == 0
+    noisy = [100.0 + (i % 10) for i in range(100)]
+    assert 0 < relative_median_precision(noisy) < 0.05
+
+
+def test_relative_median_precision_presorted():
+    samples = [float((i * 37) % 101) for i in range(101)]
+    assert relative_median_precision(
+        sorted(samples), is_sorted=True
+    ) == relative_median_precision(samples)
+
+
+def test_running_stats_matches_statistics():
+    samples = [random.Random(0).gauss(100, 10) for _ in range(1000)]
+    running = RunningStats()
+    for sample in samples:
+        running.add(sample)
+    assert running.count == 1000
+    assert running.mean == pytest.approx(statistics.mean(samples))
+    assert running.stdev == pytest.approx(statistics.stdev(samples))
+    assert (running.min, running.max) == (min(samples), max(samples))
+
+
+@pytest.mark.parametrize("p", [0.25, 0.5, 0.75])
+def test_p2_quantile_estimate(p: float):
+    rng = random.Random(0)
+    samples = [rng.lognormvariate(0, 0.5) for _ in range(20_000)]
+    estimator = P2Quantile(p)
+    for sample in samples:
+        estimator.add(sample)
+    expected = statistics.quantiles(samples, n=4)[int(p * 4) - 1]
+    assert estimator.value == pytest.approx(expected, rel=0.01)
+
+
+def test_p2_quantile_exact_with_few_samples():
+    estimator = P2Quantile(0.5)
+    for sample in (3.0, 1.0, 2.0):
+        estimator.add(sample)
+    assert estimator.value == 2.0
+    with pytest.raises(ValueError):
+        P2Quantile(0.5).value
+
+
+def test_streaming_stats_precision_close_to_exact():
+    rng = random.Random(0)
+    samples = [rng.gauss(100, 5) for _ in range(2000)]
+    streaming = StreamingStats(iqr_outlier_factor=1.5, stdev_outlier_factor=3)
+    for sample in samples:
+        streaming.add(sample)
+    assert streaming.relative_median_precision() == pytest.approx(
+        relative_median_precision(samples), rel=0.3
+    )
+
+
+def test_bootstrap_confidence_intervals():
+    rng = random.Random(1)
+    samples = [rng.gauss(100, 10) for _ in range(500)]
+    (median_low, median_high), (mean_low, mean_high) = bootstrap_confidence_intervals(
+        samples, resamples=500
+    )
+    assert median_low < statistics.median(samples) < median_high
+    assert mean_low < statistics.mean(samples) < mean_high
+    # About 1.96 standard errors of the mean on each side
+    assert (mean_high - mean_low) / 2 == pytest.approx(1.96 * 10 / 500**0.5, rel=0.2)
+
+
+def test_bootstrap_confidence_intervals_pure_python(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("pytest_codspeed.stats.IS_NUMPY_INSTALLED", False)
+    samples = [float(i % 7) for i in range(100)]
+    assert bootstrap_confidence_intervals(
+        samples, resamples=200
+    ) == bootstrap_confidence_intervals(samples, resamples=200)
+    assert bootstrap_confidence_intervals([5.0] * 10, resamples=50) == (
+        (5.0, 5.0),
+        (5.0, 5.0),
+    )
+
+
+def test_bootstrap_confidence_intervals_requires_samples():
+    with pytest.raises(ValueError):
+        bootstrap_confidence_intervals([], resamples=10)
+
+
+@pytest.mark.parametrize(
+    "model, expected",
+    [
+        (lambda n: 40.0, "O(1)"),
+        (lambda n: 7 * math.log2(n), "O(log n)"),
+        (lambda n: 3 * n + 20, "O(n)"),
+        (lambda n: 2 * n * math.log2(n), "O(n log n)"),
+        (lambda n: 0.5 * n * n, "O(n^2)"),
+    ],
+)
+def test_fit_complexity(model, expected: str):
+    sizes = [10, 100, 1_000, 10_000]
+    fit = fit_complexity(sizes, [model(n) for n in sizes])
+    assert fit.best_fit == expected
+    assert fit.errors[expected] == fit.rms == min(fit.errors.values())
+
+
+def test_fit_complexity_coefficient():
+    sizes = [16, 64, 256]
+    fit = fit_complexity(sizes, [3.0 * n * n for n in sizes])
+    assert fit.coefficient == pytest.approx(3.0)
+    assert fit.rms == pytest.approx(0.0, abs=1e-12)
+
+
+@pytest.mark.parametrize(
+    "sizes, times", [([10, 100], [1.0, 2.0]), ([10, 10, 100], [1.0, 1.0, 2.0])]
+)
+def test_fit_complexity_requires_enough_sizes(sizes, times):
+    with pytest.raises(ValueError, match="distinct sizes"):
+        fit_complexity(sizes, times)
+
+
+def test_mann_whitney_u_test():
+    rng = random.Random(0)
+    same = [rng.gauss(100, 5) for _ in range(50)]
+    other = [rng.gauss(100, 5) for _ in range(50)]
+    assert mann_whitney_u_test(same, other) > 0.05
+    shifted = [t * 1.2 for t in other]
+    assert mann_whitney_u_test(same, shifted) < 0.001
+    assert mann_whitney_u_test([1.0, 2.0, 3.0], [4.0, 5.0, 6.0]) == pytest.approx(
+        0.0809, abs=1e-4
+    )
+
+
+def test_compare_samples():
+    rng = random.Random(0)
+    baseline = [rng.gauss(100, 2) for _ in range(100)]
+    candidate = [rng.gauss(50, 1) for _ in range(100)]
+    comparison = compare_samples(baseline, candidate)
+    assert comparison.ratio == pytest.approx(0.5, rel=0.02)
+    low, high = comparison.ratio_ci
+    assert low < comparison.ratio < high
+    assert low < 0.5 < high
+    assert comparison.p_value < 0.001
+
+
+@pytest.mark.parametrize(
+    "baseline, candidate", [([1.0], [1.0, 2.0]), ([1.0, 2.0], [0.0, 1.0])]
+)
+def test_compare_samples_invalid(baseline, candidate):
+    with pytest.raises(ValueError):
+        compare_samples(baseline, candidate)
+
+
+def test_median_notch():
+    low, high = median_notch(q1=8.0, median=10.0, q3=12.0, count=16)
+    assert (low, high) == pytest.approx((10.0 - 1.57, 10.0 + 1.57))
@@ -1,8 +1,23 @@
+import json
+import os
 import tempfile
 from contextlib import contextmanager
 from pathlib import Path
 
-from pytest_codspeed.utils import get_git_relative_path, get_git_relative_uri_and_name
+import pytest
+
+from pytest_codspeed import environment
+from pytest_codspeed.environment import (
+    get_cached_fingerprint,
+    get_referenced_environment_metadata,
+    load_environment,
+)
+from pytest_codspeed.utils import (
+    get_environment_fingerprint,
+    get_environment_metadata,
+    get_git_relative_path,
+    get_git_relative_uri_and_name,
+)
 
 
 @contextmanager
@@ -32,3 +47,63 @@ def test_get_git_relative_uri():
             "pytest_root/testing/test_excinfo.py::TestFormattedExcinfo::test_fn",
             "TestFormattedExcinfo::test_fn",
         )
+
+
+def test_environment_metadata_gil_status():
+    python = get_environment_metadata()["python"]
+    assert python["gil_disabled"] == (python["sysconfig"].get("Py_GIL_DISABLED") == 1)
+    assert isinstance(python["gil_enabled"], bool)
+
+
+def test_cached_environment_fingerprint(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    site_packages = tmp_path / "site-packages"
+    site_packages.mkdir()
+    monkeypatch.setattr(environment, "get_site_packages", lambda: [str(site_packages)])
+    folder = tmp_path / ".codspeed"
+    fingerprint = get_cached_fingerprint(folder)
+    assert fingerprint == get_environment_fingerprint(get_environment_metadata())
+    python = load_environment(folder, fingerprint)
+    assert python is not None
+    assert get_environment_fingerprint({"python": python}) == fingerprint
+
+    def describe_environment():
+        raise AssertionError("the environment should not be described again")
+
+    with monkeypatch.context() as m:
+        m.setattr(environment, "get_python_metadata", describe_environment)
+        assert get_cached_fingerprint(folder) == fingerprint
+        metadata = get_referenced_environment_metadata(folder)
+    assert metadata["environment"] == fingerprint
+    assert "python" not in metadata
+    assert get_environment_fingerprint(metadata) == fingerprint
+
+    # Installing a distribution invalidates the cache
+    stat = site_packages.stat()
+    os.utime(site_packages, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    cache_path = folder / "environments" / "cache.json"
+    key = json.loads(cache_path.read_text())["key"]
+    assert get_cached_fingerprint(folder) == fingerprint
+    assert json.loads(cache_path.read_text())["key"] != key
+
+
+def test_environment_reference_in_results(pytester: pytest.Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_bench(benchmark):
+            benchmark(sum, range(10))
+        """
+    )
+    result = pytester.runpytest(
+        "--codspeed",
+        "--codspeed-mode=walltime",
+        "--codspeed-warmup-time=0",
+        "--codspeed-max-rounds=2",
+    )
+    result.assert_outcomes(passed=1)
+    folder = pytester.path / ".codspeed"
+    [results_path] = folder.glob("results_*.json")
+    results = json.loads(results_path.read_text())
+    assert "python" not in results
+    assert load_environment(folder, results["environment"]) is not None